@@ -0,0 +1,11 @@
+from .ttl import TTLCache
+from .views import (
+    ViewCacheBackend, MemoryViewCache, get_view_cache, set_view_cache,
+    get_data_version, cached_view,
+)
+
+__all__ = [
+    "TTLCache",
+    "ViewCacheBackend", "MemoryViewCache", "get_view_cache", "set_view_cache",
+    "get_data_version", "cached_view",
+]
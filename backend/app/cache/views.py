@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ..config import get_settings
+from ..database import async_execute_sp_fetchone
+from .ttl import TTLCache
+
+T = TypeVar("T")
+
+# (user_id, view, tab_id, include_completed)
+ViewKey = tuple[int, str, Optional[int], Optional[bool]]
+
+
+class ViewCacheBackend(ABC):
+    """Storage for cached task views.
+
+    Entries are stored under (data version, key), where the data version is
+    the user's highest change_seq in the database (see get_data_version).
+    Every committed write raises it, whichever worker or process made the
+    write, so stale entries are simply never looked up again and expire by
+    TTL/LRU. Implement this on a shared store (e.g. Redis) to share the
+    cache between workers.
+    """
+
+    @abstractmethod
+    async def get(self, version: int, key: ViewKey) -> Any | None:
+        """Cached value for a key at a version, or None."""
+
+    @abstractmethod
+    async def set(self, version: int, key: ViewKey, value: Any) -> None:
+        """Store a value for a key at a version."""
+
+    def stats(self) -> dict:
+        """Backend gauges and counters."""
+        return {}
+
+
+class MemoryViewCache(ViewCacheBackend):
+    """Per-process LRU + TTL view cache."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self._entries = TTLCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, version: int, key: ViewKey) -> Any | None:
+        return self._entries.get((version, key))
+
+    async def set(self, version: int, key: ViewKey, value: Any) -> None:
+        self._entries.set((version, key), value)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+_view_cache: ViewCacheBackend | None = None
+
+
+def get_view_cache() -> ViewCacheBackend:
+    """Get the process-wide view cache (in-memory unless another backend was installed)."""
+    global _view_cache
+    if _view_cache is None:
+        settings = get_settings()
+        _view_cache = MemoryViewCache(
+            max_size=settings.view_cache_max_size, ttl=settings.view_cache_ttl_seconds,
+        )
+    return _view_cache
+
+
+def set_view_cache(backend: ViewCacheBackend) -> None:
+    """Install a view cache backend (call once at startup)."""
+    global _view_cache
+    _view_cache = backend
+
+
+async def get_data_version(user_id: int) -> int | None:
+    """Current data version of a user, or None while it is not safe to cache on."""
+    row = await async_execute_sp_fetchone("sp_GetUserDataVersion", {"user_id": user_id})
+    if not row or not row["is_stable"]:
+        return None
+    return row["data_version"]
+
+
+async def cached_view(
+    user_id: int,
+    view: str,
+    load: Callable[[], Awaitable[T]],
+    version: int | None,
+    tab_id: int | None = None,
+    include_completed: bool | None = None,
+) -> T:
+    """Return a user's view from the cache, loading and storing it on a miss.
+
+    ``version`` is the user's get_data_version, read before the call (and
+    used for the response's ETag): if a write lands meanwhile, the result is
+    stored under the old version, which no later request asks for.
+    """
+    if version is None:
+        return await load()
+    cache = get_view_cache()
+    key = (user_id, view, tab_id, include_completed)
+    value = await cache.get(version, key)
+    if value is None:
+        value = await load()
+        await cache.set(version, key, value)
+    return value
@@ -0,0 +1,342 @@
+import asyncio
+import io
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional: br is simply not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is simply not offered
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Only these are worth compressing; images, archives etc. already are compressed
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+# Streams whose events must reach the client as they happen
+UNBUFFERED_TYPES = ("text/event-stream",)
+
+
+class Codec(ABC):
+    """One content coding: whole-body and incremental compression, bounded decompression."""
+
+    name: str = ""
+
+    def __init__(self, level: int):
+        self.level = level
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compress a whole body."""
+
+    @abstractmethod
+    def compressor(self) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """(compress_chunk, finish) for a streamed body; chunks are flushed as they go."""
+
+    @abstractmethod
+    def decompress(self, data: bytes, max_size: int) -> bytes:
+        """Decompress, raising ValueError if the output would exceed max_size bytes."""
+
+
+class GzipCodec(Codec):
+    name = "gzip"
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH),
+            compressor.flush,
+        )
+
+    def decompress(self, data: bytes, max_size: int) -> bytes:
+        decompressor = zlib.decompressobj(31)
+        out = decompressor.decompress(data, max_size + 1)
+        if len(out) > max_size or decompressor.unconsumed_tail:
+            raise ValueError("decompressed body too large")
+        if not decompressor.eof:
+            raise zlib.error("truncated gzip stream")
+        return out
+
+
+class BrotliCodec(Codec):
+    name = "br"
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.level)
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return (
+            lambda chunk: compressor.process(chunk) + compressor.flush(),
+            compressor.finish,
+        )
+
+    def decompress(self, data: bytes, max_size: int) -> bytes:
+        decompressor = brotli.Decompressor()
+        out = bytearray()
+        # Small input steps keep the overshoot of a decompression bomb bounded
+        for start in range(0, len(data), 16 * 1024):
+            out += decompressor.process(data[start:start + 16 * 1024])
+            if len(out) > max_size:
+                raise ValueError("decompressed body too large")
+        if not decompressor.is_finished():
+            raise brotli.error("truncated brotli stream")
+        return bytes(out)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def compressor(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (
+            lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush,
+        )
+
+    def decompress(self, data: bytes, max_size: int) -> bytes:
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+        out = bytearray()
+        while chunk := reader.read(64 * 1024):
+            out += chunk
+            if len(out) > max_size:
+                raise ValueError("decompressed body too large")
+        return bytes(out)
+
+
+def available_codecs(gzip_level: int = 6, brotli_level: int = 4, zstd_level: int = 3) -> dict[str, Codec]:
+    """Codecs usable in this process, by content-coding name."""
+    codecs: dict[str, Codec] = {"gzip": GzipCodec(gzip_level)}
+    if brotli is not None:
+        codecs["br"] = BrotliCodec(brotli_level)
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCodec(zstd_level)
+    return codecs
+
+
+def negotiate(accept_encoding: str, preference: list[str]) -> Optional[str]:
+    """Pick a content coding from an Accept-Encoding header.
+
+    Highest q-value wins; ties go to the earliest entry in ``preference``
+    (the server's order). ``*`` covers codings the client didn't name.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for name in preference:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(UNBUFFERED_TYPES)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip / br / zstd response compression, and request-body decompression.
+
+    Whole responses under ``min_size`` go out as they are. Bodies of
+    ``offload_min_size`` or more are (de)compressed in a worker thread so a
+    large sync payload doesn't stall the event loop. Streamed responses
+    (NDJSON) are compressed chunk by chunk, flushing after each so the client
+    still receives rows as they are produced. Compressed requests are
+    accepted only on ``decompress_paths``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codecs: dict[str, Codec],
+        preference: list[str],
+        min_size: int = 1024,
+        offload_min_size: int = 256 * 1024,
+        decompress_paths: tuple[str, ...] = (),
+        max_request_size: int = 32 * 1024 * 1024,
+    ):
+        self.app = app
+        self.codecs = codecs
+        self.preference = [name for name in preference if name in codecs]
+        self.min_size = min_size
+        self.offload_min_size = offload_min_size
+        self.decompress_paths = tuple(decompress_paths)
+        self.max_request_size = max_request_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get("content-encoding") and scope["path"] in self.decompress_paths:
+            decompressed = await self._decompress_request(scope, receive, send, headers)
+            if decompressed is None:
+                return
+            scope, receive = decompressed
+        coding = negotiate(headers.get("accept-encoding", ""), self.preference)
+        if coding is None or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        await CompressedResponder(self, self.codecs[coding])(scope, receive, send)
+
+    async def _run(self, fn: Callable, data: bytes, *args):
+        if len(data) >= self.offload_min_size:
+            return await asyncio.to_thread(fn, data, *args)
+        return fn(data, *args)
+
+    async def _decompress_request(self, scope: Scope, receive: Receive, send: Send, headers: Headers):
+        """(scope, receive) seeing the decoded body, or None after sending an error."""
+        coding = headers["content-encoding"].strip().lower()
+        codec = self.codecs.get(coding)
+        if codec is None:
+            response = JSONResponse(status_code=415, content={"detail": f"Unsupported Content-Encoding: {coding}"})
+            await response(scope, receive, send)
+            return None
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            if size > self.max_request_size:
+                response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+                await response(scope, receive, send)
+                return None
+            if not message.get("more_body", False):
+                break
+        try:
+            body = await self._run(codec.decompress, b"".join(chunks), self.max_request_size)
+        except ValueError:
+            response = JSONResponse(status_code=413, content={"detail": "Request body too large"})
+            await response(scope, receive, send)
+            return None
+        except Exception:
+            response = JSONResponse(status_code=400, content={"detail": "Malformed compressed request body"})
+            await response(scope, receive, send)
+            return None
+
+        raw_headers = [
+            (key, value) for key, value in scope["headers"]
+            if key not in (b"content-encoding", b"content-length")
+        ]
+        raw_headers.append((b"content-length", str(len(body)).encode()))
+        sent = False
+
+        async def decoded_receive() -> Message:
+            nonlocal sent
+            if sent:
+                return await receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return {**scope, "headers": raw_headers}, decoded_receive
+
+
+class CompressedResponder:
+    """Compresses one response on its way out."""
+
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec):
+        self.middleware = middleware
+        self.codec = codec
+        self.send: Send = None
+        self.start: Message | None = None
+        self.compress_chunk: Callable[[bytes], bytes] | None = None
+        self.finish: Callable[[], bytes] | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.start = message
+            status = message["status"]
+            if (
+                status < 200 or status in (204, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start["headers"])
+
+        if self.compress_chunk is None:
+            if not more_body:
+                # The whole body in one message
+                headers.add_vary_header("Accept-Encoding")
+                if len(body) < self.middleware.min_size:
+                    await self.send(self.start)
+                    await self.send(message)
+                    return
+                body = await self.middleware._run(self.codec.compress, body)
+                self._mark_encoded(headers)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            # Streamed: length is unknown up front
+            headers.add_vary_header("Accept-Encoding")
+            self._mark_encoded(headers)
+            del headers["Content-Length"]
+            self.compress_chunk, self.finish = self.codec.compressor()
+            await self.send(self.start)
+
+        out = await self.middleware._run(self.compress_chunk, body) if body else b""
+        if not more_body:
+            out += self.finish()
+        if out or not more_body:
+            await self.send({"type": "http.response.body", "body": out, "more_body": more_body})
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.codec.name
+        # The encoded bytes differ from the identity ones, so the validator can only be weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
@@ -7,6 +7,12 @@ class Settings(BaseSettings):
     app_name: str = "Task Manager API"
     debug: bool = False
     
+    # Storage backend: "mssql" (stored procedures over pyodbc) or "sqlite" (embedded)
+    db_backend: str = "mssql"
+    db_sqlite_path: str = "taskmanager.db"  # "file:...?mode=memory&cache=shared" URIs work too
+    db_sqlite_busy_timeout_seconds: float = 5.0  # Wait for the write lock before failing
+    db_sqlite_synchronous: str = "NORMAL"  # NORMAL is durable enough under WAL; FULL fsyncs every commit
+    
     # Database settings (MSSQL)
     db_server: str = "localhost"
     db_name: str = "TaskManager"
@@ -14,14 +20,85 @@ class Settings(BaseSettings):
     db_password: str = ""
     db_driver: str = "ODBC Driver 17 for SQL Server"
     
+    # Connection pool settings
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_timeout_seconds: float = 30.0  # Max wait for a free connection
+    db_pool_recycle_seconds: float = 1800.0  # Reopen connections older than this
+    db_pool_max_uses: int = 1000  # Reopen connections after this many checkouts
+    db_pool_pre_ping: bool = True  # Ping connections on checkout
+    
+    # Async DB execution settings
+    db_executor_max_workers: int = 0  # 0 = same as db_pool_max_size
+    db_query_timeout_seconds: float = 30.0  # 0 disables the per-call timeout
+    db_stream_chunk_size: int = 500  # Rows per fetchmany() in streaming responses
+    db_stream_max_concurrent: int = 0  # 0 = half of db_pool_max_size; always below it
+    
     # Google OAuth settings
     google_client_id: str = ""
     google_client_secret: str = ""
+    google_keys_source: str = "google"  # "google" (published certs) or "local" (google_keys_file)
+    google_keys_file: str = ""  # JWKS file for google_keys_source=local
+    google_certs_url: str = "https://www.googleapis.com/oauth2/v3/certs"
+    google_certs_timeout_seconds: float = 5.0
+    google_certs_min_refresh_seconds: float = 60.0  # Floor between refreshes forced by unknown key ids
     
     # JWT settings
     jwt_secret_key: str = "your-secret-key-change-in-production"
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 60 * 24 * 7  # 7 days
+    auth_token_cache_max_size: int = 10000  # Verified access tokens kept until they expire; 0 disables
+    
+    # Authenticated-user cache settings
+    user_cache_max_size: int = 10000
+    user_cache_ttl_seconds: float = 300.0
+    auth_trust_jwt_claims: bool = False  # Build the user from token claims, skip the DB lookup
+    
+    # Task view cache settings (Today / All / Tab)
+    view_cache_max_size: int = 10000  # Cached views per process, 0 disables caching
+    view_cache_ttl_seconds: float = 60.0
+    
+    # Response serialization
+    fast_serialization: bool = True  # Encode list responses from DB rows with orjson, no re-validation
+    
+    # Compression settings (br / zstd are used when brotli / zstandard are installed)
+    compression_enabled: bool = True
+    compression_algorithms: list[str] = ["zstd", "br", "gzip"]  # Server preference on q-value ties
+    compression_min_size: int = 1024  # Smaller responses are sent uncompressed
+    compression_offload_min_size: int = 256 * 1024  # Larger bodies are (de)compressed in a thread
+    compression_gzip_level: int = 6
+    compression_brotli_level: int = 4
+    compression_zstd_level: int = 3
+    compression_request_paths: list[str] = ["/sync/batch-push"]  # Accept compressed request bodies here
+    compression_max_request_size: int = 32 * 1024 * 1024  # Decompressed request body limit
+    
+    # Metrics
+    metrics_enabled: bool = True  # Request/DB timing and GET /metrics (Prometheus text format)
+    
+    # Bulk task endpoints
+    task_bulk_max_size: int = 1000  # Max task ids per /tasks/bulk/* request
+    
+    # Task search
+    task_search_page_size: int = 50  # Default limit of /tasks/search
+    task_search_max_page_size: int = 200
+    task_search_max_terms: int = 8  # Words of a query beyond this are ignored
+    
+    # Sync settings
+    sync_batch_max_size: int = 5000  # Max items accepted by /sync/batch-push
+    sync_batch_chunk_size: int = 500  # Items sent to the DB per call
+    sync_pull_page_size: int = 500  # Default page size for paged /sync/pull
+    sync_pull_max_page_size: int = 5000
+    sync_stream_heartbeat_seconds: float = 25.0  # Keep-alive comment interval on /sync/stream
+    sync_stream_max_connections_per_user: int = 10
+    
+    # Notification dispatcher settings
+    notification_dispatch_enabled: bool = True  # Run the dispatcher in this process
+    notification_batch_size: int = 500  # Notifications claimed per round
+    notification_concurrency: int = 50  # Sends in flight at once
+    notification_poll_interval_seconds: float = 5.0  # Sleep when nothing more is due
+    notification_lease_seconds: int = 300  # Claimed rows are retried by anyone after this
+    notification_retry_seconds: int = 60  # Delay before retrying a failed send
+    notification_max_attempts: int = 5
     
     # CORS settings
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost:19006"]
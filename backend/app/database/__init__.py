@@ -1,3 +1,23 @@
-from .connection import get_db_connection, execute_sp, execute_sp_fetchall, execute_sp_fetchone
+from .connection import (
+    get_db_connection, get_db_cursor, execute_sp, execute_sp_fetchall, execute_sp_fetchone,
+    execute_sp_multiple_results, get_pool, close_pool, get_pool_stats, QueryCancelledError,
+    StoredProcedureStream,
+)
+from .executor import (
+    run_in_db_executor, async_execute_sp, async_execute_sp_fetchone, async_execute_sp_fetchall,
+    async_execute_sp_multiple_results, stream_sp_rows, shutdown_executor, QueryTimeoutError,
+)
+from .backend import StorageBackend, MssqlBackend, get_backend, set_backend
+from .pool import ConnectionPool, PoolTimeoutError
+from .rows import Record, record_type
 
-__all__ = ["get_db_connection", "execute_sp", "execute_sp_fetchall", "execute_sp_fetchone"]
+__all__ = [
+    "get_db_connection", "get_db_cursor", "execute_sp", "execute_sp_fetchall", "execute_sp_fetchone",
+    "execute_sp_multiple_results", "get_pool", "close_pool", "get_pool_stats", "QueryCancelledError",
+    "StoredProcedureStream",
+    "run_in_db_executor", "async_execute_sp", "async_execute_sp_fetchone", "async_execute_sp_fetchall",
+    "async_execute_sp_multiple_results", "stream_sp_rows", "shutdown_executor", "QueryTimeoutError",
+    "StorageBackend", "MssqlBackend", "get_backend", "set_backend",
+    "ConnectionPool", "PoolTimeoutError",
+    "Record", "record_type",
+]
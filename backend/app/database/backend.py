@@ -0,0 +1,88 @@
+import threading
+from abc import ABC, abstractmethod
+from typing import Any
+
+from ..config import get_settings
+
+_backend: "StorageBackend | None" = None
+_backend_lock = threading.Lock()
+
+
+class StorageBackend(ABC):
+    """Where the stored procedures run.
+
+    The pool opens connections with ``connect``; every ``execute_sp*`` call
+    and stream runs its procedure with ``execute`` on a cursor from
+    ``cursor``. Cursors follow the DB-API subset the callers use:
+    ``description``, ``fetchone``, ``fetchall``, ``fetchmany``, ``nextset``,
+    ``cancel`` and ``close``.
+    """
+
+    name: str = ""
+
+    @abstractmethod
+    def connect(self) -> Any:
+        """Open a new DB-API connection (called by the pool)."""
+
+    def cursor(self, conn: Any) -> Any:
+        return conn.cursor()
+
+    @abstractmethod
+    def execute(self, cursor: Any, sp_name: str, params: dict[str, Any] | None) -> None:
+        """Run a procedure; its result sets are then read from the cursor."""
+
+    def set_timeout(self, conn: Any, seconds: int) -> None:
+        """Driver-side statement timeout for the next call (0 disables it)."""
+
+
+class MssqlBackend(StorageBackend):
+    """SQL Server through pyodbc; the procedures are database/stored_procedures.sql."""
+
+    name = "mssql"
+
+    def connect(self) -> Any:
+        import pyodbc
+        from .connection import get_connection_string
+        return pyodbc.connect(get_connection_string())
+
+    def execute(self, cursor: Any, sp_name: str, params: dict[str, Any] | None) -> None:
+        """Run EXEC with named parameters."""
+        if params:
+            param_placeholders = ", ".join([f"@{k}=?" for k in params.keys()])
+            cursor.execute(f"EXEC {sp_name} {param_placeholders}", list(params.values()))
+        else:
+            cursor.execute(f"EXEC {sp_name}")
+
+    def set_timeout(self, conn: Any, seconds: int) -> None:
+        conn.timeout = seconds
+
+
+def create_backend(name: str) -> StorageBackend:
+    """Backend for a ``db_backend`` setting value."""
+    if name == "mssql":
+        return MssqlBackend()
+    if name == "sqlite":
+        from .sqlite import SqliteBackend
+        settings = get_settings()
+        return SqliteBackend(
+            settings.db_sqlite_path,
+            busy_timeout=settings.db_sqlite_busy_timeout_seconds,
+            synchronous=settings.db_sqlite_synchronous,
+        )
+    raise ValueError(f"Unknown db_backend: {name!r} (expected 'mssql' or 'sqlite')")
+
+
+def get_backend() -> StorageBackend:
+    """Get the process-wide storage backend (from ``db_backend`` unless another was installed)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(get_settings().db_backend)
+    return _backend
+
+
+def set_backend(backend: StorageBackend) -> None:
+    """Install a storage backend (call once at startup, before the pool is opened)."""
+    global _backend
+    _backend = backend
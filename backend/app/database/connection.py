@@ -1,7 +1,56 @@
-import pyodbc
-from contextlib import contextmanager
+import math
+import threading
+from contextlib import contextmanager, ExitStack
+import time
+from contextvars import ContextVar
 from typing import Any, Generator
 from ..config import get_settings
+from ..metrics import ProcedureTimer, db_connect_duration
+from .backend import get_backend
+from .pool import ConnectionPool
+from .rows import convert_rows
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+class QueryCancelledError(Exception):
+    """Raised when a database call is cancelled before or while it runs."""
+
+
+class DbCall:
+    """Handle on an in-flight database call, used to cancel it from another thread."""
+
+    def __init__(self, timeout: float | None = None):
+        self.timeout = timeout
+        self.cancelled = False
+        self._cursor: Any = None
+        self._lock = threading.Lock()
+
+    def attach(self, cursor: Any) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelledError("Database call was cancelled")
+            self._cursor = cursor
+
+    def detach(self) -> None:
+        with self._lock:
+            self._cursor = None
+
+    def cancel(self) -> None:
+        """Mark the call cancelled and abort the running statement, if any."""
+        with self._lock:
+            self.cancelled = True
+            cursor = self._cursor
+        if cursor is not None:
+            try:
+                cursor.cancel()
+            except Exception:
+                pass
+
+
+# Set by the async layer for the duration of a call running on the DB executor
+current_call: ContextVar[DbCall | None] = ContextVar("current_call", default=None)
 
 
 def get_connection_string() -> str:
@@ -31,94 +80,221 @@ def get_connection_string() -> str:
     )
 
 
+def _connect() -> Any:
+    """Open a new physical connection."""
+    started = time.perf_counter()
+    conn = get_backend().connect()
+    db_connect_duration.observe((), time.perf_counter() - started)
+    return conn
+
+
+def get_pool() -> ConnectionPool:
+    """Get the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = get_settings()
+                _pool = ConnectionPool(
+                    _connect,
+                    min_size=settings.db_pool_min_size,
+                    max_size=settings.db_pool_max_size,
+                    timeout=settings.db_pool_timeout_seconds,
+                    recycle_seconds=settings.db_pool_recycle_seconds,
+                    max_uses=settings.db_pool_max_uses,
+                    pre_ping=settings.db_pool_pre_ping,
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    """Close the connection pool (on application shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_pool_stats() -> dict:
+    """Pool gauges and counters, or an empty dict if the pool is not open yet."""
+    return _pool.stats() if _pool is not None else {}
+
+
 @contextmanager
-def get_db_connection() -> Generator[pyodbc.Connection, None, None]:
-    """Get database connection as context manager."""
-    conn = pyodbc.connect(get_connection_string())
-    try:
+def get_db_connection() -> Generator[Any, None, None]:
+    """Get a pooled database connection as context manager."""
+    with get_pool().connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
-def execute_sp(sp_name: str, params: dict[str, Any] = None) -> None:
-    """Execute stored procedure without returning results."""
+@contextmanager
+def get_db_cursor() -> Generator[tuple[Any, Any], None, None]:
+    """Get a pooled connection and a cursor on it.
+
+    When running under the async layer the cursor is registered with the
+    current DbCall so a timeout or cancellation can abort the statement.
+    """
+    call = current_call.get()
+    backend = get_backend()
     with get_db_connection() as conn:
-        cursor = conn.cursor()
+        # Driver-side query timeout backs up the event-loop timeout (0 disables it)
+        backend.set_timeout(conn, math.ceil(call.timeout) if call and call.timeout else 0)
+        cursor = backend.cursor(conn)
         try:
-            if params:
-                param_placeholders = ", ".join([f"@{k}=?" for k in params.keys()])
-                cursor.execute(f"EXEC {sp_name} {param_placeholders}", list(params.values()))
-            else:
-                cursor.execute(f"EXEC {sp_name}")
-            conn.commit()
+            if call is not None:
+                call.attach(cursor)
+            yield conn, cursor
         finally:
+            if call is not None:
+                call.detach()
             cursor.close()
 
 
+def _execute(cursor: Any, sp_name: str, params: dict[str, Any] | None) -> None:
+    """Run a stored procedure on the configured backend."""
+    get_backend().execute(cursor, sp_name, params)
+
+
+def execute_sp(sp_name: str, params: dict[str, Any] = None) -> None:
+    """Execute stored procedure without returning results."""
+    with ProcedureTimer(sp_name) as timer, get_db_cursor() as (conn, cursor):
+        timer.lap("checkout")
+        _execute(cursor, sp_name, params)
+        conn.commit()
+        timer.lap("execute")
+
+
 def execute_sp_fetchone(sp_name: str, params: dict[str, Any] = None) -> dict | None:
     """Execute stored procedure and fetch one result."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            if params:
-                param_placeholders = ", ".join([f"@{k}=?" for k in params.keys()])
-                cursor.execute(f"EXEC {sp_name} {param_placeholders}", list(params.values()))
+    with ProcedureTimer(sp_name) as timer, get_db_cursor() as (conn, cursor):
+        timer.lap("checkout")
+        _execute(cursor, sp_name, params)
+        timer.lap("execute")
+        
+        row = cursor.fetchone()
+        result = None
+        if row:
+            columns = [column[0] for column in cursor.description]
+            result = dict(zip(columns, row))
+            timer.rows(1)
+        conn.commit()
+        timer.lap("fetch")
+        return result
+
+
+def execute_sp_fetchall(sp_name: str, params: dict[str, Any] = None, compact: bool = False) -> list[dict]:
+    """Execute stored procedure and fetch all results.
+
+    With ``compact`` the rows are Records (see rows.py) instead of dicts.
+    """
+    with ProcedureTimer(sp_name) as timer, get_db_cursor() as (conn, cursor):
+        timer.lap("checkout")
+        _execute(cursor, sp_name, params)
+        timer.lap("execute")
+        
+        rows = cursor.fetchall()
+        result = []
+        if rows:
+            result = convert_rows(cursor.description, rows, compact)
+            timer.rows(len(rows))
+        conn.commit()
+        timer.lap("fetch")
+        return result
+
+
+def execute_sp_multiple_results(
+    sp_name: str, params: dict[str, Any] = None, compact: bool = False
+) -> list[list[dict]]:
+    """Execute stored procedure that returns multiple result sets (Records with ``compact``)."""
+    with ProcedureTimer(sp_name) as timer, get_db_cursor() as (conn, cursor):
+        timer.lap("checkout")
+        _execute(cursor, sp_name, params)
+        timer.lap("execute")
+        
+        results = []
+        while True:
+            rows = cursor.fetchall()
+            if rows:
+                results.append(convert_rows(cursor.description, rows, compact))
+                timer.rows(len(rows))
             else:
-                cursor.execute(f"EXEC {sp_name}")
+                results.append([])
             
-            row = cursor.fetchone()
-            if row:
-                columns = [column[0] for column in cursor.description]
-                return dict(zip(columns, row))
-            return None
-        finally:
-            cursor.close()
+            if not cursor.nextset():
+                break
+        
+        conn.commit()
+        timer.lap("fetch")
+        return results
 
 
-def execute_sp_fetchall(sp_name: str, params: dict[str, Any] = None) -> list[dict]:
-    """Execute stored procedure and fetch all results."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+class StoredProcedureStream:
+    """Reads a stored procedure's result sets in fetchmany chunks.
+
+    Holds one pooled connection from open() until close(), so only one
+    chunk of rows is in memory at a time. Each method is blocking and is
+    meant to be driven from the DB executor (see stream_sp_rows).
+    """
+
+    def __init__(
+        self, sp_name: str, params: dict[str, Any] = None, chunk_size: int = 500, compact: bool = False
+    ):
+        self.sp_name = sp_name
+        self.params = params
+        self.chunk_size = chunk_size
+        self.compact = compact
+        self.result_index = 0
+        self.exhausted = False
+        self._stack = ExitStack()
+        self._conn: Any = None
+        self._cursor: Any = None
+        # close() may be submitted while a cancelled open()/fetch_chunk() is still running
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _attached(self) -> Generator[None, None, None]:
+        call = current_call.get()
+        if call is not None:
+            call.attach(self._cursor)
         try:
-            if params:
-                param_placeholders = ", ".join([f"@{k}=?" for k in params.keys()])
-                cursor.execute(f"EXEC {sp_name} {param_placeholders}", list(params.values()))
-            else:
-                cursor.execute(f"EXEC {sp_name}")
-            
-            rows = cursor.fetchall()
-            if rows:
-                columns = [column[0] for column in cursor.description]
-                return [dict(zip(columns, row)) for row in rows]
-            return []
+            yield
         finally:
-            cursor.close()
+            if call is not None:
+                call.detach()
 
+    def open(self) -> None:
+        with self._lock, ProcedureTimer(self.sp_name) as timer:
+            self._conn = self._stack.enter_context(get_db_connection())
+            self._cursor = get_backend().cursor(self._conn)
+            self._stack.callback(self._cursor.close)
+            timer.lap("checkout")
+            with self._attached():
+                _execute(self._cursor, self.sp_name, self.params)
+            timer.lap("execute")
 
-def execute_sp_multiple_results(sp_name: str, params: dict[str, Any] = None) -> list[list[dict]]:
-    """Execute stored procedure that returns multiple result sets."""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            if params:
-                param_placeholders = ", ".join([f"@{k}=?" for k in params.keys()])
-                cursor.execute(f"EXEC {sp_name} {param_placeholders}", list(params.values()))
-            else:
-                cursor.execute(f"EXEC {sp_name}")
-            
-            results = []
-            while True:
-                rows = cursor.fetchall()
-                if rows:
-                    columns = [column[0] for column in cursor.description]
-                    results.append([dict(zip(columns, row)) for row in rows])
+    def fetch_chunk(self) -> tuple[int, list[dict]] | None:
+        """Next (result_set_index, rows) chunk, or None when all sets are read."""
+        with self._lock, self._attached(), ProcedureTimer(self.sp_name) as timer:
+            while not self.exhausted:
+                if self._cursor.description is not None:
+                    rows = self._cursor.fetchmany(self.chunk_size)
+                    if rows:
+                        chunk = convert_rows(self._cursor.description, rows, self.compact)
+                        timer.rows(len(rows))
+                        timer.lap("fetch")
+                        return self.result_index, chunk
+                if self._cursor.nextset():
+                    self.result_index += 1
                 else:
-                    results.append([])
-                
-                if not cursor.nextset():
-                    break
-            
-            return results
-        finally:
-            cursor.close()
+                    self.exhausted = True
+        return None
+
+    def close(self) -> None:
+        """Commit if fully read, then return the connection to the pool."""
+        with self._lock:
+            try:
+                if self.exhausted and self._conn is not None:
+                    self._conn.commit()
+            finally:
+                self._stack.close()
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from ..config import get_settings
+from .connection import (
+    DbCall, current_call, StoredProcedureStream,
+    execute_sp, execute_sp_fetchone, execute_sp_fetchall, execute_sp_multiple_results,
+)
+from .pool import PoolTimeoutError
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_stream_slots: asyncio.Semaphore | None = None
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a database call does not finish within its timeout."""
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the dedicated executor that runs blocking database calls."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                settings = get_settings()
+                # More threads than pooled connections would only queue on the pool
+                workers = settings.db_executor_max_workers or settings.db_pool_max_size
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the database executor (on application shutdown)."""
+    global _executor, _stream_slots
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+        _stream_slots = None
+
+
+def stream_limit() -> int:
+    """How many result streams may hold a pooled connection at once.
+
+    A stream keeps its connection while the client reads, but its chunks
+    are fetched on the shared executor. If streams held every connection,
+    calls waiting for one would fill the executor and the streams' next
+    chunks could never run, so at least one connection is always left over.
+    """
+    settings = get_settings()
+    limit = settings.db_stream_max_concurrent or settings.db_pool_max_size // 2
+    return max(1, min(limit, settings.db_pool_max_size - 1))
+
+
+def _get_stream_slots() -> asyncio.Semaphore:
+    global _stream_slots
+    if _stream_slots is None:
+        _stream_slots = asyncio.Semaphore(stream_limit())
+    return _stream_slots
+
+
+def _close_stream(stream: StoredProcedureStream, slots: asyncio.Semaphore) -> None:
+    """Close a stream without awaiting it; its slot is freed once the connection is back."""
+    try:
+        future = get_executor().submit(stream.close)
+    except RuntimeError:
+        # Executor is shutting down; return the connection inline
+        try:
+            stream.close()
+        finally:
+            slots.release()
+        return
+    loop = asyncio.get_running_loop()
+    
+    def release(_: Any) -> None:
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            pass  # Loop already closed
+    
+    future.add_done_callback(release)
+
+
+def _invoke(call: DbCall, fn: Callable[..., T], args: tuple, kwargs: dict) -> T:
+    token = current_call.set(call)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        current_call.reset(token)
+
+
+async def run_in_db_executor(
+    fn: Callable[..., T], *args: Any, timeout: float | None = None, **kwargs: Any
+) -> T:
+    """Run a blocking database function on the DB executor and await it.
+
+    If the call times out or the awaiting task is cancelled (e.g. the client
+    disconnected), the running statement is cancelled on the server too.
+    """
+    if timeout is None:
+        timeout = get_settings().db_query_timeout_seconds or None
+    call = DbCall(timeout)
+    future = get_executor().submit(_invoke, call, fn, args, kwargs)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        call.cancel()
+        raise QueryTimeoutError(f"Database call timed out after {timeout:.1f}s")
+    except asyncio.CancelledError:
+        call.cancel()
+        raise
+
+
+async def async_execute_sp(
+    sp_name: str, params: dict[str, Any] = None, timeout: float | None = None
+) -> None:
+    """Awaitable execute_sp."""
+    return await run_in_db_executor(execute_sp, sp_name, params, timeout=timeout)
+
+
+async def async_execute_sp_fetchone(
+    sp_name: str, params: dict[str, Any] = None, timeout: float | None = None
+) -> dict | None:
+    """Awaitable execute_sp_fetchone."""
+    return await run_in_db_executor(execute_sp_fetchone, sp_name, params, timeout=timeout)
+
+
+async def async_execute_sp_fetchall(
+    sp_name: str, params: dict[str, Any] = None, timeout: float | None = None, compact: bool = False
+) -> list[dict]:
+    """Awaitable execute_sp_fetchall."""
+    return await run_in_db_executor(execute_sp_fetchall, sp_name, params, compact, timeout=timeout)
+
+
+async def async_execute_sp_multiple_results(
+    sp_name: str, params: dict[str, Any] = None, timeout: float | None = None, compact: bool = False
+) -> list[list[dict]]:
+    """Awaitable execute_sp_multiple_results."""
+    return await run_in_db_executor(execute_sp_multiple_results, sp_name, params, compact, timeout=timeout)
+
+
+async def stream_sp_rows(
+    sp_name: str, params: dict[str, Any] = None, chunk_size: int | None = None, compact: bool = False
+) -> AsyncIterator[tuple[int, list[dict]]]:
+    """Stream (result_set_index, rows) chunks of a stored procedure's results.
+
+    Each chunk is fetched on the DB executor with the usual per-call timeout,
+    so memory stays bounded by chunk_size however large the result is. At
+    most ``stream_limit()`` streams run at once; others wait for a slot up
+    to db_pool_timeout_seconds.
+    """
+    settings = get_settings()
+    slots = _get_stream_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), settings.db_pool_timeout_seconds)
+    except asyncio.TimeoutError:
+        raise PoolTimeoutError(
+            f"Timed out after {settings.db_pool_timeout_seconds:.1f}s waiting for a result stream slot"
+        )
+    stream = StoredProcedureStream(sp_name, params, chunk_size or settings.db_stream_chunk_size, compact=compact)
+    try:
+        await run_in_db_executor(stream.open)
+        while True:
+            chunk = await run_in_db_executor(stream.fetch_chunk)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Don't await here: the consumer may be cancelled (client went away)
+        _close_stream(stream, slots)
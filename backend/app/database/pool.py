@@ -0,0 +1,246 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Generator
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class _PooledConnection:
+    """Raw DB-API connection plus the bookkeeping the pool needs."""
+
+    __slots__ = ("conn", "created_at", "uses")
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of reusable DB-API connections.
+
+    Idle connections are handed out LIFO so the warmest one is reused first.
+    A connection is pinged on checkout (when ``pre_ping`` is set) and recycled
+    once it has been used ``max_uses`` times or is older than ``recycle_seconds``.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        recycle_seconds: float = 1800.0,
+        max_uses: int = 1000,
+        pre_ping: bool = True,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle_seconds = recycle_seconds
+        self.max_uses = max_uses
+        self.pre_ping = pre_ping
+
+        self._idle: deque[_PooledConnection] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        # Metrics
+        self._created = 0
+        self._closed_count = 0
+        self._recycled = 0
+        self._ping_failures = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+
+    # ------------------------------------------------------------------
+    # Connection lifecycle
+    # ------------------------------------------------------------------
+
+    def _open(self) -> _PooledConnection:
+        conn = self._connect()
+        with self._cond:
+            self._created += 1
+        return _PooledConnection(conn)
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """Close a connection and free its slot."""
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._closed_count += 1
+            self._cond.notify()
+
+    def _is_expired(self, pooled: _PooledConnection) -> bool:
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return True
+        if self.recycle_seconds and time.monotonic() - pooled.created_at >= self.recycle_seconds:
+            return True
+        return False
+
+    def _ping(self, pooled: _PooledConnection) -> bool:
+        try:
+            cursor = pooled.conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def warm_up(self) -> None:
+        """Open connections until the pool holds ``min_size`` of them."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    # ------------------------------------------------------------------
+    # Checkout / checkin
+    # ------------------------------------------------------------------
+
+    def acquire(self, timeout: float | None = None) -> _PooledConnection:
+        """Check out a healthy connection, opening one if below ``max_size``."""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_from = None
+
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection"
+                        )
+                    if waited_from is None:
+                        waited_from = time.monotonic()
+                        self._waits += 1
+                    self._cond.wait(remaining)
+
+            if pooled is None:
+                try:
+                    pooled = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self._is_expired(pooled):
+                with self._cond:
+                    self._recycled += 1
+                self._discard(pooled)
+                continue
+            elif self.pre_ping and not self._ping(pooled):
+                with self._cond:
+                    self._ping_failures += 1
+                self._discard(pooled)
+                continue
+
+            pooled.uses += 1
+            with self._cond:
+                self._checkouts += 1
+                if waited_from is not None:
+                    self._wait_time += time.monotonic() - waited_from
+            return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it if broken/expired."""
+        if discard or self._closed or self._is_expired(pooled):
+            if not discard and not self._closed:
+                with self._cond:
+                    self._recycled += 1
+            self._discard(pooled)
+            return
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Generator[Any, None, None]:
+        """Check out a connection for the duration of the ``with`` block.
+
+        Whatever was not committed is rolled back before the connection goes
+        back to the pool; a connection that cannot even be rolled back is
+        dropped instead of returned.
+        """
+        pooled = self.acquire(timeout)
+        discard = False
+        try:
+            yield pooled.conn
+        finally:
+            try:
+                pooled.conn.rollback()
+            except Exception:
+                discard = True
+            self.release(pooled, discard=discard)
+
+    def close(self) -> None:
+        """Close all idle connections and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Snapshot of pool gauges and counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "created": self._created,
+                "closed": self._closed_count,
+                "recycled": self._recycled,
+                "ping_failures": self._ping_failures,
+                "checkouts": self._checkouts,
+                "checkout_timeouts": self._timeouts,
+                "checkout_waits": self._waits,
+                "checkout_wait_seconds": round(self._wait_time, 6),
+            }
@@ -0,0 +1,61 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, Iterable, Sequence
+
+
+class Record(tuple):
+    """Compact, read-only row: a named tuple that also reads like the row dicts.
+
+    ``row["column"]``, ``row.get("column")``, ``keys()`` and ``dict(row)``
+    work as they do on the dict rows, so code written against those keeps
+    working; ``row.column`` / ``operator.attrgetter`` is the fast path.
+    """
+
+    __slots__ = ()
+    _columns: tuple[str, ...] = ()
+    _index: dict[str, int] = {}
+    _attrs: dict[str, str] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        if key.__class__ is str:
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def keys(self) -> tuple[str, ...]:
+        return self._columns
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        return zip(self._columns, self)
+
+    def __repr__(self) -> str:
+        return "Record(" + ", ".join(f"{k}={v!r}" for k, v in self.items()) + ")"
+
+
+_RESERVED = frozenset(name for name in dir(Record) if not name.startswith("__"))
+
+
+@lru_cache(maxsize=512)
+def record_type(columns: tuple[str, ...]) -> type[Record]:
+    """Record class for one result-set shape, generated once per column list."""
+    # Columns that aren't identifiers or would shadow a method become _<index> attributes
+    names = ["" if name in _RESERVED else name for name in columns]
+    base = namedtuple("Row", names, rename=True)
+    return type("Record", (Record, base), {
+        "__slots__": (),
+        "_columns": columns,
+        "_index": {name: i for i, name in enumerate(columns)},
+        # Column name -> attribute name (differs only for renamed columns)
+        "_attrs": dict(zip(columns, base._fields)),
+    })
+
+
+def convert_rows(description: Sequence[tuple], rows: list, compact: bool = False) -> list:
+    """Turn driver rows into dicts, or into Records when ``compact`` is set."""
+    columns = tuple(column[0] for column in description)
+    if compact:
+        return list(map(record_type(columns)._make, rows))
+    return [dict(zip(columns, row)) for row in rows]
@@ -0,0 +1,4 @@
+from .backend import SqliteBackend, ProcedureCursor
+from .procedures import ProcedureError
+
+__all__ = ["SqliteBackend", "ProcedureCursor", "ProcedureError"]
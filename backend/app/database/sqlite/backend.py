@@ -0,0 +1,174 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+
+from ..backend import StorageBackend
+from .procedures import PROCEDURES, ProcedureError, ResultSet
+
+SCHEMA_PATH = Path(__file__).with_name("schema.sql")
+
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+class ProcedureCursor:
+    """DB-API cursor that runs procedures from procedures.py.
+
+    Each call runs in its own transaction (BEGIN IMMEDIATE for procedures that
+    write, so writers queue on the busy timeout instead of failing on upgrade)
+    and its result sets are materialized before the transaction ends; the
+    fetch methods and ``nextset`` then read them like pyodbc's. ``execute``
+    runs plain SQL with pyodbc-style positional parameters.
+    """
+
+    arraysize = 1
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._results: list[ResultSet] = []
+        self._index = 0
+        self._position = 0
+        self.rowcount = -1
+
+    @property
+    def description(self) -> tuple | None:
+        result = self._current()
+        return result.description if result is not None else None
+
+    def _current(self) -> ResultSet | None:
+        return self._results[self._index] if self._index < len(self._results) else None
+
+    def _set_results(self, results: list[ResultSet]) -> None:
+        self._results = results
+        self._index = 0
+        self._position = 0
+
+    def execute(self, sql: str, *params: Any) -> "ProcedureCursor":
+        if len(params) == 1 and isinstance(params[0], (list, tuple, dict)):
+            params = params[0]
+        cursor = self._conn.execute(sql, params)
+        try:
+            if cursor.description is None:
+                self._set_results([])
+            else:
+                self._set_results([ResultSet([column[0] for column in cursor.description], cursor.fetchall())])
+            self.rowcount = cursor.rowcount
+        finally:
+            cursor.close()
+        return self
+
+    def callproc(self, sp_name: str, params: dict[str, Any] | None = None) -> None:
+        proc = PROCEDURES.get(sp_name)
+        if proc is None:
+            raise ProcedureError(f"Could not find stored procedure '{sp_name}'")
+        self._conn.execute("BEGIN IMMEDIATE" if proc.writes else "BEGIN")
+        try:
+            results = proc.func(self._conn, **(params or {}))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+        self._set_results(results)
+
+    def fetchone(self) -> tuple | None:
+        result = self._current()
+        if result is None or self._position >= len(result.rows):
+            return None
+        self._position += 1
+        return result.rows[self._position - 1]
+
+    def fetchmany(self, size: int | None = None) -> list[tuple]:
+        result = self._current()
+        if result is None:
+            return []
+        start = self._position
+        self._position = min(start + (size or self.arraysize), len(result.rows))
+        return result.rows[start:self._position]
+
+    def fetchall(self) -> list[tuple]:
+        result = self._current()
+        if result is None:
+            return []
+        start, self._position = self._position, len(result.rows)
+        return result.rows[start:]
+
+    def nextset(self) -> bool:
+        if self._index + 1 >= len(self._results):
+            self._index = len(self._results)
+            return False
+        self._index += 1
+        self._position = 0
+        return True
+
+    def cancel(self) -> None:
+        """Abort the running statement (the procedure then rolls back)."""
+        self._conn.interrupt()
+
+    def close(self) -> None:
+        self._results = []
+
+
+class SqliteBackend(StorageBackend):
+    """Embedded SQLite database with Python ports of the stored procedures.
+
+    For single-node deployments, local development and benchmarks: no server
+    or ODBC driver needed. The database runs in WAL mode so readers never
+    block the single writer; statements are prepared once per connection and
+    reused from its statement cache. The schema (schema.sql) is applied on
+    first connect.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout: float = 5.0, synchronous: str = "NORMAL"):
+        synchronous = synchronous.upper()
+        if synchronous not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"Unknown db_sqlite_synchronous: {synchronous!r} (expected one of {_SYNCHRONOUS_MODES})")
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+        self._schema_applied = False
+        self._schema_lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            # Transactions are explicit (ProcedureCursor); the pool's commit/rollback are no-ops
+            isolation_level=None,
+            # Pooled connections move between executor threads, one at a time
+            check_same_thread=False,
+            cached_statements=256,
+            uri=self.path.startswith("file:"),
+        )
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        self._apply_schema(conn)
+        return conn
+
+    def _apply_schema(self, conn: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if not self._schema_applied:
+                search_columns = {row[0] for row in conn.execute("SELECT name FROM pragma_table_info('TaskSearch')")}
+                if search_columns and "user_id" not in search_columns:
+                    # Search index from before user_id was indexed: recreate it (and its triggers)
+                    conn.executescript("""
+                        DROP TRIGGER IF EXISTS trg_Tasks_Search_Insert;
+                        DROP TRIGGER IF EXISTS trg_Tasks_Search_Update;
+                        DROP TRIGGER IF EXISTS trg_Tasks_Search_Delete;
+                        DROP TABLE TaskSearch;
+                    """)
+                    search_columns = set()
+                conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+                if not search_columns:
+                    # Index the tasks of a database created before the search index existed
+                    conn.execute("INSERT INTO TaskSearch (TaskSearch) VALUES ('rebuild')")
+                self._schema_applied = True
+
+    def cursor(self, conn: sqlite3.Connection) -> ProcedureCursor:
+        return ProcedureCursor(conn)
+
+    def execute(self, cursor: ProcedureCursor, sp_name: str, params: dict[str, Any] | None) -> None:
+        cursor.callproc(sp_name, params)
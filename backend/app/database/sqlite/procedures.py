@@ -0,0 +1,1221 @@
+"""SQLite ports of database/stored_procedures.sql.
+
+Each procedure takes the connection plus the procedure's parameters (by name,
+as passed to ``execute_sp*``) and returns its result sets. They run inside a
+transaction opened by the cursor (see backend.py) and keep the MSSQL
+semantics: same result columns, same defaults, same error messages.
+"""
+import json
+import sqlite3
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Callable, NamedTuple
+
+TAB_COLUMNS = "id, client_id, user_id, name, order_index, is_system, tab_type, created_at, updated_at, is_deleted"
+TASK_COLUMNS = (
+    "id, client_id, user_id, tab_id, parent_task_id, title, description, "
+    "is_completed, due_date, due_time, depth, order_index, "
+    "created_at, updated_at, completed_at, is_deleted"
+)
+T_TASK_COLUMNS = ", ".join(f"t.{column}" for column in TASK_COLUMNS.split(", "))
+
+_DATETIME_COLUMNS = frozenset({
+    "created_at", "updated_at", "completed_at", "last_sync_at", "scheduled_at", "sent_at", "claimed_until",
+    "server_updated_at", "client_updated_at", "last_client_updated_at",
+})
+_BIT_COLUMNS = frozenset({
+    "is_completed", "is_deleted", "is_system", "is_read", "is_sent", "has_incomplete_children",
+    "has_conflict", "is_stable", "success",
+})
+
+
+class ProcedureError(Exception):
+    """Error raised by a procedure (RAISERROR in the MSSQL version)."""
+
+
+class Procedure(NamedTuple):
+    func: Callable[..., list["ResultSet"]]
+    writes: bool
+
+
+PROCEDURES: dict[str, Procedure] = {}
+
+
+def procedure(name: str, writes: bool = False):
+    """Register a procedure; ``writes`` ones run in a BEGIN IMMEDIATE transaction."""
+    def register(func):
+        PROCEDURES[name] = Procedure(func, writes)
+        return func
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Values
+# ---------------------------------------------------------------------------
+
+def _to_datetime(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _to_date(value: str | None) -> date | None:
+    return date.fromisoformat(value) if value is not None else None
+
+
+def _to_time(value: str | None) -> time | None:
+    return time.fromisoformat(value) if value is not None else None
+
+
+def _to_bool(value: Any) -> bool | None:
+    return bool(value) if value is not None else None
+
+
+def _converter(column: str) -> Callable[[Any], Any] | None:
+    """Python type of a result column, as pyodbc would return it."""
+    if column in _DATETIME_COLUMNS:
+        return _to_datetime
+    if column in _BIT_COLUMNS:
+        return _to_bool
+    if column == "due_date":
+        return _to_date
+    if column == "due_time":
+        return _to_time
+    return None
+
+
+class ResultSet:
+    """A materialized result set with a DB-API ``description``."""
+
+    __slots__ = ("columns", "rows", "description")
+
+    def __init__(self, columns: list[str], rows: list[tuple]):
+        converters = [(i, conv) for i, column in enumerate(columns) if (conv := _converter(column))]
+        if converters and rows:
+            converted = []
+            for row in rows:
+                row = list(row)
+                for i, conv in converters:
+                    row[i] = conv(row[i])
+                converted.append(tuple(row))
+            rows = converted
+        self.columns = columns
+        self.rows = rows
+        self.description = tuple((column, None, None, None, None, None, True) for column in columns)
+
+
+def query(db: sqlite3.Connection, sql: str, params: Any = ()) -> ResultSet:
+    """Run a SELECT (or ... RETURNING) and materialize it."""
+    cursor = db.execute(sql, params)
+    try:
+        return ResultSet([column[0] for column in cursor.description], cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _scalar(db: sqlite3.Connection, sql: str, params: Any = ()) -> Any:
+    row = db.execute(sql, params).fetchone()
+    return row[0] if row else None
+
+
+def _affected(count: int) -> ResultSet:
+    return ResultSet(["affected_rows"], [(count,)])
+
+
+def ts(value: datetime | str | None) -> str | None:
+    """DATETIME2 parameter as stored text (aware values are converted to UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _date(value: date | str | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    return value.isoformat()
+
+
+def _time(value: time | str | None) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return value.isoformat()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _json_ids(value: str | None) -> str:
+    """An id-list parameter as a JSON array (NULL/invalid -> empty, as OPENJSON would skip it)."""
+    return value if value else "[]"
+
+
+# ---------------------------------------------------------------------------
+# Users and tabs
+# ---------------------------------------------------------------------------
+
+@procedure("sp_UpsertUser", writes=True)
+def upsert_user(db, google_id: str, email: str, name: str, avatar_url: str | None = None) -> list[ResultSet]:
+    user_id = _scalar(db, "SELECT id FROM Users WHERE google_id = ?", (google_id,))
+    if user_id is None:
+        user_id = db.execute(
+            "INSERT INTO Users (google_id, email, name, avatar_url) VALUES (?, ?, ?, ?)",
+            (google_id, email, name, avatar_url),
+        ).lastrowid
+        # Default system tabs for a new user
+        db.executemany(
+            "INSERT INTO Tabs (client_id, user_id, name, order_index, is_system, tab_type) VALUES (?, ?, ?, ?, 1, ?)",
+            [
+                (str(uuid.uuid4()).upper(), user_id, "დღეს", 0, "today"),
+                (str(uuid.uuid4()).upper(), user_id, "ყველა", 1, "all_tasks"),
+            ],
+        )
+    else:
+        db.execute(
+            "UPDATE Users SET email = ?, name = ?, avatar_url = COALESCE(?, avatar_url), updated_at = ? WHERE id = ?",
+            (email, name, avatar_url, ts(_utcnow()), user_id),
+        )
+    return [query(db, "SELECT id, google_id, email, name, avatar_url, created_at, updated_at FROM Users WHERE id = ?",
+                  (user_id,))]
+
+
+@procedure("sp_GetUserTabs")
+def get_user_tabs(db, user_id: int) -> list[ResultSet]:
+    return [query(db, f"SELECT {TAB_COLUMNS} FROM Tabs WHERE user_id = ? AND is_deleted = 0 ORDER BY order_index",
+                  (user_id,))]
+
+
+@procedure("sp_GetUserDataVersion")
+def get_user_data_version(db, user_id: int) -> list[ResultSet]:
+    # One writer at a time: every change_seq in the snapshot is committed, so the version is stable
+    return [query(db, """
+        SELECT MAX(COALESCE((SELECT MAX(change_seq) FROM Tabs WHERE user_id = :user_id), 0),
+                   COALESCE((SELECT MAX(change_seq) FROM Tasks WHERE user_id = :user_id), 0)) AS data_version,
+               1 AS is_stable
+    """, {"user_id": user_id})]
+
+
+@procedure("sp_CreateTab", writes=True)
+def create_tab(db, client_id: str, user_id: int, name: str, order_index: int | None = None) -> list[ResultSet]:
+    if order_index is None:
+        order_index = _scalar(
+            db, "SELECT COALESCE(MAX(order_index), 0) + 1 FROM Tabs WHERE user_id = ? AND is_deleted = 0", (user_id,),
+        )
+    tab_id = db.execute(
+        "INSERT INTO Tabs (client_id, user_id, name, order_index, is_system, tab_type) VALUES (?, ?, ?, ?, 0, 'custom')",
+        (client_id, user_id, name, order_index),
+    ).lastrowid
+    return [query(db, f"SELECT {TAB_COLUMNS} FROM Tabs WHERE id = ?", (tab_id,))]
+
+
+@procedure("sp_UpdateTab", writes=True)
+def update_tab(db, tab_id: int, user_id: int, name: str | None = None, order_index: int | None = None) -> list[ResultSet]:
+    db.execute("""
+        UPDATE Tabs
+        SET name = COALESCE(:name, name), order_index = COALESCE(:order_index, order_index), updated_at = :now
+        WHERE id = :tab_id AND user_id = :user_id AND is_system = 0
+    """, {"name": name, "order_index": order_index, "now": ts(_utcnow()), "tab_id": tab_id, "user_id": user_id})
+    return [query(db, f"SELECT {TAB_COLUMNS} FROM Tabs WHERE id = ?", (tab_id,))]
+
+
+@procedure("sp_DeleteTab", writes=True)
+def delete_tab(db, tab_id: int, user_id: int) -> list[ResultSet]:
+    now = ts(_utcnow())
+    db.execute(
+        "UPDATE Tabs SET is_deleted = 1, updated_at = ? WHERE id = ? AND user_id = ? AND is_system = 0",
+        (now, tab_id, user_id),
+    )
+    # Tasks of the deleted tab move to no tab; the count returned is theirs, as in MSSQL (@@ROWCOUNT)
+    moved = db.execute("UPDATE Tasks SET tab_id = NULL, updated_at = ? WHERE tab_id = ?", (now, tab_id)).rowcount
+    return [_affected(moved)]
+
+
+# ---------------------------------------------------------------------------
+# Tasks
+# ---------------------------------------------------------------------------
+
+@procedure("sp_CreateTask", writes=True)
+def create_task(
+    db, client_id: str, user_id: int, title: str, tab_id: int | None = None, parent_task_id: int | None = None,
+    description: str | None = None, due_date: date | None = None, due_time: time | None = None,
+) -> list[ResultSet]:
+    depth = 0
+    root_task_id = None
+    if parent_task_id is not None:
+        parent = db.execute(
+            "SELECT depth + 1, COALESCE(root_task_id, id) FROM Tasks WHERE id = ? AND user_id = ?",
+            (parent_task_id, user_id),
+        ).fetchone()
+        if parent:
+            depth, root_task_id = parent
+        if depth > 2:
+            raise ProcedureError("მაქსიმალური სიღრმე არის 3 დონე")
+        if tab_id is None:
+            tab_id = _scalar(db, "SELECT tab_id FROM Tasks WHERE id = ?", (parent_task_id,))
+
+    order_index = _scalar(db, """
+        SELECT COALESCE(MAX(order_index), 0) + 1 FROM Tasks
+        WHERE user_id = ? AND COALESCE(parent_task_id, 0) = COALESCE(?, 0) AND is_deleted = 0
+    """, (user_id, parent_task_id))
+    task_id = db.execute("""
+        INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description,
+                           due_date, due_time, depth, order_index)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description,
+          _date(due_date), _time(due_time), depth, order_index)).lastrowid
+    return [query(db, f"SELECT {TASK_COLUMNS} FROM Tasks WHERE id = ?", (task_id,))]
+
+
+@procedure("sp_CompleteTask", writes=True)
+def complete_task(db, task_id: int, user_id: int, is_completed: bool) -> list[ResultSet]:
+    now = ts(_utcnow())
+    is_completed = 1 if is_completed else 0
+    parent_task_id = root_task_id = None
+    row = db.execute("SELECT parent_task_id, root_task_id FROM Tasks WHERE id = ? AND user_id = ?",
+                     (task_id, user_id)).fetchone()
+    if row:
+        parent_task_id, root_task_id = row
+
+    has_incomplete_children = 0
+    if is_completed:
+        has_incomplete_children = 1 if db.execute(
+            "SELECT 1 FROM Tasks WHERE parent_task_id = ? AND is_completed = 0 AND is_deleted = 0", (task_id,),
+        ).fetchone() else 0
+
+    db.execute("""
+        UPDATE Tasks
+        SET is_completed = :is_completed,
+            completed_at = CASE WHEN :is_completed = 1 THEN :now END,
+            updated_at = :now
+        WHERE id = :task_id AND user_id = :user_id
+    """, {"is_completed": is_completed, "now": now, "task_id": task_id, "user_id": user_id})
+
+    if is_completed and parent_task_id is not None:
+        # Auto-complete the parent once all its children are complete
+        if not db.execute(
+            "SELECT 1 FROM Tasks WHERE parent_task_id = ? AND is_completed = 0 AND is_deleted = 0", (parent_task_id,),
+        ).fetchone():
+            db.execute("UPDATE Tasks SET is_completed = 1, completed_at = ?, updated_at = ? WHERE id = ?",
+                       (now, now, parent_task_id))
+
+    if not is_completed and parent_task_id is not None:
+        # Uncomplete the parent chain (at most the parent and the root)
+        db.execute("UPDATE Tasks SET is_completed = 0, completed_at = NULL, updated_at = ? WHERE id IN (?, ?)",
+                   (now, parent_task_id, root_task_id))
+
+    return [query(db, f"SELECT {TASK_COLUMNS}, ? AS has_incomplete_children FROM Tasks WHERE id = ?",
+                  (has_incomplete_children, task_id))]
+
+
+# Children come from root_task_id; a depth-2 child is kept only if its parent passes the
+# same filters ({child_filter} is applied to the child and, for depth 2, to the parent p).
+_HIERARCHY = f"""
+    WITH Roots AS (
+        SELECT {T_TASK_COLUMNS} FROM Tasks t
+        WHERE t.user_id = :user_id AND t.is_deleted = 0 AND t.parent_task_id IS NULL AND {{root_filter}}
+    ),
+    TaskHierarchy AS (
+        SELECT r.*, 0 AS level FROM Roots r
+        UNION ALL
+        SELECT {T_TASK_COLUMNS}, t.depth FROM Roots r
+        INNER JOIN Tasks t ON t.root_task_id = r.id
+        LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
+        WHERE t.is_deleted = 0 AND {{child_filter}}
+    )
+    SELECT {TASK_COLUMNS}, level FROM TaskHierarchy
+    ORDER BY {{order_by}}
+"""
+
+_TODAY_TASKS = _HIERARCHY.format(
+    root_filter="(t.due_date <= date('now') OR t.due_date IS NULL) AND t.is_completed = 0",
+    child_filter="(t.depth = 1 OR p.is_deleted = 0)",
+    order_by="CASE WHEN due_date IS NULL THEN 1 ELSE 0 END, due_date, order_index",
+)
+_TASKS_BY_TAB = _HIERARCHY.format(
+    root_filter="(:tab_id IS NULL OR t.tab_id = :tab_id) AND (:include_completed = 1 OR t.is_completed = 0)",
+    child_filter=(
+        "(:include_completed = 1 OR t.is_completed = 0) "
+        "AND (t.depth = 1 OR (p.is_deleted = 0 AND (:include_completed = 1 OR p.is_completed = 0)))"
+    ),
+    order_by="level, order_index",
+)
+_ALL_TASKS = _HIERARCHY.format(
+    root_filter="(:include_completed = 1 OR t.is_completed = 0)",
+    child_filter="(t.depth = 1 OR p.is_deleted = 0)",
+    order_by="is_completed, level, order_index",
+)
+
+
+@procedure("sp_GetTodayTasks")
+def get_today_tasks(db, user_id: int) -> list[ResultSet]:
+    return [query(db, _TODAY_TASKS, {"user_id": user_id})]
+
+
+@procedure("sp_GetTasksByTab")
+def get_tasks_by_tab(db, user_id: int, tab_id: int | None = None, include_completed: bool = False) -> list[ResultSet]:
+    return [query(db, _TASKS_BY_TAB, {
+        "user_id": user_id, "tab_id": tab_id, "include_completed": 1 if include_completed else 0,
+    })]
+
+
+@procedure("sp_GetAllTasks")
+def get_all_tasks(db, user_id: int, include_completed: bool = True) -> list[ResultSet]:
+    return [query(db, _ALL_TASKS, {"user_id": user_id, "include_completed": 1 if include_completed else 0})]
+
+
+@procedure("sp_UpdateTask", writes=True)
+def update_task(
+    db, task_id: int, user_id: int, title: str | None = None, description: str | None = None,
+    due_date: date | None = None, due_time: time | None = None, tab_id: int | None = None,
+) -> list[ResultSet]:
+    db.execute("""
+        UPDATE Tasks
+        SET title = COALESCE(:title, title),
+            description = COALESCE(:description, description),
+            due_date = :due_date,
+            due_time = :due_time,
+            tab_id = COALESCE(:tab_id, tab_id),
+            updated_at = :now
+        WHERE id = :task_id AND user_id = :user_id
+    """, {
+        "title": title, "description": description, "due_date": _date(due_date), "due_time": _time(due_time),
+        "tab_id": tab_id, "now": ts(_utcnow()), "task_id": task_id, "user_id": user_id,
+    })
+    return [query(db, f"SELECT {TASK_COLUMNS} FROM Tasks WHERE id = ?", (task_id,))]
+
+
+@procedure("sp_DeleteTask", writes=True)
+def delete_task(db, task_id: int, user_id: int) -> list[ResultSet]:
+    # The task and its descendants (below a root: root_task_id; below depth 1: parent_task_id)
+    count = db.execute("""
+        UPDATE Tasks SET is_deleted = 1, updated_at = :now
+        WHERE user_id = :user_id AND (id = :task_id OR root_task_id = :task_id OR parent_task_id = :task_id)
+    """, {"now": ts(_utcnow()), "user_id": user_id, "task_id": task_id}).rowcount
+    return [_affected(count)]
+
+
+@procedure("sp_MoveTask", writes=True)
+def move_task(db, task_id: int, user_id: int, new_tab_id: int) -> list[ResultSet]:
+    db.execute("""
+        UPDATE Tasks SET tab_id = :new_tab_id, updated_at = :now
+        WHERE user_id = :user_id AND (id = :task_id OR root_task_id = :task_id OR parent_task_id = :task_id)
+    """, {"new_tab_id": new_tab_id, "now": ts(_utcnow()), "user_id": user_id, "task_id": task_id})
+    return [query(db, f"SELECT {TASK_COLUMNS} FROM Tasks WHERE id = ?", (task_id,))]
+
+
+# ---------------------------------------------------------------------------
+# Bulk tasks (@task_ids: JSON array; ids that aren't the user's, or are deleted, are ignored)
+# ---------------------------------------------------------------------------
+
+_SELECTED_TASKS = f"""
+    SELECT {T_TASK_COLUMNS} FROM Tasks t
+    WHERE t.id IN (SELECT value FROM json_each(:ids))
+    ORDER BY t.order_index, t.id
+"""
+
+
+@procedure("sp_CompleteTasks", writes=True)
+def complete_tasks(db, user_id: int, task_ids: str, is_completed: bool) -> list[ResultSet]:
+    now = ts(_utcnow())
+    selected = db.execute("""
+        SELECT DISTINCT t.id, t.parent_task_id, t.root_task_id
+        FROM json_each(:task_ids) j
+        INNER JOIN Tasks t ON t.id = CAST(j.value AS INTEGER)
+        WHERE t.user_id = :user_id AND t.is_deleted = 0
+    """, {"task_ids": _json_ids(task_ids), "user_id": user_id}).fetchall()
+    ids = json.dumps([row[0] for row in selected])
+    parents = json.dumps([row[1] for row in selected if row[1] is not None])
+
+    db.execute("""
+        UPDATE Tasks
+        SET is_completed = :is_completed,
+            completed_at = CASE WHEN :is_completed = 1 THEN :now END,
+            updated_at = :now
+        WHERE id IN (SELECT value FROM json_each(:ids))
+    """, {"is_completed": 1 if is_completed else 0, "now": now, "ids": ids})
+
+    if is_completed:
+        # Auto-complete parents whose children are now all complete
+        db.execute("""
+            UPDATE Tasks
+            SET is_completed = 1, completed_at = :now, updated_at = :now
+            WHERE id IN (SELECT value FROM json_each(:parents))
+              AND is_completed = 0
+              AND NOT EXISTS (
+                  SELECT 1 FROM Tasks c
+                  WHERE c.parent_task_id = Tasks.id AND c.is_completed = 0 AND c.is_deleted = 0
+              )
+        """, {"now": now, "parents": parents})
+    else:
+        # Uncomplete every parent chain: each task's parent and root
+        chains = json.dumps([row[1] for row in selected if row[1] is not None] +
+                            [row[2] for row in selected if row[2] is not None])
+        db.execute("""
+            UPDATE Tasks SET is_completed = 0, completed_at = NULL, updated_at = :now
+            WHERE id IN (SELECT value FROM json_each(:chains)) AND is_completed = 1
+        """, {"now": now, "chains": chains})
+
+    return [query(db, _SELECTED_TASKS, {"ids": ids})]
+
+
+@procedure("sp_MoveTasks", writes=True)
+def move_tasks(db, user_id: int, task_ids: str, new_tab_id: int) -> list[ResultSet]:
+    # Only into one of the user's own tabs
+    if not db.execute("SELECT 1 FROM Tabs WHERE id = ? AND user_id = ? AND is_deleted = 0",
+                      (new_tab_id, user_id)).fetchone():
+        return [query(db, f"SELECT {TASK_COLUMNS} FROM Tasks WHERE 0")]
+
+    ids = json.dumps([row[0] for row in db.execute("""
+        SELECT DISTINCT t.id
+        FROM json_each(:task_ids) j
+        INNER JOIN Tasks t ON t.id = CAST(j.value AS INTEGER)
+        WHERE t.user_id = :user_id AND t.is_deleted = 0
+    """, {"task_ids": _json_ids(task_ids), "user_id": user_id})])
+    db.execute("""
+        UPDATE Tasks SET tab_id = :new_tab_id, updated_at = :now
+        WHERE id IN (SELECT value FROM json_each(:ids))
+           OR root_task_id IN (SELECT value FROM json_each(:ids))
+           OR parent_task_id IN (SELECT value FROM json_each(:ids))
+    """, {"new_tab_id": new_tab_id, "now": ts(_utcnow()), "ids": ids})
+    return [query(db, _SELECTED_TASKS, {"ids": ids})]
+
+
+@procedure("sp_DeleteTasks", writes=True)
+def delete_tasks(db, user_id: int, task_ids: str) -> list[ResultSet]:
+    ids = json.dumps([row[0] for row in db.execute("""
+        SELECT t.id FROM json_each(:task_ids) j
+        INNER JOIN Tasks t ON t.id = CAST(j.value AS INTEGER)
+        WHERE t.user_id = :user_id
+    """, {"task_ids": _json_ids(task_ids), "user_id": user_id})])
+    count = db.execute("""
+        UPDATE Tasks SET is_deleted = 1, updated_at = :now
+        WHERE (id IN (SELECT value FROM json_each(:ids))
+               OR root_task_id IN (SELECT value FROM json_each(:ids))
+               OR parent_task_id IN (SELECT value FROM json_each(:ids)))
+          AND is_deleted = 0
+    """, {"ids": ids, "now": ts(_utcnow())}).rowcount
+    return [_affected(count)]
+
+
+@procedure("sp_ReorderTasks", writes=True)
+def reorder_tasks(db, user_id: int, task_ids: str) -> list[ResultSet]:
+    # Ids in the desired order get order_index 1, 2, 3, ...
+    count = db.execute("""
+        UPDATE Tasks SET order_index = j.key + 1, updated_at = :now
+        FROM json_each(:task_ids) j
+        WHERE Tasks.id = CAST(j.value AS INTEGER)
+          AND Tasks.user_id = :user_id AND Tasks.is_deleted = 0 AND Tasks.order_index <> j.key + 1
+    """, {"task_ids": _json_ids(task_ids), "user_id": user_id, "now": ts(_utcnow())}).rowcount
+    return [_affected(count)]
+
+
+# ---------------------------------------------------------------------------
+# Task search (TaskSearch is an FTS5 index over Tasks, see schema.sql)
+# ---------------------------------------------------------------------------
+
+@procedure("sp_SearchTasks")
+def search_tasks(
+    db, user_id: int, terms: str, tab_id: int | None = None, is_completed: bool | None = None,
+    due_from: date | str | None = None, due_to: date | str | None = None, offset: int = 0, limit: int = 50,
+) -> list[ResultSet]:
+    # Every word as a prefix, within the user's rows:
+    # 'user_id:"7" AND {title description}:("plan"* AND "trip"*)'; bm25 weighs title matches 3x the description
+    words = [word.replace('"', "") for word in json.loads(terms)]
+    condition = " AND ".join(f'"{word}"*' for word in words if word)
+    condition = f'user_id:"{int(user_id)}" AND {{title description}}:({condition})'
+    return [query(db, f"""
+        WITH Matches AS (
+            -- bm25() only works in the full-text query itself, not next to the window function
+            SELECT rowid AS id, -bm25(TaskSearch, 3.0, 1.0, 0.0) AS score FROM TaskSearch WHERE TaskSearch MATCH :condition
+        )
+        SELECT {T_TASK_COLUMNS}, m.score, COUNT(*) OVER () AS total_count
+        -- CROSS JOIN keeps the full-text match as the outer loop; otherwise the planner may seek
+        -- the user's tasks by index and re-run the match once per task
+        FROM Matches m
+        CROSS JOIN Tasks t
+        WHERE t.id = m.id
+          AND t.user_id = :user_id
+          AND t.is_deleted = 0
+          AND (:tab_id IS NULL OR t.tab_id = :tab_id)
+          AND (:is_completed IS NULL OR t.is_completed = :is_completed)
+          AND (:due_from IS NULL OR t.due_date >= :due_from)
+          AND (:due_to IS NULL OR t.due_date <= :due_to)
+        ORDER BY m.score DESC, t.is_completed, t.updated_at DESC, t.id
+        LIMIT :limit OFFSET :offset
+    """, {
+        "condition": condition, "user_id": user_id, "tab_id": tab_id,
+        "is_completed": None if is_completed is None else int(is_completed),
+        "due_from": _date(due_from), "due_to": _date(due_to), "offset": offset, "limit": limit,
+    })]
+
+
+# ---------------------------------------------------------------------------
+# Sync pull
+# ---------------------------------------------------------------------------
+
+_EPOCH = "1900-01-01 00:00:00.000000"
+
+
+def _log_sync(db, user_id: int, device_id: str, sync_type: str, items_synced: int) -> None:
+    db.execute(
+        "INSERT INTO SyncLog (user_id, device_id, last_sync_at, sync_type, items_synced) VALUES (?, ?, ?, ?, ?)",
+        (user_id, device_id, ts(_utcnow()), sync_type, items_synced),
+    )
+
+
+@procedure("sp_SyncPull", writes=True)
+def sync_pull(db, user_id: int, device_id: str, last_sync_at: datetime | None = None) -> list[ResultSet]:
+    params = {"user_id": user_id, "last_sync_at": ts(last_sync_at) or _EPOCH}
+    tabs = query(db, f"""
+        SELECT {TAB_COLUMNS}, 'tab' AS entity_type FROM Tabs
+        WHERE user_id = :user_id AND updated_at > :last_sync_at
+    """, params)
+    tasks = query(db, f"""
+        SELECT {TASK_COLUMNS}, 'task' AS entity_type FROM Tasks
+        WHERE user_id = :user_id AND updated_at > :last_sync_at
+    """, params)
+    _log_sync(db, user_id, device_id, "pull", len(tabs.rows) + len(tasks.rows))
+    return [tabs, tasks]
+
+
+@procedure("sp_SyncPullPage", writes=True)
+def sync_pull_page(
+    db, user_id: int, device_id: str, last_sync_at: datetime | str | None = None, entity_type: str = "tab",
+    after_updated_at: datetime | str | None = None, after_id: int | None = None, page_size: int = 500,
+) -> list[ResultSet]:
+    last_sync_at = ts(last_sync_at) or _EPOCH
+    # Rows strictly after (lower, lower_id); with no cursor only updated_at > last_sync_at counts
+    lower = ts(after_updated_at) or last_sync_at
+    lower_id = 2147483647 if after_updated_at is None else after_id
+
+    if entity_type == "tab":
+        tabs = query(db, f"""
+            SELECT {TAB_COLUMNS}, replace(updated_at, ' ', 'T') AS cursor_updated_at, 'tab' AS entity_type
+            FROM Tabs
+            WHERE user_id = :user_id AND updated_at >= :lower AND (updated_at > :lower OR id > :lower_id)
+            ORDER BY updated_at, id
+            LIMIT :limit
+        """, {"user_id": user_id, "lower": lower, "lower_id": lower_id, "limit": page_size + 1})
+        # Tasks stream starts from the beginning
+        lower, lower_id = last_sync_at, 2147483647
+    else:
+        tabs = query(db, f"""
+            SELECT {TAB_COLUMNS}, updated_at AS cursor_updated_at, 'tab' AS entity_type FROM Tabs WHERE 0
+        """)
+    tab_count = len(tabs.rows)
+
+    # Fill the rest of the page with tasks (one probe row even if the page is full)
+    task_limit = 0 if tab_count > page_size else page_size - tab_count + 1
+    tasks = query(db, f"""
+        SELECT {TASK_COLUMNS}, replace(updated_at, ' ', 'T') AS cursor_updated_at, 'task' AS entity_type
+        FROM Tasks
+        WHERE user_id = :user_id AND updated_at >= :lower AND (updated_at > :lower OR id > :lower_id)
+        ORDER BY updated_at, id
+        LIMIT :limit
+    """, {"user_id": user_id, "lower": lower, "lower_id": lower_id, "limit": task_limit})
+    task_count = len(tasks.rows)
+
+    # Log the page (probe rows excluded)
+    if tab_count > page_size:
+        items_synced = page_size
+    elif task_count >= task_limit:
+        items_synced = tab_count + task_limit - 1
+    else:
+        items_synced = tab_count + task_count
+    _log_sync(db, user_id, device_id, "pull", items_synced)
+    return [tabs, tasks]
+
+
+@procedure("sp_SyncPullSince", writes=True)
+def sync_pull_since(
+    db, user_id: int, device_id: str, since_seq: int = 0, page_size: int = 500, delta: bool = False,
+) -> list[ResultSet]:
+    # Writers are serialized, so everything up to the current sequence value is committed
+    max_seq = query(db, "SELECT value AS max_seq FROM Sequences WHERE name = 'change_seq'")
+    params = {"user_id": user_id, "since_seq": since_seq or 0, "delta": 1 if delta else 0, "limit": page_size + 1}
+
+    tabs = query(db, f"""
+        SELECT t.id, t.client_id, t.user_id, t.name, t.order_index, t.is_system, t.tab_type,
+               t.created_at, t.updated_at, t.is_deleted, t.change_seq, 'tab' AS entity_type,
+               (SELECT group_concat(fv.field_name, ',') FROM FieldVersions fv
+                WHERE :delta = 1 AND fv.entity_type = 'tab' AND fv.entity_id = t.id AND fv.change_seq > :since_seq
+               ) AS changed_fields
+        FROM Tabs t
+        WHERE t.user_id = :user_id AND t.change_seq > :since_seq
+        ORDER BY t.change_seq
+        LIMIT :limit
+    """, params)
+    tasks = query(db, f"""
+        SELECT id, client_id, user_id, tab_id, parent_task_id, title,
+               -- Delta pulls leave an unchanged description in the database
+               CASE WHEN :delta = 0 OR ',' || changed_fields || ',' LIKE '%,description,%'
+                    THEN description END AS description,
+               is_completed, due_date, due_time, depth, order_index,
+               created_at, updated_at, completed_at, is_deleted, change_seq, 'task' AS entity_type,
+               changed_fields
+        FROM (
+            SELECT t.*,
+                   (SELECT group_concat(fv.field_name, ',') FROM FieldVersions fv
+                    WHERE :delta = 1 AND fv.entity_type = 'task' AND fv.entity_id = t.id
+                      AND fv.change_seq > :since_seq
+                   ) AS changed_fields
+            FROM Tasks t
+            WHERE t.user_id = :user_id AND t.change_seq > :since_seq
+            ORDER BY t.change_seq
+            LIMIT :limit
+        )
+        ORDER BY change_seq
+    """, params)
+
+    # Rows the caller keeps: at most one page
+    _log_sync(db, user_id, device_id, "pull", min(len(tabs.rows) + len(tasks.rows), page_size))
+    return [max_seq, tabs, tasks]
+
+
+# ---------------------------------------------------------------------------
+# Sync push (sp_SyncApplyItems)
+# ---------------------------------------------------------------------------
+
+_INT_FIELDS = ("tab_id", "parent_task_id", "order_index")
+_TEXT_LIMITS = {"name": 255, "title": 1000, "tab_client_id": 36, "parent_client_id": 36}
+
+
+def _json_text(value: Any) -> str | None:
+    """A JSON value as OPENJSON returns it (scalars as text, objects/arrays as JSON)."""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _try_bit(text: str) -> int | None:
+    """TRY_CAST(text AS BIT)."""
+    lowered = text.strip().lower()
+    if lowered in ("true", "false"):
+        return 1 if lowered == "true" else 0
+    try:
+        return 1 if float(lowered) != 0 else 0
+    except ValueError:
+        return None
+
+
+def _try_int(text: str) -> int | None:
+    try:
+        value = int(text.strip())
+    except ValueError:
+        return None
+    return value if -2147483648 <= value <= 2147483647 else None
+
+
+def _try_date(text: str) -> str | None:
+    try:
+        return date.fromisoformat(text.strip()).isoformat()
+    except ValueError:
+        try:
+            return datetime.fromisoformat(text.strip()).date().isoformat()
+        except ValueError:
+            return None
+
+
+def _try_time(text: str) -> str | None:
+    try:
+        return time.fromisoformat(text.strip()).isoformat()
+    except ValueError:
+        return None
+
+
+_CASTS = {
+    "is_completed": _try_bit, "is_deleted": _try_bit,
+    "tab_id": _try_int, "parent_task_id": _try_int, "order_index": _try_int,
+    "due_date": _try_date, "due_time": _try_time,
+}
+_PAYLOAD_KEYS = ("name", "title", "description", "is_completed", "due_date", "due_time", "tab_id",
+                 "parent_task_id", "tab_client_id", "parent_client_id", "order_index", "is_deleted")
+
+
+def _is_json(data: str) -> bool:
+    """ISJSON: an object or array."""
+    try:
+        return isinstance(json.loads(data), (dict, list))
+    except ValueError:
+        return False
+
+
+def _fields(data: str | None) -> dict[str, Any]:
+    """Flatten a payload; ``has_<key>`` tells an absent key from an explicit null."""
+    payload = json.loads(data) if data is not None else None
+    if not isinstance(payload, dict):
+        payload = {}
+    fields: dict[str, Any] = {"is_valid": True}
+    for key in _PAYLOAD_KEYS:
+        text = _json_text(payload.get(key))
+        fields[f"has_{key}"] = key in payload
+        cast = _CASTS.get(key)
+        value = cast(text) if cast and text is not None else text
+        if text is not None and value is None:
+            fields["is_valid"] = False
+        limit = _TEXT_LIMITS.get(key)
+        if limit and text is not None and len(text.rstrip(" ")) > limit:
+            fields["is_valid"] = False
+        fields[key] = value
+    fields["keys"] = list(payload)
+    return fields
+
+
+def _blank(value: str | None) -> bool:
+    return value is None or value.strip(" ") == ""
+
+
+def _row(db, sql: str, params: Any) -> dict | None:
+    cursor = db.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    row = cursor.fetchone()
+    return dict(zip(columns, row)) if row else None
+
+
+def apply_items(db, user_id: int, items: list[dict], force: bool = False) -> None:
+    """sp_SyncApplyItems: upsert pushed items by client_id and set status/reason on each.
+
+    ``items`` carry item_index, client_id, entity_type, data (JSON text),
+    client_updated_at (stored text) and base_seq; see stored_procedures.sql
+    for the statuses and reasons.
+    """
+    now = ts(_utcnow())
+    for item in items:
+        item.update(status=None, reason=None, entity_id=None, server_updated_at=None, conflict_fields=None)
+
+    # The last item for an entity wins; earlier ones copy its status at the end
+    last: dict[tuple[str, str], dict] = {}
+    for item in sorted(items, key=lambda i: i["item_index"]):
+        last[item["entity_type"], item["client_id"]] = item
+    for item in items:
+        if last[item["entity_type"], item["client_id"]] is not item:
+            item["status"] = "superseded"
+
+    def pending(entity_type: str | None = None) -> list[dict]:
+        return [i for i in items if i["status"] is None and (entity_type is None or i["entity_type"] == entity_type)]
+
+    def reject(item: dict, reason: str) -> None:
+        item["status"], item["reason"] = "rejected", reason
+
+    for item in pending():
+        if item["entity_type"] not in ("tab", "task"):
+            reject(item, "unknown_entity_type")
+        elif item["data"] is not None and not _is_json(item["data"]):
+            reject(item, "invalid_json")
+
+    fields = {item["item_index"]: _fields(item["data"]) for item in pending()}
+    for item in pending():
+        if not fields[item["item_index"]]["is_valid"]:
+            reject(item, "invalid_data")
+
+    # Per-field conflicts: payload keys the server changed after the patch's base_seq
+    if not force:
+        for item in pending():
+            if item["base_seq"] is None:
+                continue
+            table = "Tabs" if item["entity_type"] == "tab" else "Tasks"
+            entity_id = _scalar(db, f"SELECT id FROM {table} WHERE client_id = ? AND user_id = ?",
+                                (item["client_id"], user_id))
+            names = [{"tab_client_id": "tab_id", "parent_client_id": "parent_task_id"}.get(key, key)
+                     for key in fields[item["item_index"]]["keys"]]
+            changed = {row[0] for row in db.execute(
+                "SELECT field_name FROM FieldVersions WHERE entity_type = ? AND entity_id = ? AND change_seq > ?",
+                (item["entity_type"], entity_id, item["base_seq"]),
+            )} if entity_id is not None else set()
+            conflicting = [name for name in names if name in changed]
+            item["conflict_fields"] = ",".join(conflicting) if conflicting else None
+
+    # Locate existing rows (client_id is unique across all users) and classify them
+    for item in pending():
+        table = "Tabs" if item["entity_type"] == "tab" else "Tasks"
+        system = "is_system" if table == "Tabs" else "0 AS is_system"
+        existing = _row(db, f"SELECT id, user_id, updated_at, last_client_updated_at, {system} FROM {table} "
+                            "WHERE client_id = ?", (item["client_id"],))
+        if existing is None:
+            continue
+        own = existing["user_id"] == user_id
+        item["entity_id"] = existing["id"] if own else None
+        item["server_updated_at"] = existing["updated_at"] if own else None
+        if not own:
+            item["status"], item["reason"] = "rejected", "not_owner"
+        elif existing["last_client_updated_at"] == item["client_updated_at"]:
+            item["status"], item["reason"] = "applied", "duplicate"
+        elif not force and item["base_seq"] is None and existing["updated_at"] > item["client_updated_at"]:
+            item["status"] = "conflict"
+        elif item["conflict_fields"] is not None:
+            item["status"] = "conflict"
+        elif existing["is_system"]:
+            item["status"], item["reason"] = "rejected", "system_tab"
+
+    _apply_tabs(db, user_id, pending("tab"), fields, now)
+    _apply_tasks(db, user_id, pending, fields, now)
+
+    # Earlier duplicates report the outcome of the item that superseded them
+    for item in items:
+        if item["status"] == "superseded":
+            winner = last[item["entity_type"], item["client_id"]]
+            item.update(
+                status=winner["status"], reason=winner["reason"] or "superseded",
+                entity_id=winner["entity_id"], server_updated_at=winner["server_updated_at"],
+            )
+
+
+def _apply_tabs(db, user_id: int, tabs: list[dict], fields: dict[int, dict], now: str) -> None:
+    for item in tabs:
+        if item["entity_id"] is None and _blank(fields[item["item_index"]]["name"]):
+            item["status"], item["reason"] = "rejected", "missing_name"
+    tabs = [item for item in tabs if item["status"] is None]
+
+    for item in tabs:
+        f = fields[item["item_index"]]
+        if item["entity_id"] is None:
+            continue
+        db.execute("""
+            UPDATE Tabs
+            SET name = COALESCE(:name, name),
+                order_index = COALESCE(:order_index, order_index),
+                is_deleted = COALESCE(:is_deleted, is_deleted),
+                last_client_updated_at = :client_updated_at,
+                updated_at = :now
+            WHERE id = :id
+        """, {"name": f["name"], "order_index": f["order_index"], "is_deleted": f["is_deleted"],
+              "client_updated_at": item["client_updated_at"], "now": now, "id": item["entity_id"]})
+        # Tasks of tabs deleted by this push move to no tab (as in sp_DeleteTab)
+        if f["is_deleted"] == 1:
+            db.execute("UPDATE Tasks SET tab_id = NULL, updated_at = ? WHERE tab_id = ?", (now, item["entity_id"]))
+
+    new_tabs = sorted((item for item in tabs if item["entity_id"] is None), key=lambda i: i["item_index"])
+    if new_tabs:
+        max_order = _scalar(db, "SELECT COALESCE(MAX(order_index), 0) FROM Tabs WHERE user_id = ? AND is_deleted = 0",
+                            (user_id,))
+        for number, item in enumerate(new_tabs, start=1):
+            f = fields[item["item_index"]]
+            db.execute("""
+                INSERT INTO Tabs (client_id, user_id, name, order_index, is_system, tab_type, is_deleted,
+                                  last_client_updated_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 0, 'custom', ?, ?, ?, ?)
+            """, (item["client_id"], user_id, f["name"],
+                  f["order_index"] if f["order_index"] is not None else max_order + number,
+                  f["is_deleted"] or 0, item["client_updated_at"], now, now))
+
+    for item in tabs:
+        row = db.execute("SELECT id, updated_at FROM Tabs WHERE client_id = ?", (item["client_id"],)).fetchone()
+        item["status"] = "applied"
+        item["entity_id"], item["server_updated_at"] = row
+
+
+def _apply_tasks(db, user_id: int, pending: Callable[[str], list[dict]], fields: dict[int, dict], now: str) -> None:
+    def own_tab(**where) -> dict | None:
+        column, value = next(iter(where.items()))
+        return _row(db, f"SELECT id FROM Tabs WHERE {column} = ? AND user_id = ?", (value, user_id))
+
+    def own_task(task_id: int | None) -> dict | None:
+        if task_id is None:
+            return None
+        return _row(db, "SELECT id, client_id, tab_id, depth, root_task_id FROM Tasks WHERE id = ? AND user_id = ?",
+                    (task_id, user_id))
+
+    # Resolve tab references sent by client_id (tabs from this push already exist)
+    for item in pending("task"):
+        f = fields[item["item_index"]]
+        if f["tab_client_id"] is not None:
+            tab = own_tab(client_id=f["tab_client_id"])
+            if tab:
+                f["tab_id"], f["has_tab_id"] = tab["id"], True
+
+    for item in pending("task"):
+        f = fields[item["item_index"]]
+        if ((f["tab_client_id"] is not None and own_tab(client_id=f["tab_client_id"]) is None)
+                or (f["tab_id"] is not None and own_tab(id=f["tab_id"]) is None)):
+            item["status"], item["reason"] = "rejected", "tab_not_found"
+        elif item["entity_id"] is None and _blank(f["title"]):
+            item["status"], item["reason"] = "rejected", "missing_title"
+
+    # Insert new tasks level by level so children created offline can follow their parents
+    for _ in range(3):
+        for item in pending("task"):
+            f = fields[item["item_index"]]
+            if f["parent_client_id"] is not None:
+                parent = _row(db, "SELECT id FROM Tasks WHERE client_id = ? AND user_id = ?",
+                              (f["parent_client_id"], user_id))
+                if parent:
+                    f["parent_task_id"], f["has_parent_task_id"] = parent["id"], True
+
+        ready = []
+        for item in sorted(pending("task"), key=lambda i: i["item_index"]):
+            f = fields[item["item_index"]]
+            if item["entity_id"] is not None:
+                continue
+            parent = own_task(f["parent_task_id"])
+            if f["parent_task_id"] is not None and (parent is None or parent["depth"] >= 2):
+                continue
+            if f["parent_client_id"] is not None and (parent is None or parent["client_id"] != f["parent_client_id"]):
+                continue
+            ready.append((item, f, parent))
+        if not ready:
+            break
+
+        # order_index continues after the siblings that existed before this pass
+        max_orders: dict[int | None, int] = {}
+        for _, f, _ in ready:
+            if f["parent_task_id"] not in max_orders:
+                max_orders[f["parent_task_id"]] = _scalar(db, """
+                    SELECT COALESCE(MAX(order_index), 0) FROM Tasks
+                    WHERE user_id = ? AND COALESCE(parent_task_id, 0) = COALESCE(?, 0) AND is_deleted = 0
+                """, (user_id, f["parent_task_id"]))
+        for item, f, parent in ready:
+            max_orders[f["parent_task_id"]] += 1
+            db.execute("""
+                INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description,
+                                   is_completed, due_date, due_time, depth, order_index, completed_at, is_deleted,
+                                   last_client_updated_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                item["client_id"], user_id,
+                f["tab_id"] if f["has_tab_id"] else (parent["tab_id"] if parent else None),
+                f["parent_task_id"],
+                (parent["root_task_id"] or parent["id"]) if parent else None,
+                f["title"], f["description"], f["is_completed"] or 0, f["due_date"], f["due_time"],
+                parent["depth"] + 1 if parent else 0,
+                f["order_index"] if f["order_index"] is not None else max_orders[f["parent_task_id"]],
+                now if f["is_completed"] == 1 else None,
+                f["is_deleted"] or 0, item["client_updated_at"], now, now,
+            ))
+            item["status"] = "applied"
+            item["entity_id"], item["server_updated_at"] = db.execute(
+                "SELECT id, updated_at FROM Tasks WHERE client_id = ?", (item["client_id"],),
+            ).fetchone()
+
+    for item in pending("task"):
+        if item["entity_id"] is None:
+            parent = own_task(fields[item["item_index"]]["parent_task_id"])
+            item["status"] = "rejected"
+            item["reason"] = "max_depth" if parent and parent["depth"] >= 2 else "parent_not_found"
+
+    # Re-parenting an existing task: only leaf tasks, within the depth limit
+    for item in pending("task"):
+        f = fields[item["item_index"]]
+        if not (f["has_parent_task_id"] or f["parent_client_id"] is not None):
+            continue
+        task = _row(db, "SELECT id, parent_task_id FROM Tasks WHERE id = ?", (item["entity_id"],))
+        parent = own_task(f["parent_task_id"])
+        reason = None
+        if f["parent_client_id"] is not None and (parent is None or parent["client_id"] != f["parent_client_id"]):
+            reason = "parent_not_found"
+        elif (f["parent_task_id"] or 0) == (task["parent_task_id"] or 0):
+            reason = None
+        elif f["parent_task_id"] == task["id"]:
+            reason = "invalid_parent"
+        elif f["parent_task_id"] is not None and parent is None:
+            reason = "parent_not_found"
+        elif parent is not None and parent["depth"] >= 2:
+            reason = "max_depth"
+        elif db.execute("SELECT 1 FROM Tasks WHERE parent_task_id = ? AND is_deleted = 0", (task["id"],)).fetchone():
+            reason = "has_children"
+        if reason:
+            item["status"], item["reason"] = "rejected", reason
+
+    updates = pending("task")
+    for item in updates:
+        f = fields[item["item_index"]]
+        parent = own_task(f["parent_task_id"])
+        db.execute("""
+            UPDATE Tasks
+            SET title = COALESCE(:title, title),
+                description = CASE WHEN :has_description THEN :description ELSE description END,
+                completed_at = CASE
+                    WHEN :is_completed = 1 AND is_completed = 0 THEN :now
+                    WHEN :is_completed = 0 THEN NULL
+                    ELSE completed_at
+                END,
+                is_completed = COALESCE(:is_completed, is_completed),
+                due_date = CASE WHEN :has_due_date THEN :due_date ELSE due_date END,
+                due_time = CASE WHEN :has_due_time THEN :due_time ELSE due_time END,
+                tab_id = CASE WHEN :has_tab_id THEN :tab_id ELSE tab_id END,
+                parent_task_id = CASE WHEN :has_parent_task_id THEN :parent_task_id ELSE parent_task_id END,
+                depth = CASE WHEN :has_parent_task_id THEN :depth ELSE depth END,
+                root_task_id = CASE WHEN :has_parent_task_id THEN :root_task_id ELSE root_task_id END,
+                order_index = COALESCE(:order_index, order_index),
+                is_deleted = COALESCE(:is_deleted, is_deleted),
+                last_client_updated_at = :client_updated_at,
+                updated_at = :now
+            WHERE id = :id
+        """, {
+            "title": f["title"], "has_description": f["has_description"], "description": f["description"],
+            "is_completed": f["is_completed"], "now": now,
+            "has_due_date": f["has_due_date"], "due_date": f["due_date"],
+            "has_due_time": f["has_due_time"], "due_time": f["due_time"],
+            "has_tab_id": f["has_tab_id"], "tab_id": f["tab_id"],
+            "has_parent_task_id": f["has_parent_task_id"], "parent_task_id": f["parent_task_id"],
+            "depth": parent["depth"] + 1 if parent else 0,
+            "root_task_id": (parent["root_task_id"] or parent["id"]) if parent else None,
+            "order_index": f["order_index"], "is_deleted": f["is_deleted"],
+            "client_updated_at": item["client_updated_at"], "id": item["entity_id"],
+        })
+
+    # Deleting a task deletes its descendants (as in sp_DeleteTask)
+    deleted = json.dumps([item["entity_id"] for item in updates if fields[item["item_index"]]["is_deleted"] == 1])
+    db.execute("""
+        UPDATE Tasks SET is_deleted = 1, updated_at = :now
+        WHERE (root_task_id IN (SELECT value FROM json_each(:ids)) OR parent_task_id IN (SELECT value FROM json_each(:ids)))
+          AND is_deleted = 0
+    """, {"now": now, "ids": deleted})
+
+    for item in updates:
+        item["status"], item["server_updated_at"] = "applied", now
+
+
+_PUSH_RESULT_COLUMNS = [
+    "has_conflict", "entity_id", "client_id", "entity_type", "server_updated_at", "client_updated_at",
+    "status", "reason", "conflict_fields", "change_seq",
+]
+
+
+def _push_results(db, items: list[dict], with_index: bool = False) -> ResultSet:
+    rows = []
+    for item in sorted(items, key=lambda i: i["item_index"]):
+        change_seq = None
+        if item["entity_id"] is not None and item["entity_type"] in ("tab", "task"):
+            table = "Tabs" if item["entity_type"] == "tab" else "Tasks"
+            change_seq = _scalar(db, f"SELECT change_seq FROM {table} WHERE id = ?", (item["entity_id"],))
+        row = (
+            item["status"] == "conflict", item["entity_id"], item["client_id"], item["entity_type"],
+            item["server_updated_at"], item["client_updated_at"], item["status"], item["reason"],
+            item["conflict_fields"], change_seq,
+        )
+        rows.append((item["item_index"],) + row if with_index else row)
+    return ResultSet((["item_index"] if with_index else []) + _PUSH_RESULT_COLUMNS, rows)
+
+
+@procedure("sp_SyncPush", writes=True)
+def sync_push(
+    db, user_id: int, device_id: str, client_id: str, entity_type: str, data: str | None,
+    client_updated_at: datetime, base_seq: int | None = None,
+) -> list[ResultSet]:
+    items = [{
+        "item_index": 0, "client_id": client_id, "entity_type": entity_type, "data": data,
+        "client_updated_at": ts(client_updated_at), "base_seq": base_seq,
+    }]
+    apply_items(db, user_id, items)
+    return [_push_results(db, items)]
+
+
+@procedure("sp_SyncPushBatch", writes=True)
+def sync_push_batch(db, user_id: int, device_id: str, items: str) -> list[ResultSet]:
+    # Parse the whole batch once (timestamps normalized to UTC)
+    batch = [{
+        "item_index": item.get("item_index"),
+        "client_id": item.get("client_id"),
+        "entity_type": item.get("entity_type"),
+        "data": json.dumps(item["data"]) if isinstance(item.get("data"), (dict, list)) else None,
+        "client_updated_at": ts(item.get("client_updated_at")),
+        "base_seq": item.get("base_seq"),
+    } for item in json.loads(items)]
+    apply_items(db, user_id, batch)
+    _log_sync(db, user_id, device_id, "push", sum(1 for item in batch if item["status"] == "applied"))
+    return [_push_results(db, batch, with_index=True)]
+
+
+@procedure("sp_ResolveConflict", writes=True)
+def resolve_conflict(
+    db, user_id: int, client_id: str, entity_type: str, resolution: str, client_data: str | None = None,
+) -> list[ResultSet]:
+    success = True
+    if resolution == "keep_client" and client_data is not None:
+        # Apply the client's version, skipping conflict detection
+        items = [{
+            "item_index": 0, "client_id": client_id, "entity_type": entity_type, "data": client_data,
+            "client_updated_at": ts(_utcnow()), "base_seq": None,
+        }]
+        apply_items(db, user_id, items, force=True)
+        success = items[0]["status"] == "applied"
+    return [ResultSet(["success", "applied_resolution"], [(success, resolution)])]
+
+
+# ---------------------------------------------------------------------------
+# Notifications
+# ---------------------------------------------------------------------------
+
+@procedure("sp_GetPendingNotifications")
+def get_pending_notifications(db, user_id: int) -> list[ResultSet]:
+    return [query(db, """
+        SELECT n.id, n.user_id, n.task_id, n.title, n.message,
+               n.notification_type, n.scheduled_at, n.is_read, n.is_sent,
+               t.title AS task_title
+        FROM Notifications n
+        LEFT JOIN Tasks t ON n.task_id = t.id
+        WHERE n.user_id = ? AND n.is_read = 0 AND n.scheduled_at <= ?
+        ORDER BY n.scheduled_at DESC
+    """, (user_id, ts(_utcnow())))]
+
+
+@procedure("sp_MarkNotificationRead", writes=True)
+def mark_notification_read(db, notification_id: int, user_id: int) -> list[ResultSet]:
+    count = db.execute("UPDATE Notifications SET is_read = 1 WHERE id = ? AND user_id = ?",
+                       (notification_id, user_id)).rowcount
+    return [_affected(count)]
+
+
+@procedure("sp_CreateTaskReminder", writes=True)
+def create_task_reminder(db, task_id: int, user_id: int, scheduled_at: datetime) -> list[ResultSet]:
+    task_title = _scalar(db, "SELECT title FROM Tasks WHERE id = ? AND user_id = ? AND is_deleted = 0",
+                         (task_id, user_id))
+    # Not the user's task (or deleted): nothing to remind about
+    if task_title is None:
+        return [ResultSet(["notification_id"], [(None,)])]
+    notification_id = db.execute("""
+        INSERT INTO Notifications (user_id, task_id, title, message, notification_type, scheduled_at)
+        VALUES (?, ?, 'შეხსენება', ?, 'reminder', ?)
+    """, (user_id, task_id, task_title, ts(scheduled_at))).lastrowid
+    return [ResultSet(["notification_id"], [(notification_id,)])]
+
+
+@procedure("sp_ClaimDueNotifications", writes=True)
+def claim_due_notifications(db, batch_size: int = 500, lease_seconds: int = 300, max_attempts: int = 5) -> list[ResultSet]:
+    # The write transaction already excludes other dispatchers, so no READPAST is needed
+    now = _utcnow()
+    return [query(db, """
+        UPDATE Notifications
+        SET claimed_until = :claimed_until, attempts = attempts + 1
+        WHERE id IN (
+            SELECT id FROM Notifications
+            WHERE is_sent = 0
+              AND scheduled_at <= :now
+              AND (claimed_until IS NULL OR claimed_until < :now)
+              AND attempts < :max_attempts
+            ORDER BY scheduled_at
+            LIMIT :batch_size
+        )
+        RETURNING id, user_id, task_id, title, message, notification_type, scheduled_at, attempts
+    """, {
+        "claimed_until": ts(now + timedelta(seconds=lease_seconds)), "now": ts(now),
+        "max_attempts": max_attempts, "batch_size": batch_size,
+    })]
+
+
+@procedure("sp_MarkNotificationsSent", writes=True)
+def mark_notifications_sent(db, notification_ids: str) -> list[ResultSet]:
+    count = db.execute("""
+        UPDATE Notifications SET is_sent = 1, sent_at = ?, claimed_until = NULL
+        WHERE id IN (SELECT CAST(value AS INTEGER) FROM json_each(?)) AND is_sent = 0
+    """, (ts(_utcnow()), _json_ids(notification_ids))).rowcount
+    return [_affected(count)]
+
+
+@procedure("sp_ReleaseNotifications", writes=True)
+def release_notifications(db, notification_ids: str, retry_seconds: int = 60) -> list[ResultSet]:
+    count = db.execute("""
+        UPDATE Notifications SET claimed_until = ?
+        WHERE id IN (SELECT CAST(value AS INTEGER) FROM json_each(?)) AND is_sent = 0
+    """, (ts(_utcnow() + timedelta(seconds=retry_seconds)), _json_ids(notification_ids))).rowcount
+    return [_affected(count)]
@@ -0,0 +1,237 @@
+-- Task Manager Database Schema
+-- SQLite (embedded backend; mirrors database/schema.sql)
+-- Timestamps are UTC text 'YYYY-MM-DD HH:MM:SS.ffffff', dates 'YYYY-MM-DD', times 'HH:MM:SS';
+-- all three sort and compare as text. BIT columns are 0/1 integers.
+-- Applied on first connect; every statement is idempotent.
+
+-- =============================================
+-- Sequences - server change sequence (ROWVERSION in MSSQL)
+-- =============================================
+CREATE TABLE IF NOT EXISTS Sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO Sequences (name, value) VALUES ('change_seq', 0);
+
+-- =============================================
+-- Users Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS Users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    google_id TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL,
+    name TEXT NOT NULL,
+    avatar_url TEXT NULL,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')
+);
+
+CREATE INDEX IF NOT EXISTS IX_Users_Email ON Users(email);
+
+-- =============================================
+-- Tabs Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS Tabs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL UNIQUE,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    order_index INTEGER NOT NULL DEFAULT 0,
+    is_system INTEGER NOT NULL DEFAULT 0,
+    tab_type TEXT NOT NULL DEFAULT 'custom',
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'),
+    is_deleted INTEGER NOT NULL DEFAULT 0,
+    last_client_updated_at TEXT NULL,
+    change_seq INTEGER NOT NULL DEFAULT 0     -- Set by the triggers below
+);
+
+CREATE INDEX IF NOT EXISTS IX_Tabs_UserId_Active ON Tabs(user_id, order_index) WHERE is_deleted = 0;
+CREATE INDEX IF NOT EXISTS IX_Tabs_UserId_UpdatedAt ON Tabs(user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS IX_Tabs_UserId_ChangeSeq ON Tabs(user_id, change_seq);
+
+-- =============================================
+-- Tasks Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS Tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL UNIQUE,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    tab_id INTEGER NULL REFERENCES Tabs(id),
+    parent_task_id INTEGER NULL REFERENCES Tasks(id),
+    root_task_id INTEGER NULL REFERENCES Tasks(id),
+    title TEXT NOT NULL,
+    description TEXT NULL,
+    is_completed INTEGER NOT NULL DEFAULT 0,
+    due_date TEXT NULL,
+    due_time TEXT NULL,
+    depth INTEGER NOT NULL DEFAULT 0 CHECK (depth >= 0 AND depth <= 2),
+    order_index INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'),
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'),
+    completed_at TEXT NULL,
+    is_deleted INTEGER NOT NULL DEFAULT 0,
+    last_client_updated_at TEXT NULL,
+    change_seq INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS IX_Tasks_TabId ON Tasks(tab_id);
+CREATE INDEX IF NOT EXISTS IX_Tasks_ParentTaskId ON Tasks(parent_task_id);
+CREATE INDEX IF NOT EXISTS IX_Tasks_RootTaskId ON Tasks(root_task_id);
+CREATE INDEX IF NOT EXISTS IX_Tasks_UserId_Roots_Active ON Tasks(user_id, parent_task_id, is_completed, tab_id)
+    WHERE is_deleted = 0;
+CREATE INDEX IF NOT EXISTS IX_Tasks_UserId_UpdatedAt ON Tasks(user_id, updated_at, id);
+CREATE INDEX IF NOT EXISTS IX_Tasks_UserId_ChangeSeq ON Tasks(user_id, change_seq);
+
+-- =============================================
+-- FieldVersions Table - Per-field change tracking for delta sync
+-- =============================================
+CREATE TABLE IF NOT EXISTS FieldVersions (
+    entity_type TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    field_name TEXT NOT NULL,
+    change_seq INTEGER NOT NULL,
+
+    PRIMARY KEY (entity_type, entity_id, field_name)
+) WITHOUT ROWID;
+
+-- =============================================
+-- TaskSearch - Full-text index over task titles and descriptions (TaskSearch in MSSQL)
+-- =============================================
+-- External-content FTS5 table: it stores only the index and reads text from Tasks; the
+-- trg_Tasks_Search_* triggers below keep it current. Prefix indexes serve 2-4 letter prefixes.
+-- user_id is indexed too, so a search intersects with the user's rows inside the index instead
+-- of collecting every user's matches first.
+CREATE VIRTUAL TABLE IF NOT EXISTS TaskSearch USING fts5(
+    title, description, user_id,
+    content = 'Tasks', content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4'
+);
+
+-- =============================================
+-- SyncLog Table - Track sync history per device
+-- =============================================
+CREATE TABLE IF NOT EXISTS SyncLog (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    device_id TEXT NOT NULL,
+    last_sync_at TEXT NOT NULL,
+    sync_type TEXT NOT NULL,
+    items_synced INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')
+);
+
+CREATE INDEX IF NOT EXISTS IX_SyncLog_UserId_DeviceId ON SyncLog(user_id, device_id);
+
+-- =============================================
+-- Notifications Table - In-app notifications
+-- =============================================
+CREATE TABLE IF NOT EXISTS Notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id) ON DELETE CASCADE,
+    task_id INTEGER NULL REFERENCES Tasks(id),
+    title TEXT NOT NULL,
+    message TEXT NULL,
+    notification_type TEXT NOT NULL,
+    scheduled_at TEXT NOT NULL,
+    is_read INTEGER NOT NULL DEFAULT 0,
+    is_sent INTEGER NOT NULL DEFAULT 0,
+    sent_at TEXT NULL,
+    claimed_until TEXT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')
+);
+
+CREATE INDEX IF NOT EXISTS IX_Notifications_UserId ON Notifications(user_id);
+CREATE INDEX IF NOT EXISTS IX_Notifications_IsSent_ScheduledAt ON Notifications(is_sent, scheduled_at);
+
+-- =============================================
+-- Change tracking: every insert/update takes the next change_seq and records the
+-- fields it changed (trg_*_FieldVersions in stored_procedures.sql). The update
+-- triggers skip the triggers' own change_seq writes.
+-- =============================================
+CREATE TRIGGER IF NOT EXISTS trg_Tabs_Insert AFTER INSERT ON Tabs
+BEGIN
+    UPDATE Sequences SET value = value + 1 WHERE name = 'change_seq';
+    UPDATE Tabs SET change_seq = (SELECT value FROM Sequences WHERE name = 'change_seq') WHERE id = NEW.id;
+    INSERT OR REPLACE INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+    SELECT 'tab', NEW.id, f.column1, s.value
+    FROM (VALUES ('name'), ('order_index'), ('is_system'), ('tab_type'), ('created_at'), ('is_deleted')) f
+    CROSS JOIN Sequences s
+    WHERE s.name = 'change_seq';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tabs_Update AFTER UPDATE ON Tabs
+WHEN NEW.change_seq = OLD.change_seq
+BEGIN
+    UPDATE Sequences SET value = value + 1 WHERE name = 'change_seq';
+    UPDATE Tabs SET change_seq = (SELECT value FROM Sequences WHERE name = 'change_seq') WHERE id = NEW.id;
+    INSERT OR REPLACE INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+    SELECT 'tab', NEW.id, f.column1, s.value
+    FROM (VALUES
+            ('name', OLD.name IS NOT NEW.name),
+            ('order_index', OLD.order_index IS NOT NEW.order_index),
+            ('is_system', OLD.is_system IS NOT NEW.is_system),
+            ('tab_type', OLD.tab_type IS NOT NEW.tab_type),
+            ('created_at', OLD.created_at IS NOT NEW.created_at),
+            ('is_deleted', OLD.is_deleted IS NOT NEW.is_deleted)
+    ) f
+    CROSS JOIN Sequences s
+    WHERE s.name = 'change_seq' AND f.column2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tasks_Insert AFTER INSERT ON Tasks
+BEGIN
+    UPDATE Sequences SET value = value + 1 WHERE name = 'change_seq';
+    UPDATE Tasks SET change_seq = (SELECT value FROM Sequences WHERE name = 'change_seq') WHERE id = NEW.id;
+    INSERT OR REPLACE INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+    SELECT 'task', NEW.id, f.column1, s.value
+    FROM (VALUES ('tab_id'), ('parent_task_id'), ('title'), ('description'), ('is_completed'), ('due_date'),
+                 ('due_time'), ('depth'), ('order_index'), ('created_at'), ('completed_at'), ('is_deleted')) f
+    CROSS JOIN Sequences s
+    WHERE s.name = 'change_seq';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tasks_Update AFTER UPDATE ON Tasks
+WHEN NEW.change_seq = OLD.change_seq
+BEGIN
+    UPDATE Sequences SET value = value + 1 WHERE name = 'change_seq';
+    UPDATE Tasks SET change_seq = (SELECT value FROM Sequences WHERE name = 'change_seq') WHERE id = NEW.id;
+    INSERT OR REPLACE INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+    SELECT 'task', NEW.id, f.column1, s.value
+    FROM (VALUES
+            ('tab_id', OLD.tab_id IS NOT NEW.tab_id),
+            ('parent_task_id', OLD.parent_task_id IS NOT NEW.parent_task_id),
+            ('title', OLD.title IS NOT NEW.title),
+            ('description', OLD.description IS NOT NEW.description),
+            ('is_completed', OLD.is_completed IS NOT NEW.is_completed),
+            ('due_date', OLD.due_date IS NOT NEW.due_date),
+            ('due_time', OLD.due_time IS NOT NEW.due_time),
+            ('depth', OLD.depth IS NOT NEW.depth),
+            ('order_index', OLD.order_index IS NOT NEW.order_index),
+            ('created_at', OLD.created_at IS NOT NEW.created_at),
+            ('completed_at', OLD.completed_at IS NOT NEW.completed_at),
+            ('is_deleted', OLD.is_deleted IS NOT NEW.is_deleted)
+    ) f
+    CROSS JOIN Sequences s
+    WHERE s.name = 'change_seq' AND f.column2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tasks_Search_Insert AFTER INSERT ON Tasks
+BEGIN
+    INSERT INTO TaskSearch (rowid, title, description, user_id) VALUES (NEW.id, NEW.title, NEW.description, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tasks_Search_Update AFTER UPDATE OF title, description ON Tasks
+BEGIN
+    INSERT INTO TaskSearch (TaskSearch, rowid, title, description, user_id)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.user_id);
+    INSERT INTO TaskSearch (rowid, title, description, user_id) VALUES (NEW.id, NEW.title, NEW.description, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_Tasks_Search_Delete AFTER DELETE ON Tasks
+BEGIN
+    INSERT INTO TaskSearch (TaskSearch, rowid, title, description, user_id)
+        VALUES ('delete', OLD.id, OLD.title, OLD.description, OLD.user_id);
+END;
@@ -0,0 +1,47 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Clients may keep the body but must revalidate before using it
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(request: Request, user_id: int, version: int | None, *variant: object) -> str | None:
+    """Strong ETag for a user's view: their data version plus what was asked for.
+
+    ``version`` comes from get_data_version; pass the same value to
+    cached_view so the body is never older than its tag. The path and query
+    string (tab_id, include_completed) and any extra ``variant`` (e.g. the
+    response format) are hashed in, so different representations never
+    share a tag. Returns None if no ETag should be sent.
+    """
+    if version is None:
+        return None
+    representation = "|".join([request.url.path, request.url.query, *map(str, variant)])
+    digest = hashlib.blake2b(representation.encode(), digest_size=8).hexdigest()
+    return f'"{user_id}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str | None) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)."""
+    if not if_none_match or etag is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current validators."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str | None) -> None:
+    """Attach the validators to a 200 response."""
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from .config import get_settings
+
+
+class TooManyConnectionsError(Exception):
+    """The user already has the maximum number of change streams open."""
+
+
+class Subscription:
+    """One connected device's view of its user's change events.
+
+    Pending changes are coalesced into a set of entity types rather than
+    queued, so a slow or stalled client costs a few bytes no matter how
+    many writes happen meanwhile; it just gets one combined event when it
+    catches up.
+    """
+
+    def __init__(self, user_id: int, device_id: Optional[str]):
+        self.user_id = user_id
+        self.device_id = device_id
+        self._pending: set[str] = set()
+        self._ready = asyncio.Event()
+
+    def push(self, entity_type: str) -> None:
+        self._pending.add(entity_type)
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[set[str]]:
+        """Entity types changed since the last call, or None if nothing changed within timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        changed, self._pending = self._pending, set()
+        self._ready.clear()
+        return changed
+
+
+class ChangeHub:
+    """In-process fan-out of "your data changed" events to connected devices.
+
+    Reaches the streams open on this worker. With several workers, override
+    ``publish`` to also forward events over a shared channel (e.g. Redis
+    pub/sub) and deliver received ones with ``deliver``.
+    """
+
+    def __init__(self, max_connections_per_user: int = 10):
+        self.max_connections_per_user = max_connections_per_user
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, user_id: int, device_id: Optional[str] = None) -> Subscription:
+        subscriptions = self._subscriptions[user_id]
+        if len(subscriptions) >= self.max_connections_per_user:
+            raise TooManyConnectionsError(user_id)
+        subscription = Subscription(user_id, device_id)
+        subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def deliver(self, user_id: int, entity_type: str, source_device_id: Optional[str] = None) -> int:
+        """Notify the user's streams except the source device's; returns how many were notified."""
+        delivered = 0
+        for subscription in self._subscriptions.get(user_id, ()):
+            if source_device_id is None or subscription.device_id != source_device_id:
+                subscription.push(entity_type)
+                delivered += 1
+        return delivered
+
+    async def publish(self, user_id: int, entity_type: str, source_device_id: Optional[str] = None) -> None:
+        """Announce that a user's tabs or tasks changed."""
+        self.deliver(user_id, entity_type, source_device_id)
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscriptions),
+            "connections": sum(len(s) for s in self._subscriptions.values()),
+        }
+
+
+_hub: ChangeHub | None = None
+
+
+def get_change_hub() -> ChangeHub:
+    """Get the process-wide change hub (in-process unless another was installed)."""
+    global _hub
+    if _hub is None:
+        _hub = ChangeHub(max_connections_per_user=get_settings().sync_stream_max_connections_per_user)
+    return _hub
+
+
+def set_change_hub(hub: ChangeHub) -> None:
+    """Install a change hub (call once at startup)."""
+    global _hub
+    _hub = hub
+
+
+async def publish_change(user_id: int, entity_type: str, source_device_id: Optional[str] = None) -> None:
+    """Tell the user's other connected devices to pull (call after a write to their tabs or tasks)."""
+    await get_change_hub().publish(user_id, entity_type, source_device_id)
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+async def change_stream(subscription: Subscription, heartbeat: float) -> AsyncIterator[bytes]:
+    """Server-sent events for one subscription.
+
+    Starts with a ``ready`` event (pull once to catch up on anything missed
+    while disconnected), then sends ``changed`` events as writes happen and
+    a comment line every ``heartbeat`` seconds to keep the connection alive.
+    """
+    try:
+        yield b"retry: 5000\n\n" + sse_event("ready", {"server_time": datetime.utcnow().isoformat()})
+        while True:
+            changed = await subscription.next(heartbeat)
+            if changed is None:
+                yield b": ping\n\n"
+                continue
+            yield sse_event("changed", {
+                "entities": sorted(changed),
+                "changed_at": datetime.utcnow().isoformat(),
+            })
+    finally:
+        get_change_hub().unsubscribe(subscription)
@@ -0,0 +1,250 @@
+import asyncio
+import base64
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from jose import jwk
+from jose.backends.base import Key
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Used when the key source gives no lifetime (local files, missing Cache-Control)
+DEFAULT_KEYS_MAX_AGE = 3600.0
+CLOCK_SKEW_SECONDS = 60
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+_verifier: "GoogleTokenVerifier | None" = None
+_verifier_lock = threading.Lock()
+
+
+class KeySource(ABC):
+    """Where the verifier gets Google's signing keys (a JWKS document)."""
+
+    @abstractmethod
+    def fetch(self) -> tuple[dict, float | None]:
+        """Return the JWKS and how many seconds it may be cached (None if unknown)."""
+
+
+class GoogleCertsSource(KeySource):
+    """Google's published certificates, cached for the response's max-age."""
+
+    def __init__(self, url: str = GOOGLE_CERTS_URL, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> tuple[dict, float | None]:
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            jwks = json.loads(response.read())
+            match = _MAX_AGE_RE.search(response.headers.get("Cache-Control", ""))
+        return jwks, float(match.group(1)) if match else None
+
+
+class LocalKeySource(KeySource):
+    """JWKS file on disk, for offline deployments and test environments."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def fetch(self) -> tuple[dict, float | None]:
+        return json.loads(self.path.read_text(encoding="utf-8")), None
+
+
+class StaticKeySource(KeySource):
+    """In-memory JWKS (benchmarks and tools that mint their own tokens)."""
+
+    def __init__(self, jwks: dict):
+        self.jwks = jwks
+
+    def fetch(self) -> tuple[dict, float | None]:
+        return self.jwks, None
+
+
+def create_key_source(name: str) -> KeySource:
+    """Key source for a ``google_keys_source`` setting value."""
+    settings = get_settings()
+    if name == "google":
+        return GoogleCertsSource(settings.google_certs_url, timeout=settings.google_certs_timeout_seconds)
+    if name == "local":
+        if not settings.google_keys_file:
+            raise ValueError("google_keys_source 'local' needs google_keys_file")
+        return LocalKeySource(settings.google_keys_file)
+    raise ValueError(f"Unknown google_keys_source: {name!r} (expected 'google' or 'local')")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def parse_jwks(jwks: dict) -> dict[str, Key]:
+    """Signing keys of a JWKS by kid, constructed once instead of per token."""
+    keys = {}
+    for key_data in jwks.get("keys", []):
+        kid = key_data.get("kid")
+        if not kid or key_data.get("use", "sig") != "sig":
+            continue
+        try:
+            keys[kid] = jwk.construct(key_data, key_data.get("alg", "RS256"))
+        except Exception as e:
+            logger.warning("Skipping unusable signing key %s: %s", kid, e)
+    return keys
+
+
+class GoogleTokenVerifier:
+    """Verifies Google ID tokens against cached, pre-parsed signing keys.
+
+    Keys are fetched from the key source once and kept until the lifetime it
+    reported runs out, so a login costs one RSA signature check instead of a
+    certificate download plus key parsing. A token signed by a kid we don't
+    know triggers an early refresh (Google rotated its keys), at most once
+    per ``min_refresh_interval``. If a refresh fails, the previous keys stay
+    in use until a later refresh succeeds.
+
+    Raises ValueError for tokens that don't verify, like google-auth's
+    ``verify_oauth2_token``. The audience (our OAuth client id) is required:
+    without it, a token Google issued to any other app would be accepted.
+    """
+
+    def __init__(self, source: KeySource, audience: str, min_refresh_interval: float = 60.0):
+        if not audience:
+            raise ValueError("GoogleTokenVerifier needs an audience (GOOGLE_CLIENT_ID)")
+        self.source = source
+        self.audience = audience
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, Key] = {}
+        self._expires_at = 0.0
+        self._last_fetch = float("-inf")
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def _refresh(self, force: bool = False) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Another thread refreshed while we waited for the lock
+            if not force and self._keys and now < self._expires_at:
+                return
+            if force and now - self._last_fetch < self.min_refresh_interval:
+                return
+            self._last_fetch = now
+            try:
+                jwks, max_age = self.source.fetch()
+                keys = parse_jwks(jwks)
+                if not keys:
+                    raise ValueError("key source returned no signing keys")
+            except Exception as e:
+                self.refresh_errors += 1
+                if not self._keys:
+                    raise ValueError(f"Could not load Google signing keys: {e}") from e
+                logger.warning("Google signing key refresh failed, keeping cached keys: %s", e)
+                self._expires_at = now + self.min_refresh_interval
+                return
+            self._keys = keys
+            self._expires_at = now + (DEFAULT_KEYS_MAX_AGE if max_age is None else max_age)
+            self.refreshes += 1
+
+    def needs_refresh(self) -> bool:
+        return not self._keys or time.monotonic() >= self._expires_at
+
+    def _key(self, kid: str) -> Key:
+        if self.needs_refresh():
+            self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            self._refresh(force=True)
+            key = self._keys.get(kid)
+        if key is None:
+            raise ValueError(f"Token signed with unknown key {kid!r}")
+        return key
+
+    @staticmethod
+    def _split(token: str) -> tuple[str, str, dict, bytes]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = json.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Malformed token: {e}") from e
+        if not isinstance(header, dict):
+            raise ValueError("Malformed token header")
+        return header_segment, payload_segment, header, signature
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Check the token's signature and claims and return the claims."""
+        header_segment, payload_segment, header, signature = self._split(token)
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Unexpected token algorithm {header.get('alg')!r}")
+        key = self._key(str(header.get("kid", "")))
+        if not key.verify(f"{header_segment}.{payload_segment}".encode(), signature):
+            raise ValueError("Token signature does not match")
+
+        try:
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Malformed token payload: {e}") from e
+        if not isinstance(claims, dict):
+            raise ValueError("Malformed token payload")
+
+        now = time.time()
+        if not isinstance(claims.get("exp"), (int, float)) or claims["exp"] < now - CLOCK_SKEW_SECONDS:
+            raise ValueError("Token expired")
+        if isinstance(claims.get("iat"), (int, float)) and claims["iat"] > now + CLOCK_SKEW_SECONDS:
+            raise ValueError("Token used too early")
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer {claims.get('iss')!r}")
+        audience = claims.get("aud")
+        if audience != self.audience and not (isinstance(audience, list) and self.audience in audience):
+            raise ValueError("Token has wrong audience")
+        if not claims.get("sub"):
+            raise ValueError("Token has no subject")
+        return claims
+
+    async def verify_async(self, token: str) -> dict[str, Any]:
+        """``verify`` that only leaves the event loop when keys must be fetched."""
+        kid = str(self._split(token)[2].get("kid", ""))
+        if self.needs_refresh() or kid not in self._keys:
+            return await asyncio.to_thread(self.verify, token)
+        return self.verify(token)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+def get_google_verifier() -> GoogleTokenVerifier:
+    """Get the process-wide Google ID token verifier (from settings unless another was installed).
+
+    Raises ValueError if google_client_id is not set.
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                settings = get_settings()
+                _verifier = GoogleTokenVerifier(
+                    create_key_source(settings.google_keys_source),
+                    settings.google_client_id,
+                    min_refresh_interval=settings.google_certs_min_refresh_seconds,
+                )
+    return _verifier
+
+
+def set_google_verifier(verifier: GoogleTokenVerifier) -> None:
+    """Install a verifier (offline key sources, benchmarks)."""
+    global _verifier
+    _verifier = verifier
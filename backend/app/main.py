@@ -1,10 +1,45 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from .compression import CompressionMiddleware, available_codecs
 from .config import get_settings
-from .routers import auth_router, tabs_router, tasks_router, sync_router
+from .cache import get_view_cache
+from .database import get_pool, get_pool_stats, close_pool, shutdown_executor, QueryTimeoutError, PoolTimeoutError
+from .events import get_change_hub
+from .id_tokens import get_google_verifier
+from .metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, add_stats_collector, render_metrics
+from .notifications import create_dispatcher
+from .routers import auth_router, tabs_router, tasks_router, sync_router, notifications_router
+from .routers.auth import get_token_cache, get_user_cache
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks."""
+    # Fail here rather than on the first login if GOOGLE_CLIENT_ID is missing
+    get_google_verifier()
+    try:
+        # Pre-open db_pool_min_size connections; the pool still opens lazily if the DB is down
+        await asyncio.to_thread(get_pool().warm_up)
+    except Exception as e:
+        logger.warning("Could not warm up database pool: %s", e)
+    dispatcher = create_dispatcher() if settings.notification_dispatch_enabled else None
+    if dispatcher:
+        dispatcher.start()
+    yield
+    if dispatcher:
+        await dispatcher.stop()
+    shutdown_executor()
+    close_pool()
+
 
 app = FastAPI(
     title=settings.app_name,
@@ -12,6 +47,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -23,11 +59,53 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (and compressed request bodies on the sync push endpoint)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        codecs=available_codecs(
+            gzip_level=settings.compression_gzip_level,
+            brotli_level=settings.compression_brotli_level,
+            zstd_level=settings.compression_zstd_level,
+        ),
+        preference=settings.compression_algorithms,
+        min_size=settings.compression_min_size,
+        offload_min_size=settings.compression_offload_min_size,
+        decompress_paths=tuple(settings.compression_request_paths),
+        max_request_size=settings.compression_max_request_size,
+    )
+
+# Request latency (outermost, so compression time is included)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, exclude_paths=("/metrics",))
+    _cache_counters = ("hits", "misses", "evictions", "expirations")
+    add_stats_collector(
+        "db_pool", get_pool_stats,
+        counters=("created", "closed", "recycled", "ping_failures", "checkouts", "checkout_timeouts",
+                  "checkout_waits", "checkout_wait_seconds"),
+    )
+    add_stats_collector("view_cache", lambda: get_view_cache().stats(), counters=_cache_counters)
+    add_stats_collector("user_cache", lambda: get_user_cache().stats(), counters=_cache_counters)
+    add_stats_collector("auth_token_cache", lambda: get_token_cache().stats(), counters=_cache_counters)
+    add_stats_collector("google_certs", lambda: get_google_verifier().stats(), counters=("refreshes", "refresh_errors"))
+    add_stats_collector("sync_stream", lambda: get_change_hub().stats())
+
+@app.exception_handler(QueryTimeoutError)
+async def query_timeout_handler(request: Request, exc: QueryTimeoutError):
+    return JSONResponse(status_code=504, content={"detail": "Database query timed out"})
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": "Database is busy, try again later"})
+
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(tabs_router)
 app.include_router(tasks_router)
 app.include_router(sync_router)
+app.include_router(notifications_router)
 
 
 @app.get("/")
@@ -46,6 +124,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
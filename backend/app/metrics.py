@@ -0,0 +1,259 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+# Seconds; covers cached views (sub-ms) up to slow sync pulls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (name, type, help, [(labels, value), ...])
+MetricFamily = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with a fixed label set."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in sorted(values)]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed label set.
+
+    ``observe`` is one bisect plus two list updates under a lock, cheap
+    enough for every request and every stored procedure call.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = ['le="%s"' % _number(bound) for bound in self.buckets] + ['le="+Inf"']
+        for key, counts, total in sorted(snapshot, key=lambda s: s[0]):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text format.
+
+    Counters and histograms are updated in place; gauges come from
+    collectors, called at scrape time, that read the stats() of the pool,
+    caches and other components.
+    """
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_number(value)}" if label_text else f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def stats_families(prefix: str, stats: dict, counters: Iterable[str] = (), labels: dict[str, str] | None = None) -> list[MetricFamily]:
+    """Metric families from a component's stats() dict.
+
+    Keys listed in ``counters`` become ``<prefix>_<key>_total`` counters, other
+    numeric keys ``<prefix>_<key>`` gauges; non-numeric values are skipped.
+    """
+    counters = set(counters)
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}_total" if key in counters else f"{prefix}_{key}"
+        families.append((name, "counter" if key in counters else "gauge", f"{prefix} {key}", [(labels or {}, value)]))
+    return families
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "Time from request to the last response byte, by route template",
+    ("method", "route", "status"),
+)
+http_requests_in_progress = 0
+
+db_phase_duration = registry.histogram(
+    "db_procedure_duration_seconds",
+    "Stored procedure time by phase: checkout (pool wait and connect), execute, fetch (rows and conversion)",
+    ("procedure", "phase"),
+)
+db_rows = registry.counter("db_procedure_rows_total", "Rows returned by stored procedures", ("procedure",))
+db_errors = registry.counter("db_procedure_errors_total", "Stored procedure calls that raised", ("procedure",))
+db_connect_duration = registry.histogram("db_connect_duration_seconds", "Time to open a physical database connection")
+
+
+class ProcedureTimer:
+    """Times the phases of one stored procedure call (see database/connection.py).
+
+    Each ``lap`` records the time since the previous one under a phase;
+    used as a context manager it counts the call as an error if it raises.
+    """
+
+    __slots__ = ("procedure", "_mark")
+
+    def __init__(self, procedure: str):
+        self.procedure = procedure
+        self._mark = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        db_phase_duration.observe((self.procedure, phase), now - self._mark)
+        self._mark = now
+
+    def rows(self, count: int) -> None:
+        if count:
+            db_rows.inc((self.procedure,), count)
+
+    def __enter__(self) -> "ProcedureTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            db_errors.inc((self.procedure,))
+
+
+class MetricsMiddleware:
+    """Records per-route request latency.
+
+    Routes are labelled by their template (``/tasks/{task_id}``), unmatched
+    paths as ``unmatched``, so label cardinality stays bounded. Event streams
+    are not timed: their duration is the client's connection time.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        global http_requests_in_progress
+        started = time.perf_counter()
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for key, value in message.get("headers", ()):
+                    if key == b"content-type" and value.startswith(b"text/event-stream"):
+                        streaming = True
+            await send(message)
+
+        http_requests_in_progress += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_progress -= 1
+            if not streaming:
+                route = scope.get("route")
+                http_request_duration.observe(
+                    (scope["method"], getattr(route, "path_format", None) or "unmatched", str(status)),
+                    time.perf_counter() - started,
+                )
+
+
+def _http_families() -> list[MetricFamily]:
+    return [("http_requests_in_progress", "gauge", "Requests being handled", [({}, http_requests_in_progress)])]
+
+
+registry.add_collector(_http_families)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return registry.render()
+
+
+def add_stats_collector(
+    prefix: str, stats: Callable[[], dict], counters: Iterable[str] = (), labels: Optional[dict[str, str]] = None,
+) -> None:
+    """Expose a component's stats() as gauges/counters on every scrape."""
+    counters = tuple(counters)
+    registry.add_collector(lambda: stats_families(prefix, stats(), counters, labels))
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+
+from .config import get_settings
+from .database import async_execute_sp_fetchall, async_execute_sp_fetchone
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationSender(ABC):
+    """Delivers one notification (push service, e-mail, ...).
+
+    ``send`` returns normally on success and raises on failure; failed
+    notifications are retried after ``notification_retry_seconds`` until
+    ``notification_max_attempts`` is reached. It is called concurrently,
+    up to ``notification_concurrency`` at a time.
+    """
+
+    @abstractmethod
+    async def send(self, notification: dict) -> None:
+        """Deliver a claimed notification row."""
+
+
+class LogSender(NotificationSender):
+    """Default sender: logs the notification (clients fetch it from /notifications)."""
+
+    async def send(self, notification: dict) -> None:
+        logger.info(
+            "Notification %s for user %s: %s",
+            notification["id"], notification["user_id"], notification["title"],
+        )
+
+
+_sender: NotificationSender | None = None
+
+
+def get_notification_sender() -> NotificationSender:
+    """Get the process-wide notification sender (logging unless another was installed)."""
+    global _sender
+    if _sender is None:
+        _sender = LogSender()
+    return _sender
+
+
+def set_notification_sender(sender: NotificationSender) -> None:
+    """Install a notification sender (call once at startup)."""
+    global _sender
+    _sender = sender
+
+
+class NotificationDispatcher:
+    """Background loop that sends due notifications.
+
+    Each round claims up to ``batch_size`` due notifications in one call,
+    sends them with at most ``concurrency`` in flight, then marks the
+    delivered ones sent and releases the failed ones with one call each.
+    A full batch means more are due, so the next round starts immediately;
+    otherwise the loop sleeps ``poll_interval``. Claims are leased in the
+    database, so any number of workers can run a dispatcher.
+    """
+
+    def __init__(
+        self,
+        sender: NotificationSender,
+        batch_size: int = 500,
+        concurrency: int = 50,
+        poll_interval: float = 5.0,
+        lease_seconds: int = 300,
+        retry_seconds: int = 60,
+        max_attempts: int = 5,
+    ):
+        self.sender = sender
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.retry_seconds = retry_seconds
+        self.max_attempts = max_attempts
+        self._task: asyncio.Task | None = None
+        self.sent = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="notification-dispatcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Notification dispatch failed: %s", e)
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def dispatch_once(self) -> int:
+        """Claim, send and settle one batch; returns how many were claimed."""
+        batch = await async_execute_sp_fetchall("sp_ClaimDueNotifications", {
+            "batch_size": self.batch_size,
+            "lease_seconds": self.lease_seconds,
+            "max_attempts": self.max_attempts,
+        }, compact=True)
+        if not batch:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(notification) -> bool:
+            async with semaphore:
+                try:
+                    await self.sender.send(notification)
+                    return True
+                except Exception as e:
+                    logger.debug("Sending notification %s failed: %s", notification["id"], e)
+                    return False
+
+        results = await asyncio.gather(*(deliver(n) for n in batch))
+        sent_ids = [n["id"] for n, ok in zip(batch, results) if ok]
+        failed_ids = [n["id"] for n, ok in zip(batch, results) if not ok]
+        if sent_ids:
+            await async_execute_sp_fetchone("sp_MarkNotificationsSent", {
+                "notification_ids": json.dumps(sent_ids),
+            })
+        if failed_ids:
+            logger.warning("%d of %d notifications failed to send, retrying later", len(failed_ids), len(batch))
+            await async_execute_sp_fetchone("sp_ReleaseNotifications", {
+                "notification_ids": json.dumps(failed_ids),
+                "retry_seconds": self.retry_seconds,
+            })
+        self.sent += len(sent_ids)
+        self.failed += len(failed_ids)
+        return len(batch)
+
+
+def create_dispatcher() -> NotificationDispatcher:
+    """Dispatcher configured from settings, using the installed sender."""
+    settings = get_settings()
+    return NotificationDispatcher(
+        get_notification_sender(),
+        batch_size=settings.notification_batch_size,
+        concurrency=settings.notification_concurrency,
+        poll_interval=settings.notification_poll_interval_seconds,
+        lease_seconds=settings.notification_lease_seconds,
+        retry_seconds=settings.notification_retry_seconds,
+        max_attempts=settings.notification_max_attempts,
+    )
@@ -1,59 +1,91 @@
+import hashlib
+import time
 from fastapi import APIRouter, HTTPException, Depends
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from jose import jwt
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Annotated
 
+from ..cache import TTLCache
 from ..config import get_settings
+from ..id_tokens import get_google_verifier
 from ..schemas import GoogleAuthRequest, TokenResponse, UserResponse
-from ..database import execute_sp_fetchone
+from ..database import async_execute_sp_fetchone, get_db_cursor, run_in_db_executor
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-def create_access_token(user_id: int) -> tuple[str, int]:
-    """Create JWT access token."""
+@lru_cache()
+def get_user_cache() -> TTLCache:
+    """Per-process cache of authenticated users keyed by user id."""
+    settings = get_settings()
+    return TTLCache(max_size=settings.user_cache_max_size, ttl=settings.user_cache_ttl_seconds)
+
+
+@lru_cache()
+def get_token_cache() -> TTLCache:
+    """Per-process cache of verified access-token claims keyed by token hash (entries live until exp)."""
+    return TTLCache(max_size=get_settings().auth_token_cache_max_size)
+
+
+def create_access_token(user: dict) -> tuple[str, int]:
+    """Create JWT access token carrying the user's profile claims."""
     settings = get_settings()
     expire = datetime.utcnow() + timedelta(minutes=settings.jwt_expire_minutes)
     
     payload = {
-        "sub": str(user_id),
+        "sub": str(user["id"]),
         "exp": expire,
         "iat": datetime.utcnow(),
+        "google_id": user["google_id"],
+        "email": user["email"],
+        "name": user["name"],
+        "avatar_url": user["avatar_url"],
     }
     
     token = jwt.encode(payload, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
     return token, settings.jwt_expire_minutes * 60
 
 
-def verify_token(token: str) -> int:
-    """Verify JWT token and return user_id."""
+def decode_token(token: str) -> dict:
+    """Verify JWT token and return its claims.
+    
+    Clients send the same token on every request, so verified claims are
+    cached under the token's hash until the token expires; only the first
+    request with a token pays for the signature check.
+    """
+    cache = get_token_cache()
+    token_hash = hashlib.sha256(token.encode()).digest()
+    payload = cache.get(token_hash)
+    if payload is not None:
+        return payload
+    
     settings = get_settings()
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        user_id = int(payload.get("sub"))
-        return user_id
+        payload["sub"] = int(payload.get("sub"))
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    if isinstance(payload.get("exp"), (int, float)):
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            cache.set(token_hash, payload, ttl=ttl)
+    return payload
 
 
-async def get_current_user(authorization: str = None) -> dict:
-    """Dependency to get current user from token."""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_token(token)
-    
-    # Get user from database (simplified - you might want to cache this)
-    from ..database import get_db_connection
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
+def verify_token(token: str) -> int:
+    """Verify JWT token and return user_id."""
+    return decode_token(token)["sub"]
+
+
+def _load_user(user_id: int) -> dict | None:
+    """Load user row by id."""
+    with get_db_cursor() as (conn, cursor):
         cursor.execute("SELECT id, google_id, email, name, avatar_url FROM Users WHERE id = ?", user_id)
         row = cursor.fetchone()
         if not row:
-            raise HTTPException(status_code=401, detail="User not found")
+            return None
         
         return {
             "id": row[0],
@@ -64,6 +96,38 @@ async def get_current_user(authorization: str = None) -> dict:
         }
 
 
+async def get_current_user(authorization: str = None) -> dict:
+    """Dependency to get current user from token."""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    token = authorization.replace("Bearer ", "")
+    payload = decode_token(token)
+    user_id = payload["sub"]
+    
+    # Tokens issued before claims were added still fall through to the lookup
+    if get_settings().auth_trust_jwt_claims and "email" in payload:
+        return {
+            "id": user_id,
+            "google_id": payload.get("google_id"),
+            "email": payload["email"],
+            "name": payload.get("name"),
+            "avatar_url": payload.get("avatar_url"),
+        }
+    
+    cache = get_user_cache()
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+    
+    user = await run_in_db_executor(_load_user, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    cache.set(user_id, user)
+    return user
+
+
 # Type alias for dependency injection
 CurrentUser = Annotated[dict, Depends(get_current_user)]
 
@@ -71,15 +135,9 @@ CurrentUser = Annotated[dict, Depends(get_current_user)]
 @router.post("/google", response_model=TokenResponse)
 async def google_auth(request: GoogleAuthRequest):
     """Authenticate with Google ID token."""
-    settings = get_settings()
-    
     try:
-        # Verify the Google ID token
-        idinfo = id_token.verify_oauth2_token(
-            request.id_token,
-            requests.Request(),
-            settings.google_client_id
-        )
+        # Verify the Google ID token against the cached signing keys
+        idinfo = await get_google_verifier().verify_async(request.id_token)
         
         # Extract user info
         google_id = idinfo["sub"]
@@ -91,7 +149,7 @@ async def google_auth(request: GoogleAuthRequest):
         raise HTTPException(status_code=401, detail=f"Invalid Google token: {str(e)}")
     
     # Create or update user in database
-    user = execute_sp_fetchone("sp_UpsertUser", {
+    user = await async_execute_sp_fetchone("sp_UpsertUser", {
         "google_id": google_id,
         "email": email,
         "name": name,
@@ -101,8 +159,11 @@ async def google_auth(request: GoogleAuthRequest):
     if not user:
         raise HTTPException(status_code=500, detail="Failed to create user")
     
+    # Profile may have changed; next request reloads it
+    get_user_cache().invalidate(user["id"])
+    
     # Create JWT token
-    access_token, expires_in = create_access_token(user["id"])
+    access_token, expires_in = create_access_token(user)
     
     return TokenResponse(
         access_token=access_token,
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Header
+from typing import List, Optional
+
+from ..schemas import ReminderCreate, NotificationResponse
+from ..database import async_execute_sp_fetchone, async_execute_sp_fetchall
+from ..serialization import RowSerializer, JsonSerializer
+from .auth import get_current_user
+from .sync import to_utc_naive
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+notification_row = RowSerializer(NotificationResponse)
+notification_list_json = JsonSerializer(List[NotificationResponse])
+
+
+async def get_user_from_header(authorization: Optional[str] = Header(None)) -> dict:
+    """Get current user from authorization header."""
+    return await get_current_user(authorization)
+
+
+@router.get("", response_model=List[NotificationResponse])
+async def get_notifications(authorization: Optional[str] = Header(None)):
+    """Get due, unread notifications for current user (newest first)."""
+    user = await get_user_from_header(authorization)
+    
+    notifications = await async_execute_sp_fetchall("sp_GetPendingNotifications", {"user_id": user["id"]})
+    
+    return notification_list_json.response(notification_row.rows(notifications))
+
+
+@router.post("/reminders")
+async def create_reminder(reminder: ReminderCreate, authorization: Optional[str] = Header(None)):
+    """Schedule a reminder for a task."""
+    user = await get_user_from_header(authorization)
+    
+    result = await async_execute_sp_fetchone("sp_CreateTaskReminder", {
+        "task_id": reminder.task_id,
+        "user_id": user["id"],
+        "scheduled_at": to_utc_naive(reminder.scheduled_at),
+    })
+    
+    if not result or result["notification_id"] is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    return {"notification_id": result["notification_id"]}
+
+
+@router.post("/{notification_id}/read")
+async def mark_notification_read(notification_id: int, authorization: Optional[str] = Header(None)):
+    """Mark a notification as read."""
+    user = await get_user_from_header(authorization)
+    
+    result = await async_execute_sp_fetchone("sp_MarkNotificationRead", {
+        "notification_id": notification_id,
+        "user_id": user["id"],
+    })
+    
+    if not result or result.get("affected_rows", 0) == 0:
+        raise HTTPException(status_code=404, detail="Notification not found")
+    
+    return {"message": "Notification marked as read"}
@@ -1,13 +1,23 @@
-from fastapi import APIRouter, Header
+import base64
+import binascii
+import json
+from fastapi import APIRouter, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 
+from ..config import get_settings
+from ..events import TooManyConnectionsError, change_stream, get_change_hub, publish_change
 from ..schemas import (
-    SyncPullRequest, SyncPushRequest, SyncResponse, 
-    ConflictData, ConflictResolution, SyncedTab, SyncedTask
+    SyncPullRequest, SyncPushRequest, SyncResponse, SyncDeltaResponse,
+    ConflictData, ConflictResolution, SyncedTab, SyncedTask, SyncItemStatus
 )
-from ..database import execute_sp_fetchone, execute_sp_fetchall
-from ..database.connection import execute_sp_multiple_results
+from ..database import (
+    async_execute_sp_fetchone, async_execute_sp_fetchall, async_execute_sp_multiple_results,
+)
+from ..serialization import RowSerializer, JsonSerializer, str_or_none
+from ..streaming import wants_ndjson, ndjson_response, stream_ndjson
 from .auth import get_current_user
 
 router = APIRouter(prefix="/sync", tags=["Sync"])
@@ -18,120 +28,320 @@ async def get_user_from_header(authorization: Optional[str] = Header(None)) -> d
     return await get_current_user(authorization)
 
 
-@router.post("/pull", response_model=SyncResponse)
-async def sync_pull(request: SyncPullRequest, authorization: Optional[str] = Header(None)):
+def to_utc_naive(value: datetime) -> datetime:
+    """Normalize a client timestamp to naive UTC, as stored by the database."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def build_conflict_data(result: dict) -> ConflictData:
+    """Build per-item push result from sp_SyncPush/sp_SyncPushBatch row."""
+    return ConflictData(
+        has_conflict=result["has_conflict"],
+        entity_id=result.get("entity_id"),
+        client_id=result["client_id"],
+        entity_type=result["entity_type"],
+        server_updated_at=result.get("server_updated_at"),
+        client_updated_at=result["client_updated_at"],
+        status=result.get("status"),
+        reason=result.get("reason"),
+        conflict_fields=result["conflict_fields"].split(",") if result.get("conflict_fields") else None,
+        change_seq=result.get("change_seq"),
+    )
+
+
+def serialize_batch(items: list[SyncPushRequest], start_index: int = 0) -> str:
+    """Serialize push items as the JSON array sp_SyncPushBatch expects."""
+    return json.dumps([
+        {
+            "item_index": start_index + i,
+            "client_id": item.client_id,
+            "entity_type": item.entity_type,
+            "data": item.data,
+            "client_updated_at": item.client_updated_at.isoformat(),
+            "base_seq": item.base_seq,
+        }
+        for i, item in enumerate(items)
+    ], default=str)
+
+
+synced_tab_row = RowSerializer(SyncedTab)
+synced_task_row = RowSerializer(SyncedTask, convert={"due_date": str_or_none, "due_time": str_or_none})
+synced_tab_json = JsonSerializer(SyncedTab)
+synced_task_json = JsonSerializer(SyncedTask)
+sync_response_json = JsonSerializer(SyncResponse)
+sync_delta_json = JsonSerializer(SyncDeltaResponse)
+
+
+def sync_pull_response(
+    tab_rows: list[dict], task_rows: list[dict], sync_timestamp: datetime, **fields,
+) -> Response:
+    """Serialize a pull result straight from the database rows."""
+    return sync_response_json.response({
+        "tabs": synced_tab_row.rows(tab_rows),
+        "tasks": synced_task_row.rows(task_rows),
+        "sync_timestamp": sync_timestamp,
+        "conflicts": [],
+        "next_cursor": None,
+        "has_more": False,
+        "next_seq": None,
+        **fields,
+    })
+
+
+def delta_rows(rows: list[dict], serializer: RowSerializer) -> list[dict]:
+    """EntityDelta items: each row cut down to its changed_fields."""
+    deltas = []
+    for row in rows:
+        item = serializer(row)
+        changed = row["changed_fields"].split(",") if row["changed_fields"] else ()
+        deltas.append({
+            "id": item["id"],
+            "client_id": item["client_id"],
+            "updated_at": item["updated_at"],
+            "change_seq": item["change_seq"],
+            "fields": {name: item[name] for name in changed if name in item},
+        })
+    return deltas
+
+
+def encode_sync_cursor(position: dict) -> str:
+    """Encode a pull position as an opaque cursor string."""
+    raw = json.dumps(position, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> dict:
+    """Decode a cursor from encode_sync_cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        if position["entity_type"] not in ("tab", "task"):
+            raise ValueError(position["entity_type"])
+        datetime.fromisoformat(position["started_at"])
+        return position
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+
+def encode_tab_line(tab: dict) -> bytes:
+    """Encode database row as one NDJSON sync record."""
+    return b'{"type":"tab","data":' + synced_tab_json.dumps(synced_tab_row(tab)) + b"}"
+
+
+def encode_task_line(task: dict) -> bytes:
+    """Encode database row as one NDJSON sync record."""
+    return b'{"type":"task","data":' + synced_task_json.dumps(synced_task_row(task)) + b"}"
+
+
+@router.post("/pull", response_model=SyncResponse | SyncDeltaResponse)
+async def sync_pull(
+    request: SyncPullRequest,
+    authorization: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
     """
     Pull changes from server since last sync.
     Returns all tabs and tasks modified after last_sync_at.
+    With page_size or cursor set, returns one page plus next_cursor/has_more;
+    pass next_cursor back (also after a dropped connection) to get the next page.
+    With since_seq set, pulls by server change sequence instead of timestamps;
+    repeat with since_seq=next_seq while has_more. Add delta=true to get
+    {id, client_id, updated_at, change_seq, fields} per entity, where fields
+    holds only what changed after since_seq.
+    With Accept: application/x-ndjson (unpaged only), streams one
+    {"type": "tab"|"task", "data": ...} record per line and a final
+    {"type": "meta", "sync_timestamp": ...} line.
     """
     user = await get_user_from_header(authorization)
     
+    if request.since_seq is not None:
+        return await sync_pull_since(user, request)
+    
+    if request.cursor is None and request.page_size is None:
+        if wants_ndjson(accept):
+            return sync_pull_stream(user, request)
+        return await sync_pull_all(user, request)
+    
+    settings = get_settings()
+    page_size = min(request.page_size or settings.sync_pull_page_size, settings.sync_pull_max_page_size)
+    
+    if request.cursor:
+        position = decode_sync_cursor(request.cursor)
+    else:
+        position = {
+            "entity_type": "tab",
+            "updated_at": None,
+            "id": None,
+            "last_sync_at": to_utc_naive(request.last_sync_at).isoformat() if request.last_sync_at else None,
+            "started_at": datetime.utcnow().isoformat(),
+        }
+    
+    results = await async_execute_sp_multiple_results("sp_SyncPullPage", {
+        "user_id": user["id"],
+        "device_id": request.device_id,
+        "last_sync_at": position["last_sync_at"],
+        "entity_type": position["entity_type"],
+        "after_updated_at": position["updated_at"],
+        "after_id": position["id"],
+        "page_size": page_size,
+    }, compact=True)
+    
+    tab_rows = results[0] if len(results) > 0 else []
+    task_rows = results[1] if len(results) > 1 else []
+    
+    # Each stream returns one probe row past what fits in the page
+    next_position = None
+    if len(tab_rows) > page_size:
+        tab_rows = tab_rows[:page_size]
+        last = tab_rows[-1]
+        next_position = {"entity_type": "tab", "updated_at": last["cursor_updated_at"], "id": last["id"]}
+    elif len(task_rows) > page_size - len(tab_rows):
+        task_rows = task_rows[:page_size - len(tab_rows)]
+        if task_rows:
+            last = task_rows[-1]
+            next_position = {"entity_type": "task", "updated_at": last["cursor_updated_at"], "id": last["id"]}
+        else:
+            next_position = {"entity_type": "task", "updated_at": None, "id": None}
+    
+    next_cursor = None
+    if next_position:
+        next_position["last_sync_at"] = position["last_sync_at"]
+        next_position["started_at"] = position["started_at"]
+        next_cursor = encode_sync_cursor(next_position)
+    
+    return sync_pull_response(
+        tab_rows,
+        task_rows,
+        # Changes made while paging are newer than this, so the next pull picks them up
+        datetime.fromisoformat(position["started_at"]),
+        next_cursor=next_cursor,
+        has_more=next_cursor is not None,
+    )
+
+
+async def sync_pull_since(user: dict, request: SyncPullRequest) -> Response:
+    """One page of changes after a change-sequence token."""
+    settings = get_settings()
+    page_size = min(request.page_size or settings.sync_pull_page_size, settings.sync_pull_max_page_size)
+    
+    results = await async_execute_sp_multiple_results("sp_SyncPullSince", {
+        "user_id": user["id"],
+        "device_id": request.device_id,
+        "since_seq": request.since_seq,
+        "page_size": page_size,
+        "delta": request.delta,
+    }, compact=True)
+    
+    max_seq = results[0][0]["max_seq"] if results and results[0] else request.since_seq
+    tab_rows = results[1] if len(results) > 1 else []
+    task_rows = results[2] if len(results) > 2 else []
+    
+    # Merge both streams by change_seq and keep one page
+    changes = sorted(
+        [(row["change_seq"], True, row) for row in tab_rows] +
+        [(row["change_seq"], False, row) for row in task_rows],
+        key=lambda change: change[0],
+    )
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+    tab_rows = [row for _, is_tab, row in changes if is_tab]
+    task_rows = [row for _, is_tab, row in changes if not is_tab]
+    next_seq = changes[-1][0] if has_more else max(max_seq, request.since_seq)
+    
+    if request.delta:
+        return sync_delta_json.response({
+            "tabs": delta_rows(tab_rows, synced_tab_row),
+            "tasks": delta_rows(task_rows, synced_task_row),
+            "sync_timestamp": datetime.utcnow(),
+            "has_more": has_more,
+            "next_seq": next_seq,
+        })
+    
+    return sync_pull_response(tab_rows, task_rows, datetime.utcnow(), has_more=has_more, next_seq=next_seq)
+
+
+def sync_pull_stream(user: dict, request: SyncPullRequest):
+    """Unpaged pull streamed as NDJSON straight from the cursor."""
+    # Taken before the query so rows changed while streaming are pulled again next time
+    meta = json.dumps({"type": "meta", "sync_timestamp": datetime.utcnow().isoformat()})
+    return ndjson_response(stream_ndjson(
+        "sp_SyncPull",
+        {
+            "user_id": user["id"],
+            "device_id": request.device_id,
+            "last_sync_at": request.last_sync_at,
+        },
+        {0: encode_tab_line, 1: encode_task_line},
+        trailer=meta,
+    ))
+
+
+async def sync_pull_all(user: dict, request: SyncPullRequest) -> Response:
+    """Unpaged pull: every change since last_sync_at in one response."""
     # Execute stored procedure that returns multiple result sets
-    results = execute_sp_multiple_results("sp_SyncPull", {
+    results = await async_execute_sp_multiple_results("sp_SyncPull", {
         "user_id": user["id"],
         "device_id": request.device_id,
         "last_sync_at": request.last_sync_at,
-    })
+    }, compact=True)
     
-    # First result set: tabs
-    tabs = []
-    if len(results) > 0:
-        for tab in results[0]:
-            tabs.append(SyncedTab(
-                id=tab["id"],
-                client_id=tab["client_id"],
-                name=tab["name"],
-                order_index=tab["order_index"],
-                is_system=tab["is_system"],
-                tab_type=tab["tab_type"],
-                created_at=tab["created_at"],
-                updated_at=tab["updated_at"],
-                is_deleted=tab["is_deleted"],
-            ))
-    
-    # Second result set: tasks
-    tasks = []
-    if len(results) > 1:
-        for task in results[1]:
-            tasks.append(SyncedTask(
-                id=task["id"],
-                client_id=task["client_id"],
-                tab_id=task.get("tab_id"),
-                parent_task_id=task.get("parent_task_id"),
-                title=task["title"],
-                description=task.get("description"),
-                is_completed=task["is_completed"],
-                due_date=str(task["due_date"]) if task.get("due_date") else None,
-                due_time=str(task["due_time"]) if task.get("due_time") else None,
-                depth=task["depth"],
-                order_index=task["order_index"],
-                created_at=task["created_at"],
-                updated_at=task["updated_at"],
-                completed_at=task.get("completed_at"),
-                is_deleted=task["is_deleted"],
-            ))
-    
-    return SyncResponse(
-        tabs=tabs,
-        tasks=tasks,
-        sync_timestamp=datetime.utcnow(),
-        conflicts=[],
-    )
+    # First result set: tabs, second: tasks
+    tab_rows = results[0] if len(results) > 0 else []
+    task_rows = results[1] if len(results) > 1 else []
+    
+    return sync_pull_response(tab_rows, task_rows, datetime.utcnow())
 
 
 @router.post("/push", response_model=ConflictData)
 async def sync_push(request: SyncPushRequest, authorization: Optional[str] = Header(None)):
     """
     Push local changes to server.
-    Returns conflict data if there's a conflict.
+    The change is applied (upserted by client_id) unless the server copy is newer.
+    Returns the item's status: applied, conflict or rejected.
     """
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_SyncPush", {
+    result = await async_execute_sp_fetchone("sp_SyncPush", {
         "user_id": user["id"],
         "device_id": request.device_id,
         "client_id": request.client_id,
         "entity_type": request.entity_type,
-        "data": str(request.data),  # JSON string
-        "client_updated_at": request.client_updated_at,
+        "data": json.dumps(request.data, default=str),
+        "client_updated_at": to_utc_naive(request.client_updated_at),
+        "base_seq": request.base_seq,
     })
     
     if not result:
-        # No conflict, item is new - create it
-        return ConflictData(
-            has_conflict=False,
-            entity_id=None,
-            client_id=request.client_id,
-            entity_type=request.entity_type,
-            server_updated_at=None,
-            client_updated_at=request.client_updated_at,
-        )
+        raise HTTPException(status_code=500, detail="Failed to push change")
     
-    return ConflictData(
-        has_conflict=result["has_conflict"],
-        entity_id=result.get("entity_id"),
-        client_id=result["client_id"],
-        entity_type=result["entity_type"],
-        server_updated_at=result.get("server_updated_at"),
-        client_updated_at=result["client_updated_at"],
-    )
+    if result.get("status") == SyncItemStatus.APPLIED:
+        await publish_change(user["id"], request.entity_type, request.device_id)
+    return build_conflict_data(result)
 
 
 @router.post("/resolve")
-async def resolve_conflict(resolution: ConflictResolution, authorization: Optional[str] = Header(None)):
+async def resolve_conflict(
+    resolution: ConflictResolution,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """
     Resolve a sync conflict with user's choice.
     """
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_ResolveConflict", {
+    result = await async_execute_sp_fetchone("sp_ResolveConflict", {
         "user_id": user["id"],
         "client_id": resolution.client_id,
         "entity_type": resolution.entity_type,
         "resolution": resolution.resolution,
-        "client_data": str(resolution.client_data) if resolution.client_data else None,
+        "client_data": json.dumps(resolution.client_data, default=str) if resolution.client_data else None,
     })
     
+    if result and result.get("success"):
+        await publish_change(user["id"], resolution.entity_type, x_device_id)
     return {
         "success": result.get("success", False) if result else False,
         "applied_resolution": result.get("applied_resolution") if result else None,
@@ -145,37 +355,81 @@ async def sync_batch_push(
 ):
     """
     Push multiple changes at once.
-    Returns list of conflicts if any.
+    Returns ids of applied items, plus conflicted and rejected items.
     """
     user = await get_user_from_header(authorization)
+    settings = get_settings()
+    
+    if len(items) > settings.sync_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(items)} items (max {settings.sync_batch_max_size})",
+        )
+    
+    # A batch is one device's queue: its device_id is logged with every
+    # change and keeps the change notifications from echoing back to it
+    device_ids = {item.device_id for item in items}
+    if len(device_ids) > 1:
+        raise HTTPException(status_code=400, detail="All items in a batch must have the same device_id")
+    device_id = device_ids.pop() if device_ids else None
     
     conflicts = []
+    rejected = []
     synced = []
+    changed_types = set()
     
-    for item in items:
-        result = execute_sp_fetchone("sp_SyncPush", {
+    # One DB call per chunk; conflicts are detected set-wise inside sp_SyncPushBatch
+    chunk_size = max(1, settings.sync_batch_chunk_size)
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        results = await async_execute_sp_fetchall("sp_SyncPushBatch", {
             "user_id": user["id"],
-            "device_id": item.device_id,
-            "client_id": item.client_id,
-            "entity_type": item.entity_type,
-            "data": str(item.data),
-            "client_updated_at": item.client_updated_at,
+            "device_id": device_id,
+            "items": serialize_batch(chunk, start),
         })
         
-        if result and result.get("has_conflict"):
-            conflicts.append(ConflictData(
-                has_conflict=True,
-                entity_id=result.get("entity_id"),
-                client_id=result["client_id"],
-                entity_type=result["entity_type"],
-                server_updated_at=result.get("server_updated_at"),
-                client_updated_at=result["client_updated_at"],
-            ))
-        else:
-            synced.append(item.client_id)
+        for result in results:
+            if result["status"] == SyncItemStatus.APPLIED:
+                synced.append(result["client_id"])
+                changed_types.add(result["entity_type"])
+            elif result["status"] == SyncItemStatus.CONFLICT:
+                conflicts.append(build_conflict_data(result))
+            else:
+                rejected.append(build_conflict_data(result))
     
+    for entity_type in sorted(changed_types):
+        await publish_change(user["id"], entity_type, device_id)
     return {
         "synced_count": len(synced),
         "synced_ids": synced,
         "conflicts": conflicts,
+        "rejected": rejected,
     }
+
+
+@router.get("/stream")
+async def sync_stream(
+    device_id: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Server-sent change notifications, instead of polling /sync/pull.
+    Emits "changed" (with the changed entity types) whenever another device
+    writes; the client then pulls. Writes made with this device_id (push body,
+    or X-Device-Id header on the tab/task endpoints) are not echoed back.
+    """
+    user = await get_user_from_header(authorization)
+    hub = get_change_hub()
+    
+    try:
+        subscription = hub.subscribe(user["id"], device_id)
+    except TooManyConnectionsError:
+        raise HTTPException(status_code=429, detail="Too many open change streams")
+    
+    return StreamingResponse(
+        change_stream(subscription, get_settings().sync_stream_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also unsubscribes if the client left before the stream started
+        background=BackgroundTask(hub.unsubscribe, subscription),
+    )
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Request
 from typing import List, Optional
 
 from ..schemas import TabCreate, TabUpdate, TabResponse
-from ..database import execute_sp_fetchone, execute_sp_fetchall
+from ..events import publish_change
+from ..database import async_execute_sp_fetchone, async_execute_sp_fetchall
+from ..cache import get_data_version
+from ..etag import compute_etag, etag_matches, not_modified, set_etag
+from ..serialization import RowSerializer, JsonSerializer
 from .auth import get_current_user
 
 router = APIRouter(prefix="/tabs", tags=["Tabs"])
 
+tab_row = RowSerializer(TabResponse)
+tab_list_json = JsonSerializer(List[TabResponse])
+
 
 async def get_user_from_header(authorization: Optional[str] = Header(None)) -> dict:
     """Get current user from authorization header."""
@@ -14,30 +21,35 @@ async def get_user_from_header(authorization: Optional[str] = Header(None)) -> d
 
 
 @router.get("", response_model=List[TabResponse])
-async def get_tabs(authorization: Optional[str] = Header(None)):
-    """Get all tabs for current user."""
+async def get_tabs(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get all tabs for current user (304 if unchanged since If-None-Match)."""
     user = await get_user_from_header(authorization)
     
-    tabs = execute_sp_fetchall("sp_GetUserTabs", {"user_id": user["id"]})
+    etag = compute_etag(request, user["id"], await get_data_version(user["id"]))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    tabs = await async_execute_sp_fetchall("sp_GetUserTabs", {"user_id": user["id"]})
     
-    return [TabResponse(
-        id=tab["id"],
-        client_id=tab["client_id"],
-        name=tab["name"],
-        order_index=tab["order_index"],
-        is_system=tab["is_system"],
-        tab_type=tab["tab_type"],
-        created_at=tab["created_at"],
-        updated_at=tab["updated_at"],
-    ) for tab in tabs]
+    response = tab_list_json.response(tab_row.rows(tabs))
+    set_etag(response, etag)
+    return response
 
 
 @router.post("", response_model=TabResponse)
-async def create_tab(tab: TabCreate, authorization: Optional[str] = Header(None)):
+async def create_tab(
+    tab: TabCreate,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Create a new custom tab."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_CreateTab", {
+    result = await async_execute_sp_fetchone("sp_CreateTab", {
         "client_id": tab.client_id,
         "user_id": user["id"],
         "name": tab.name,
@@ -47,6 +59,7 @@ async def create_tab(tab: TabCreate, authorization: Optional[str] = Header(None)
     if not result:
         raise HTTPException(status_code=500, detail="Failed to create tab")
     
+    await publish_change(user["id"], "tab", x_device_id)
     return TabResponse(
         id=result["id"],
         client_id=result["client_id"],
@@ -60,11 +73,16 @@ async def create_tab(tab: TabCreate, authorization: Optional[str] = Header(None)
 
 
 @router.put("/{tab_id}", response_model=TabResponse)
-async def update_tab(tab_id: int, tab: TabUpdate, authorization: Optional[str] = Header(None)):
+async def update_tab(
+    tab_id: int,
+    tab: TabUpdate,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Update an existing tab."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_UpdateTab", {
+    result = await async_execute_sp_fetchone("sp_UpdateTab", {
         "tab_id": tab_id,
         "user_id": user["id"],
         "name": tab.name,
@@ -74,6 +92,7 @@ async def update_tab(tab_id: int, tab: TabUpdate, authorization: Optional[str] =
     if not result:
         raise HTTPException(status_code=404, detail="Tab not found")
     
+    await publish_change(user["id"], "tab", x_device_id)
     return TabResponse(
         id=result["id"],
         client_id=result["client_id"],
@@ -87,11 +106,15 @@ async def update_tab(tab_id: int, tab: TabUpdate, authorization: Optional[str] =
 
 
 @router.delete("/{tab_id}")
-async def delete_tab(tab_id: int, authorization: Optional[str] = Header(None)):
+async def delete_tab(
+    tab_id: int,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Delete a custom tab (soft delete)."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_DeleteTab", {
+    result = await async_execute_sp_fetchone("sp_DeleteTab", {
         "tab_id": tab_id,
         "user_id": user["id"],
     })
@@ -99,4 +122,5 @@ async def delete_tab(tab_id: int, authorization: Optional[str] = Header(None)):
     if not result or result.get("affected_rows", 0) == 0:
         raise HTTPException(status_code=404, detail="Tab not found or cannot be deleted")
     
+    await publish_change(user["id"], "tab", x_device_id)
     return {"message": "Tab deleted successfully"}
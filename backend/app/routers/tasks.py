@@ -1,8 +1,22 @@
-from fastapi import APIRouter, HTTPException, Header, Query
+import json
+import re
+from fastapi import APIRouter, HTTPException, Header, Query, Request, Response
+from datetime import date, datetime
 from typing import List, Optional
 
-from ..schemas import TaskCreate, TaskUpdate, TaskComplete, TaskResponse
-from ..database import execute_sp_fetchone, execute_sp_fetchall
+from ..cache import cached_view, get_data_version
+from ..config import get_settings
+from ..events import publish_change
+from ..schemas import (
+    TaskCreate, TaskUpdate, TaskComplete, TaskResponse, TaskWithChildren,
+    TaskBulkIds, TaskBulkComplete, TaskBulkMove, TaskSearchResult, TaskSearchResponse,
+)
+from ..etag import compute_etag, etag_matches, not_modified, set_etag
+from ..serialization import RowSerializer, JsonSerializer
+from ..database import (
+    async_execute_sp_fetchone, async_execute_sp_fetchall, QueryTimeoutError, PoolTimeoutError,
+)
+from ..streaming import wants_ndjson, ndjson_response, stream_ndjson
 from .auth import get_current_user
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
@@ -13,6 +27,20 @@ async def get_user_from_header(authorization: Optional[str] = Header(None)) -> d
     return await get_current_user(authorization)
 
 
+task_row = RowSerializer(TaskResponse)
+tree_row = RowSerializer(TaskWithChildren)
+task_json = JsonSerializer(TaskResponse)
+task_list_json = JsonSerializer(List[TaskResponse])
+task_tree_json = JsonSerializer(List[TaskWithChildren])
+search_row = RowSerializer(TaskSearchResult)
+search_json = JsonSerializer(TaskSearchResponse)
+
+
+def encode_task_row(task: dict) -> bytes:
+    """Encode database row as one NDJSON TaskResponse line."""
+    return task_json.dumps(task_row(task))
+
+
 def build_task_response(task: dict) -> TaskResponse:
     """Build TaskResponse from database row."""
     return TaskResponse(
@@ -34,57 +62,292 @@ def build_task_response(task: dict) -> TaskResponse:
     )
 
 
+async def load_today_tasks(user_id: int, version: int | None) -> list[dict]:
+    """Rows of the Today view (cached at the user's data version)."""
+    # The view depends on the UTC date, so a new day is a new cache entry
+    return await cached_view(
+        user_id, f"today:{datetime.utcnow().date()}",
+        lambda: async_execute_sp_fetchall("sp_GetTodayTasks", {"user_id": user_id}, compact=True),
+        version,
+    )
+
+
+async def load_all_tasks(user_id: int, version: int | None, include_completed: bool) -> list[dict]:
+    """Rows of the AllTasks view (cached at the user's data version)."""
+    return await cached_view(
+        user_id, "all",
+        lambda: async_execute_sp_fetchall("sp_GetAllTasks", {
+            "user_id": user_id,
+            "include_completed": include_completed,
+        }, compact=True),
+        version,
+        include_completed=include_completed,
+    )
+
+
+async def load_tab_tasks(user_id: int, version: int | None, tab_id: int, include_completed: bool) -> list[dict]:
+    """Rows of a tab view (cached at the user's data version)."""
+    return await cached_view(
+        user_id, "tab",
+        lambda: async_execute_sp_fetchall("sp_GetTasksByTab", {
+            "user_id": user_id,
+            "tab_id": tab_id,
+            "include_completed": include_completed,
+        }, compact=True),
+        version,
+        tab_id=tab_id,
+        include_completed=include_completed,
+    )
+
+
+def build_task_tree(tasks: list[dict]) -> list[dict]:
+    """Assemble database rows into TaskWithChildren-shaped dicts in one pass over the rows.
+
+    Siblings keep the order the procedure returned them in; rows whose parent
+    is not in the result become roots.
+    """
+    ordered = tree_row.rows(tasks)
+    nodes = {}
+    for node in ordered:
+        node["children"] = []
+        nodes[node["id"]] = node
+    roots = []
+    for node in ordered:
+        parent = nodes.get(node["parent_task_id"]) if node["parent_task_id"] else None
+        if parent is None:
+            roots.append(node)
+            continue
+        parent["children"].append(node)
+        parent["child_count"] += 1
+        if node["is_completed"]:
+            parent["completed_child_count"] += 1
+        else:
+            parent["has_incomplete_children"] = True
+    return roots
+
+
+def task_tree_response(tasks: list[dict]) -> Response:
+    """Serialize the task tree straight to JSON."""
+    return task_tree_json.response(build_task_tree(tasks))
+
+
+@router.get("/tree/today", response_model=List[TaskWithChildren])
+async def get_today_task_tree(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get today's tasks as a tree."""
+    user = await get_user_from_header(authorization)
+    
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version, datetime.utcnow().date())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    tasks = await load_today_tasks(user["id"], version)
+    
+    response = task_tree_response(tasks)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/tree/all", response_model=List[TaskWithChildren])
+async def get_all_task_tree(
+    request: Request,
+    include_completed: bool = Query(True),
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get all tasks as a tree."""
+    user = await get_user_from_header(authorization)
+    
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    tasks = await load_all_tasks(user["id"], version, include_completed)
+    
+    response = task_tree_response(tasks)
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/tree/tab/{tab_id}", response_model=List[TaskWithChildren])
+async def get_tab_task_tree(
+    tab_id: int,
+    request: Request,
+    include_completed: bool = Query(False),
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get tasks of a tab as a tree."""
+    user = await get_user_from_header(authorization)
+    
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    tasks = await load_tab_tasks(user["id"], version, tab_id, include_completed)
+    
+    response = task_tree_response(tasks)
+    set_etag(response, etag)
+    return response
+
+
 @router.get("/today", response_model=List[TaskResponse])
-async def get_today_tasks(authorization: Optional[str] = Header(None)):
-    """Get tasks due today or overdue."""
+async def get_today_tasks(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get tasks due today or overdue (304 if unchanged since If-None-Match)."""
     user = await get_user_from_header(authorization)
     
-    tasks = execute_sp_fetchall("sp_GetTodayTasks", {"user_id": user["id"]})
+    # The view rolls over at UTC midnight without any write
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version, datetime.utcnow().date())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    return [build_task_response(task) for task in tasks]
+    tasks = await load_today_tasks(user["id"], version)
+    
+    response = task_list_json.response(task_row.rows(tasks))
+    set_etag(response, etag)
+    return response
 
 
 @router.get("/all", response_model=List[TaskResponse])
 async def get_all_tasks(
+    request: Request,
     include_completed: bool = Query(True),
-    authorization: Optional[str] = Header(None)
+    authorization: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
-    """Get all tasks for AllTasks view."""
+    """Get all tasks for AllTasks view (streamed as NDJSON if Accept: application/x-ndjson)."""
     user = await get_user_from_header(authorization)
+    ndjson = wants_ndjson(accept)
     
-    tasks = execute_sp_fetchall("sp_GetAllTasks", {
-        "user_id": user["id"],
-        "include_completed": include_completed,
-    })
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version, ndjson)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
     
-    return [build_task_response(task) for task in tasks]
+    if ndjson:
+        params = {
+            "user_id": user["id"],
+            "include_completed": include_completed,
+        }
+        streamed = ndjson_response(stream_ndjson("sp_GetAllTasks", params, {0: encode_task_row}))
+        set_etag(streamed, etag)
+        return streamed
+    
+    tasks = await load_all_tasks(user["id"], version, include_completed)
+    
+    response = task_list_json.response(task_row.rows(tasks))
+    set_etag(response, etag)
+    return response
 
 
 @router.get("/tab/{tab_id}", response_model=List[TaskResponse])
 async def get_tasks_by_tab(
     tab_id: int,
+    request: Request,
     include_completed: bool = Query(False),
-    authorization: Optional[str] = Header(None)
+    authorization: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
+    """Get tasks for a specific tab (streamed as NDJSON if Accept: application/x-ndjson)."""
+    user = await get_user_from_header(authorization)
+    ndjson = wants_ndjson(accept)
+    
+    version = await get_data_version(user["id"])
+    etag = compute_etag(request, user["id"], version, ndjson)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    if ndjson:
+        params = {
+            "user_id": user["id"],
+            "tab_id": tab_id,
+            "include_completed": include_completed,
+        }
+        streamed = ndjson_response(stream_ndjson("sp_GetTasksByTab", params, {0: encode_task_row}))
+        set_etag(streamed, etag)
+        return streamed
+    
+    tasks = await load_tab_tasks(user["id"], version, tab_id, include_completed)
+    
+    response = task_list_json.response(task_row.rows(tasks))
+    set_etag(response, etag)
+    return response
+
+
+def search_terms(q: str, max_terms: int) -> list[str]:
+    """Distinct words of a search query, in order; anything but letters and digits separates words."""
+    return list(dict.fromkeys(re.findall(r"\w+", q.casefold())))[:max_terms]
+
+
+@router.get("/search", response_model=TaskSearchResponse)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200),
+    tab_id: Optional[int] = Query(None),
+    is_completed: Optional[bool] = Query(None),
+    due_from: Optional[date] = Query(None),
+    due_to: Optional[date] = Query(None),
+    limit: Optional[int] = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    authorization: Optional[str] = Header(None),
 ):
-    """Get tasks for a specific tab."""
+    """
+    Search task titles and descriptions.
+    Every word of q must match the start of a word in the title or description
+    ("plan" finds "planning"). Results are ranked by relevance, title matches
+    first, and paged with limit/offset (next_offset is set while more follow).
+    Optional filters: tab_id, is_completed, due_from / due_to (inclusive).
+    """
     user = await get_user_from_header(authorization)
+    settings = get_settings()
+    
+    terms = search_terms(q, settings.task_search_max_terms)
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain a word")
+    limit = min(limit or settings.task_search_page_size, settings.task_search_max_page_size)
     
-    tasks = execute_sp_fetchall("sp_GetTasksByTab", {
+    rows = await async_execute_sp_fetchall("sp_SearchTasks", {
         "user_id": user["id"],
+        "terms": json.dumps(terms),
         "tab_id": tab_id,
-        "include_completed": include_completed,
-    })
+        "is_completed": is_completed,
+        "due_from": due_from,
+        "due_to": due_to,
+        "offset": offset,
+        "limit": limit,
+    }, compact=True)
     
-    return [build_task_response(task) for task in tasks]
+    total = rows[0]["total_count"] if rows else 0
+    return search_json.response({
+        "tasks": search_row.rows(rows),
+        "total": total,
+        "next_offset": offset + len(rows) if offset + len(rows) < total else None,
+    })
 
 
 @router.post("", response_model=TaskResponse)
-async def create_task(task: TaskCreate, authorization: Optional[str] = Header(None)):
+async def create_task(
+    task: TaskCreate,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Create a new task."""
     user = await get_user_from_header(authorization)
     
     try:
-        result = execute_sp_fetchone("sp_CreateTask", {
+        result = await async_execute_sp_fetchone("sp_CreateTask", {
             "client_id": task.client_id,
             "user_id": user["id"],
             "tab_id": task.tab_id,
@@ -94,6 +357,8 @@ async def create_task(task: TaskCreate, authorization: Optional[str] = Header(No
             "due_date": task.due_date,
             "due_time": task.due_time,
         })
+    except (QueryTimeoutError, PoolTimeoutError):
+        raise
     except Exception as e:
         # Check if it's a depth validation error
         if "მაქსიმალური სიღრმე" in str(e):
@@ -103,15 +368,21 @@ async def create_task(task: TaskCreate, authorization: Optional[str] = Header(No
     if not result:
         raise HTTPException(status_code=500, detail="Failed to create task")
     
+    await publish_change(user["id"], "task", x_device_id)
     return build_task_response(result)
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task(task_id: int, task: TaskUpdate, authorization: Optional[str] = Header(None)):
+async def update_task(
+    task_id: int,
+    task: TaskUpdate,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Update an existing task."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_UpdateTask", {
+    result = await async_execute_sp_fetchone("sp_UpdateTask", {
         "task_id": task_id,
         "user_id": user["id"],
         "title": task.title,
@@ -124,15 +395,21 @@ async def update_task(task_id: int, task: TaskUpdate, authorization: Optional[st
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    await publish_change(user["id"], "task", x_device_id)
     return build_task_response(result)
 
 
 @router.put("/{task_id}/complete", response_model=TaskResponse)
-async def complete_task(task_id: int, data: TaskComplete, authorization: Optional[str] = Header(None)):
+async def complete_task(
+    task_id: int,
+    data: TaskComplete,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Mark task as completed or uncompleted."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_CompleteTask", {
+    result = await async_execute_sp_fetchone("sp_CompleteTask", {
         "task_id": task_id,
         "user_id": user["id"],
         "is_completed": data.is_completed,
@@ -141,15 +418,20 @@ async def complete_task(task_id: int, data: TaskComplete, authorization: Optiona
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    await publish_change(user["id"], "task", x_device_id)
     return build_task_response(result)
 
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: int, authorization: Optional[str] = Header(None)):
+async def delete_task(
+    task_id: int,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Delete a task and all its children (soft delete)."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_DeleteTask", {
+    result = await async_execute_sp_fetchone("sp_DeleteTask", {
         "task_id": task_id,
         "user_id": user["id"],
     })
@@ -157,15 +439,21 @@ async def delete_task(task_id: int, authorization: Optional[str] = Header(None))
     if not result or result.get("affected_rows", 0) == 0:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    await publish_change(user["id"], "task", x_device_id)
     return {"message": "Task deleted successfully", "deleted_count": result["affected_rows"]}
 
 
 @router.put("/{task_id}/move", response_model=TaskResponse)
-async def move_task(task_id: int, new_tab_id: int, authorization: Optional[str] = Header(None)):
+async def move_task(
+    task_id: int,
+    new_tab_id: int,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
     """Move task to a different tab."""
     user = await get_user_from_header(authorization)
     
-    result = execute_sp_fetchone("sp_MoveTask", {
+    result = await async_execute_sp_fetchone("sp_MoveTask", {
         "task_id": task_id,
         "user_id": user["id"],
         "new_tab_id": new_tab_id,
@@ -174,4 +462,101 @@ async def move_task(task_id: int, new_tab_id: int, authorization: Optional[str]
     if not result:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    await publish_change(user["id"], "task", x_device_id)
     return build_task_response(result)
+
+
+def bulk_task_ids(request: TaskBulkIds) -> str:
+    """Validate a bulk request's ids and serialize them as the JSON array the bulk procedures expect."""
+    max_size = get_settings().task_bulk_max_size
+    if len(request.task_ids) > max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many tasks: {len(request.task_ids)} (max {max_size})",
+        )
+    return json.dumps(request.task_ids)
+
+
+@router.post("/bulk/complete", response_model=List[TaskResponse])
+async def complete_tasks(
+    request: TaskBulkComplete,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
+    """Mark many tasks as completed or uncompleted in one transaction."""
+    user = await get_user_from_header(authorization)
+    
+    tasks = await async_execute_sp_fetchall("sp_CompleteTasks", {
+        "user_id": user["id"],
+        "task_ids": bulk_task_ids(request),
+        "is_completed": request.is_completed,
+    })
+    
+    if tasks:
+        await publish_change(user["id"], "task", x_device_id)
+    return task_list_json.response(task_row.rows(tasks))
+
+
+@router.post("/bulk/move", response_model=List[TaskResponse])
+async def move_tasks(
+    request: TaskBulkMove,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
+    """Move many tasks (with their subtasks) to a tab in one statement."""
+    user = await get_user_from_header(authorization)
+    
+    tasks = await async_execute_sp_fetchall("sp_MoveTasks", {
+        "user_id": user["id"],
+        "task_ids": bulk_task_ids(request),
+        "new_tab_id": request.new_tab_id,
+    })
+    
+    if not tasks:
+        raise HTTPException(status_code=404, detail="Tab or tasks not found")
+    
+    await publish_change(user["id"], "task", x_device_id)
+    return task_list_json.response(task_row.rows(tasks))
+
+
+@router.post("/bulk/delete")
+async def delete_tasks(
+    request: TaskBulkIds,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
+    """Delete many tasks and all their children (soft delete) in one statement."""
+    user = await get_user_from_header(authorization)
+    
+    result = await async_execute_sp_fetchone("sp_DeleteTasks", {
+        "user_id": user["id"],
+        "task_ids": bulk_task_ids(request),
+    })
+    
+    deleted_count = result["affected_rows"] if result else 0
+    if deleted_count:
+        await publish_change(user["id"], "task", x_device_id)
+    return {"message": "Tasks deleted successfully", "deleted_count": deleted_count}
+
+
+@router.post("/bulk/reorder")
+async def reorder_tasks(
+    request: TaskBulkIds,
+    authorization: Optional[str] = Header(None),
+    x_device_id: Optional[str] = Header(None),
+):
+    """Set order_index of the given tasks to their position in task_ids (1, 2, 3, ...)."""
+    user = await get_user_from_header(authorization)
+    
+    if len(set(request.task_ids)) != len(request.task_ids):
+        raise HTTPException(status_code=400, detail="Duplicate task ids")
+    
+    result = await async_execute_sp_fetchone("sp_ReorderTasks", {
+        "user_id": user["id"],
+        "task_ids": bulk_task_ids(request),
+    })
+    
+    updated_count = result["affected_rows"] if result else 0
+    if updated_count:
+        await publish_change(user["id"], "task", x_device_id)
+    return {"updated_count": updated_count}
@@ -1,17 +1,23 @@
 from .user import User, UserCreate, UserResponse
 from .tab import Tab, TabCreate, TabUpdate, TabResponse
-from .task import Task, TaskCreate, TaskUpdate, TaskComplete, TaskResponse, TaskWithChildren
+from .task import (
+    Task, TaskCreate, TaskUpdate, TaskComplete, TaskResponse, TaskWithChildren,
+    TaskBulkIds, TaskBulkComplete, TaskBulkMove, TaskSearchResult, TaskSearchResponse,
+)
 from .sync import (
     SyncPullRequest, SyncPushRequest, SyncResponse, ConflictData, 
-    ConflictResolution, SyncedTab, SyncedTask, SyncStatus
+    ConflictResolution, SyncedTab, SyncedTask, SyncStatus, SyncItemStatus, EntityDelta, SyncDeltaResponse
 )
+from .notification import NotificationType, ReminderCreate, NotificationResponse
 from .auth import GoogleAuthRequest, TokenResponse
 
 __all__ = [
     "User", "UserCreate", "UserResponse",
     "Tab", "TabCreate", "TabUpdate", "TabResponse",
     "Task", "TaskCreate", "TaskUpdate", "TaskComplete", "TaskResponse", "TaskWithChildren",
+    "TaskBulkIds", "TaskBulkComplete", "TaskBulkMove", "TaskSearchResult", "TaskSearchResponse",
     "SyncPullRequest", "SyncPushRequest", "SyncResponse", "ConflictData", "ConflictResolution",
-    "SyncedTab", "SyncedTask", "SyncStatus",
+    "SyncedTab", "SyncedTask", "SyncStatus", "SyncItemStatus", "EntityDelta", "SyncDeltaResponse",
+    "NotificationType", "ReminderCreate", "NotificationResponse",
     "GoogleAuthRequest", "TokenResponse",
 ]
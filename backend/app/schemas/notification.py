@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from enum import Enum
+
+
+class NotificationType(str, Enum):
+    REMINDER = "reminder"
+    DUE_SOON = "due_soon"
+    OVERDUE = "overdue"
+
+
+class ReminderCreate(BaseModel):
+    task_id: int
+    scheduled_at: datetime  # UTC
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    task_id: Optional[int] = None
+    title: str
+    message: Optional[str] = None
+    notification_type: NotificationType
+    scheduled_at: datetime
+    is_read: bool
+    is_sent: bool
+    task_title: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List, Any
 from enum import Enum
@@ -10,9 +10,22 @@ class SyncStatus(str, Enum):
     CONFLICT = "conflict"
 
 
+class SyncItemStatus(str, Enum):
+    APPLIED = "applied"
+    CONFLICT = "conflict"
+    REJECTED = "rejected"
+
+
 class SyncPullRequest(BaseModel):
     device_id: str
     last_sync_at: Optional[datetime] = None
+    # Paging: send page_size and/or the previous response's next_cursor to pull page by page
+    cursor: Optional[str] = None
+    page_size: Optional[int] = Field(None, ge=1)
+    # Change-sequence sync: send 0 on first sync, then the previous response's next_seq
+    since_seq: Optional[int] = Field(None, ge=0)
+    # With since_seq: return only the fields each entity changed after since_seq
+    delta: bool = False
 
 
 class SyncPushRequest(BaseModel):
@@ -21,6 +34,9 @@ class SyncPushRequest(BaseModel):
     entity_type: str  # "tab" or "task"
     data: dict[str, Any]
     client_updated_at: datetime
+    # change_seq the patch was made against: conflicts are then checked per field, so
+    # only fields in data that changed on the server since then conflict
+    base_seq: Optional[int] = Field(None, ge=0)
 
 
 class ConflictData(BaseModel):
@@ -32,6 +48,10 @@ class ConflictData(BaseModel):
     client_updated_at: datetime
     server_data: Optional[dict[str, Any]] = None
     client_data: Optional[dict[str, Any]] = None
+    status: Optional[SyncItemStatus] = None
+    reason: Optional[str] = None  # Why an item was rejected (or "duplicate" for re-pushes)
+    conflict_fields: Optional[List[str]] = None  # Per-field conflicts (base_seq pushes)
+    change_seq: Optional[int] = None  # Server row version after the push (next base_seq)
 
 
 class ConflictResolution(BaseModel):
@@ -51,6 +71,7 @@ class SyncedTab(BaseModel):
     created_at: datetime
     updated_at: datetime
     is_deleted: bool
+    change_seq: Optional[int] = None
 
 
 class SyncedTask(BaseModel):
@@ -69,10 +90,30 @@ class SyncedTask(BaseModel):
     updated_at: datetime
     completed_at: Optional[datetime]
     is_deleted: bool
+    change_seq: Optional[int] = None
 
 
 class SyncResponse(BaseModel):
     tabs: List[SyncedTab]
     tasks: List[SyncedTask]
-    sync_timestamp: datetime
+    sync_timestamp: datetime  # Store as last_sync_at only once has_more is false
     conflicts: List[ConflictData] = []
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    next_seq: Optional[int] = None  # since_seq for the next pull (change-sequence sync)
+
+
+class EntityDelta(BaseModel):
+    id: int
+    client_id: str
+    updated_at: datetime
+    change_seq: int
+    fields: dict[str, Any]  # Only the fields changed after since_seq (SyncedTab/SyncedTask names)
+
+
+class SyncDeltaResponse(BaseModel):
+    tabs: List[EntityDelta]
+    tasks: List[EntityDelta]
+    sync_timestamp: datetime
+    has_more: bool = False
+    next_seq: Optional[int] = None
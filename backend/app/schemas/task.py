@@ -28,6 +28,18 @@ class TaskComplete(BaseModel):
     is_completed: bool
 
 
+class TaskBulkIds(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1)
+
+
+class TaskBulkComplete(TaskBulkIds):
+    is_completed: bool
+
+
+class TaskBulkMove(TaskBulkIds):
+    new_tab_id: int
+
+
 class Task(TaskBase):
     id: int
     client_id: str
@@ -64,8 +76,20 @@ class TaskResponse(BaseModel):
     has_incomplete_children: Optional[bool] = False
 
 
+class TaskSearchResult(TaskResponse):
+    score: float  # Relevance; only comparable within one search
+
+
+class TaskSearchResponse(BaseModel):
+    tasks: List[TaskSearchResult]
+    total: int  # Matches across all pages (0 past the last page)
+    next_offset: Optional[int] = None  # offset of the next page, if any
+
+
 class TaskWithChildren(TaskResponse):
     children: List["TaskWithChildren"] = []
+    child_count: int = 0
+    completed_child_count: int = 0
 
 
 # Enable forward reference resolution
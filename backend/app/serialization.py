@@ -0,0 +1,91 @@
+from operator import attrgetter
+from typing import Any, Callable, Iterable
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from .config import get_settings
+from .database import Record
+
+
+def str_or_none(value: Any) -> str | None:
+    return str(value) if value is not None else None
+
+
+class RowSerializer:
+    """Projects trusted database rows onto a response model's fields.
+
+    Produces plain dicts with exactly the model's fields (in order, with the
+    model's defaults for columns the row lacks), so lists of rows can be
+    encoded without building a model per row. ``convert`` maps a field to a
+    function applied to its value. Compact rows (Records) are read with one
+    attrgetter per result-set shape.
+    """
+
+    def __init__(self, model: type[BaseModel], convert: dict[str, Callable[[Any], Any]] | None = None):
+        self.model = model
+        self._fields = [
+            (name, None if field.is_required() else field.default)
+            for name, field in model.model_fields.items()
+        ]
+        self._convert = list((convert or {}).items())
+        self._record_readers: dict[type, Callable[[Record], dict]] = {}
+
+    def _record_reader(self, record_cls: type[Record]) -> Callable[[Record], dict]:
+        attrs = record_cls._attrs
+        names = tuple(name for name, _ in self._fields if name in attrs)
+        missing = {name: default for name, default in self._fields if name not in attrs}
+        attr_names = [attrs[name] for name in names]
+        if len(attr_names) > 1:
+            getter = attrgetter(*attr_names)
+        else:  # attrgetter of one attribute returns the value, not a tuple
+            def getter(row: Record) -> tuple:
+                return tuple(getattr(row, attr) for attr in attr_names)
+
+        def read(row: Record) -> dict:
+            item = dict(zip(names, getter(row)))
+            if missing:
+                item.update(missing)
+            return item
+
+        self._record_readers[record_cls] = read
+        return read
+
+    def __call__(self, row: dict) -> dict:
+        if isinstance(row, Record):
+            read = self._record_readers.get(row.__class__) or self._record_reader(row.__class__)
+            item = read(row)
+        else:
+            item = {name: row.get(name, default) for name, default in self._fields}
+        for name, fn in self._convert:
+            item[name] = fn(item[name])
+        return item
+
+    def rows(self, rows: Iterable[dict]) -> list[dict]:
+        if rows and isinstance(rows, list) and isinstance(rows[0], Record) and not self._convert:
+            # One result set shares one Record class: resolve the reader once
+            read = self._record_readers.get(rows[0].__class__) or self._record_reader(rows[0].__class__)
+            return list(map(read, rows))
+        return [self(row) for row in rows]
+
+
+class JsonSerializer:
+    """Encodes response content of a given type.
+
+    In fast mode (``fast_serialization``) the content, built from trusted rows,
+    goes straight to orjson; otherwise it is validated against the type first
+    and encoded by pydantic, as FastAPI's response_model handling would.
+    """
+
+    def __init__(self, type_: Any):
+        self.adapter = TypeAdapter(type_)
+
+    def dumps(self, content: Any) -> bytes:
+        if get_settings().fast_serialization:
+            return orjson.dumps(content)
+        return self.adapter.dump_json(self.adapter.validate_python(content))
+
+    def response(self, content: Any) -> Response:
+        """JSON response with the encoded content (bypasses response_model re-validation)."""
+        return Response(content=self.dumps(content), media_type="application/json")
@@ -0,0 +1,38 @@
+from typing import AsyncIterator, Callable, Optional
+
+from fastapi.responses import StreamingResponse
+
+from .database import stream_sp_rows
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether the client opted in to a streamed NDJSON response."""
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+
+def ndjson_response(lines: AsyncIterator[bytes]) -> StreamingResponse:
+    """Wrap an iterator of NDJSON chunks in a streaming response."""
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+
+async def stream_ndjson(
+    sp_name: str,
+    params: dict,
+    encoders: dict[int, Callable[[dict], bytes]],
+    trailer: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    """Run a stored procedure and yield its rows as NDJSON, one fetch chunk at a time.
+
+    ``encoders`` maps result-set index to a function that turns a row into one
+    JSON line (bytes); result sets without an encoder are skipped. ``trailer`` is an
+    optional last line (e.g. sync metadata).
+    """
+    async for index, rows in stream_sp_rows(sp_name, params, compact=True):
+        encode = encoders.get(index)
+        if encode is None:
+            continue
+        yield b"".join(encode(row) + b"\n" for row in rows)
+    if trailer is not None:
+        yield (trailer + "\n").encode()
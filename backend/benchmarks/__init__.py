@@ -0,0 +1 @@
+# Benchmark and query-plan scripts (run from backend/: python -m benchmarks.<name>)
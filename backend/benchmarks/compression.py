@@ -0,0 +1,83 @@
+"""Benchmark: bytes on the wire and CPU cost of response compression.
+
+No database needed; payloads are encoded from generated rows exactly as the
+endpoints encode them. Run from backend/:
+
+    python -m benchmarks.compression                    # 1k / 10k task rows
+    python -m benchmarks.compression --sizes 50000 --repeat 3
+
+For each payload (task list, sync pull) and each codec / level it reports the
+compressed size, the ratio, and median compress / decompress times. br and
+zstd rows appear only when brotli / zstandard are installed.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime
+from typing import Callable
+
+from app.compression import BrotliCodec, GzipCodec, ZstdCodec, brotli, zstandard
+from app.routers.sync import sync_pull_response
+from app.routers.tasks import task_list_json, task_row
+from benchmarks.serialization import make_tab_rows, make_task_rows
+
+LEVELS = {
+    GzipCodec: [1, 6, 9],
+    BrotliCodec: [1, 4, 6, 11],
+    ZstdCodec: [1, 3, 9, 19],
+}
+
+
+def codecs():
+    available = {GzipCodec: True, BrotliCodec: brotli is not None, ZstdCodec: zstandard is not None}
+    for codec_cls, levels in LEVELS.items():
+        if not available[codec_cls]:
+            print(f"({codec_cls.name}: not installed, skipped)")
+            continue
+        for level in levels:
+            yield codec_cls(level)
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    """Median wall time in ms."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    all_codecs = list(codecs())
+    print(
+        f"{'payload':<18} {'codec':<8} {'KiB':>8} {'ratio':>7} "
+        f"{'compress ms':>12} {'MB/s':>7} {'decompress ms':>14}"
+    )
+    for size in args.sizes:
+        task_rows = make_task_rows(size)
+        payloads = {
+            f"task list {size}": task_list_json.dumps(task_row.rows(task_rows)),
+            f"sync pull {size}": sync_pull_response(make_tab_rows(20), task_rows, datetime.utcnow()).body,
+        }
+        for name, body in payloads.items():
+            print(f"{name:<18} {'identity':<8} {len(body) / 1024:>8.0f} {1:>7.1f}")
+            for codec in all_codecs:
+                compressed = codec.compress(body)
+                assert codec.decompress(compressed, len(body)) == body
+                compress_ms = timed(lambda: codec.compress(body), args.repeat)
+                decompress_ms = timed(lambda: codec.decompress(compressed, len(body)), args.repeat)
+                print(
+                    f"{name:<18} {codec.name + '-' + str(codec.level):<8} "
+                    f"{len(compressed) / 1024:>8.0f} {len(body) / len(compressed):>7.1f} "
+                    f"{compress_ms:>12.1f} {len(body) / 1e3 / compress_ms:>7.0f} {decompress_ms:>14.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Benchmark: task hierarchy lookups, recursive CTEs vs. root_task_id seeks.
+
+Runs each lookup the way the procedures did before migration 006 (recursive CTE
+over parent_task_id) and the way they do now (root_task_id / parent_task_id
+seeks), checks that both return the same rows, and reports timings and the base
+table operators of each plan. Writes are measured inside a transaction that is
+rolled back. Run from backend/ against a scratch database with migration 006
+applied, after seeding with benchmarks.query_plans:
+
+    python -m benchmarks.query_plans --users 50 --tasks 2000 --out bench-results/seed
+    python -m benchmarks.hierarchy --sample-users 5 --repeat 50
+"""
+import argparse
+import statistics
+import sys
+import time
+
+import pyodbc
+
+from app.database.connection import get_connection_string
+from benchmarks.query_plans import BENCH_PREFIX, percentile, summarize_plan
+
+COLUMNS = """t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+           t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+           t.created_at, t.updated_at, t.completed_at, t.is_deleted"""
+
+# label -> (recursive CTE, root_task_id version), both parameterized on @user_id and @task_id
+CASES = {
+    "view_all": (
+        f"""
+        ;WITH TaskHierarchy AS (
+            SELECT {COLUMNS}, 0 AS level FROM Tasks t
+            WHERE t.user_id = @user_id AND t.is_deleted = 0 AND t.parent_task_id IS NULL
+            UNION ALL
+            SELECT {COLUMNS}, th.level + 1 FROM Tasks t
+            INNER JOIN TaskHierarchy th ON t.parent_task_id = th.id
+            WHERE t.is_deleted = 0
+        )
+        SELECT * FROM TaskHierarchy ORDER BY is_completed, level, order_index
+        """,
+        f"""
+        ;WITH Roots AS (
+            SELECT {COLUMNS} FROM Tasks t
+            WHERE t.user_id = @user_id AND t.is_deleted = 0 AND t.parent_task_id IS NULL
+        ),
+        TaskHierarchy AS (
+            SELECT r.*, 0 AS level FROM Roots r
+            UNION ALL
+            SELECT {COLUMNS}, t.depth FROM Roots r
+            INNER JOIN Tasks t ON t.root_task_id = r.id
+            LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
+            WHERE t.is_deleted = 0 AND (t.depth = 1 OR p.is_deleted = 0)
+        )
+        SELECT * FROM TaskHierarchy ORDER BY is_completed, level, order_index
+        """,
+    ),
+    "view_open": (
+        f"""
+        ;WITH TaskHierarchy AS (
+            SELECT {COLUMNS}, 0 AS level FROM Tasks t
+            WHERE t.user_id = @user_id AND t.is_deleted = 0 AND t.parent_task_id IS NULL AND t.is_completed = 0
+            UNION ALL
+            SELECT {COLUMNS}, th.level + 1 FROM Tasks t
+            INNER JOIN TaskHierarchy th ON t.parent_task_id = th.id
+            WHERE t.is_deleted = 0 AND t.is_completed = 0
+        )
+        SELECT * FROM TaskHierarchy ORDER BY level, order_index
+        """,
+        f"""
+        ;WITH Roots AS (
+            SELECT {COLUMNS} FROM Tasks t
+            WHERE t.user_id = @user_id AND t.is_deleted = 0 AND t.parent_task_id IS NULL AND t.is_completed = 0
+        ),
+        TaskHierarchy AS (
+            SELECT r.*, 0 AS level FROM Roots r
+            UNION ALL
+            SELECT {COLUMNS}, t.depth FROM Roots r
+            INNER JOIN Tasks t ON t.root_task_id = r.id
+            LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
+            WHERE t.is_deleted = 0 AND t.is_completed = 0
+              AND (t.depth = 1 OR (p.is_deleted = 0 AND p.is_completed = 0))
+        )
+        SELECT * FROM TaskHierarchy ORDER BY level, order_index
+        """,
+    ),
+    "subtree": (
+        """
+        ;WITH TaskDescendants AS (
+            SELECT id FROM Tasks WHERE user_id = @user_id AND id = @task_id
+            UNION ALL
+            SELECT t.id FROM Tasks t INNER JOIN TaskDescendants td ON t.parent_task_id = td.id
+        )
+        SELECT id FROM TaskDescendants ORDER BY id
+        """,
+        """
+        SELECT id FROM Tasks
+        WHERE user_id = @user_id AND (id = @task_id OR root_task_id = @task_id OR parent_task_id = @task_id)
+        ORDER BY id
+        """,
+    ),
+    "ancestors": (
+        """
+        ;WITH ParentChain AS (
+            SELECT parent_task_id AS id FROM Tasks
+            WHERE user_id = @user_id AND id = @task_id AND parent_task_id IS NOT NULL
+            UNION ALL
+            SELECT t.parent_task_id FROM Tasks t INNER JOIN ParentChain pc ON t.id = pc.id
+            WHERE t.parent_task_id IS NOT NULL
+        )
+        SELECT id FROM ParentChain ORDER BY id
+        """,
+        """
+        SELECT a.id FROM Tasks t
+        CROSS APPLY (VALUES (t.parent_task_id), (t.root_task_id)) a(id)
+        WHERE t.user_id = @user_id AND t.id = @task_id AND a.id IS NOT NULL
+        GROUP BY a.id
+        ORDER BY a.id
+        """,
+    ),
+    "delete_subtree": (
+        """
+        ;WITH TaskDescendants AS (
+            SELECT id FROM Tasks WHERE user_id = @user_id AND id = @task_id
+            UNION ALL
+            SELECT t.id FROM Tasks t INNER JOIN TaskDescendants td ON t.parent_task_id = td.id
+        )
+        UPDATE Tasks SET is_deleted = 1, updated_at = GETUTCDATE()
+        WHERE id IN (SELECT id FROM TaskDescendants);
+        SELECT @@ROWCOUNT
+        """,
+        """
+        UPDATE Tasks SET is_deleted = 1, updated_at = GETUTCDATE()
+        WHERE user_id = @user_id AND (id = @task_id OR root_task_id = @task_id OR parent_task_id = @task_id);
+        SELECT @@ROWCOUNT
+        """,
+    ),
+}
+
+
+def run(cursor: pyodbc.Cursor, sql: str, user_id: int, task_id: int) -> list[tuple]:
+    """Execute as sp_executesql (parameters are sniffed as in a procedure) and drain every result set."""
+    cursor.execute(
+        "EXEC sp_executesql ?, N'@user_id INT, @task_id INT', @user_id = ?, @task_id = ?",
+        sql, user_id, task_id,
+    )
+    rows = []
+    while True:
+        if cursor.description:
+            rows.extend(tuple(row) for row in cursor.fetchall())
+        if not cursor.nextset():
+            return rows
+
+
+def plan_operators(cursor: pyodbc.Cursor, sql: str, user_id: int, task_id: int) -> list[str]:
+    """Base table operators of the actual plan."""
+    cursor.execute("SET STATISTICS XML ON")
+    try:
+        operators = []
+        for row in run(cursor, sql, user_id, task_id):
+            if row and isinstance(row[0], str) and row[0].startswith("<ShowPlanXML"):
+                operators.extend(summarize_plan(row[0])["operators"])
+        return operators
+    finally:
+        cursor.execute("SET STATISTICS XML OFF")
+
+
+def sample_tasks(cursor: pyodbc.Cursor, user_id: int) -> tuple[int, int]:
+    """The user's root with the most descendants and one depth-2 task."""
+    cursor.execute(
+        "SELECT TOP 1 root_task_id FROM Tasks WHERE user_id = ? AND root_task_id IS NOT NULL "
+        "GROUP BY root_task_id ORDER BY COUNT(*) DESC",
+        user_id,
+    )
+    root_id = cursor.fetchone()[0]
+    cursor.execute("SELECT TOP 1 id FROM Tasks WHERE user_id = ? AND depth = 2 ORDER BY id", user_id)
+    row = cursor.fetchone()
+    return root_id, row[0] if row else root_id
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample-users", type=int, default=5, help="seeded users to run the cases for")
+    parser.add_argument("--repeat", type=int, default=30, help="timed runs per case and user")
+    args = parser.parse_args(argv)
+
+    conn = pyodbc.connect(get_connection_string(), autocommit=False)
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT TOP (?) id FROM Users WHERE google_id LIKE '{BENCH_PREFIX}%' ORDER BY id", args.sample_users,
+    )
+    user_ids = [row[0] for row in cursor.fetchall()]
+    if not user_ids:
+        sys.exit("No seeded users found; seed with python -m benchmarks.query_plans first")
+
+    timings: dict[tuple[str, str], list[float]] = {}
+    operators: dict[tuple[str, str], list[str]] = {}
+    mismatches = []
+    try:
+        for n, user_id in enumerate(user_ids):
+            root_id, leaf_id = sample_tasks(cursor, user_id)
+            for label, statements in CASES.items():
+                task_id = leaf_id if label == "ancestors" else root_id
+                results = []
+                for variant, sql in zip(("cte", "root_id"), statements):
+                    if n == 0:
+                        operators[label, variant] = plan_operators(cursor, sql, user_id, task_id)
+                        conn.rollback()
+                    results.append(sorted(run(cursor, sql, user_id, task_id)))
+                    conn.rollback()
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        run(cursor, sql, user_id, task_id)
+                        timings.setdefault((label, variant), []).append((time.perf_counter() - started) * 1000)
+                        conn.rollback()
+                if results[0] != results[1]:
+                    mismatches.append(f"{label} (user {user_id}): {len(results[0])} vs {len(results[1])} rows")
+    finally:
+        conn.close()
+
+    print(f"{'case':<16} {'variant':<8} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}  plan")
+    for label in CASES:
+        base = statistics.median(timings[label, "cte"])
+        for variant in ("cte", "root_id"):
+            samples = timings[label, variant]
+            p50 = statistics.median(samples)
+            print(
+                f"{label:<16} {variant:<8} {p50:>9.2f} {percentile(samples, 95):>9.2f} "
+                f"{base / p50 if p50 else 0:>7.1f}x  {', '.join(operators[label, variant])}"
+            )
+    if mismatches:
+        print("\nResult mismatches:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,510 @@
+"""Offline load test: scripted client scenarios against the API, in-process.
+
+Drives the ASGI app directly (no network, no uvicorn) with synthetic users
+whose Google ID tokens are signed with a per-run local key, so the whole
+request path (auth, routing, serialization, compression, DB) is measured
+without Google or a browser. By default every run gets a fresh embedded SQLite
+database; --backend mssql uses the DB_* settings / .env instead (seeded users
+then have google_id 'bench-load-<run>-<n>'). Run from backend/:
+
+    python -m benchmarks.load --users 20 --tasks 500 --out bench-results/load-before
+    # ... apply a change ...
+    python -m benchmarks.load --users 20 --tasks 500 --out bench-results/load-after \\
+        --compare bench-results/load-before
+
+Scenarios (--scenarios, default all, in this order):
+  login      POST /auth/google with the user's Google ID token
+  cold_sync  first sync of a new device: /sync/pull by change sequence, page by page
+  poll       steady-state /sync/pull with nothing new
+  push       bulk offline push: --push-size edits and new subtrees via /sync/batch-push
+  today      Today view refresh: GET /tasks/today
+
+Each scenario runs --ops operations (after --warmup unrecorded ones) from
+--concurrency clients, each with its own users (so at most --users clients). results.json holds p50/p95/p99 latency and throughput
+per scenario; with --compare, exits non-zero if a p50 or p99 got slower, or
+throughput dropped, by more than --threshold. Runs are only comparable with
+the same data shape and concurrency; --compare warns when they differ.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import platform
+import random
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from benchmarks.stats import percentile
+
+GOOGLE_ISSUER = "https://accounts.google.com"
+# Audience of the tokens the benchmark mints and of the verifier it installs
+BENCH_CLIENT_ID = "bench-load.apps.googleusercontent.com"
+DEFAULT_SCENARIOS = ("login", "cold_sync", "poll", "push", "today")
+# Meta keys that must match for two runs to be comparable
+SHAPE_KEYS = ("backend", "users", "tabs_per_user", "tasks_per_user", "push_size", "page_size", "concurrency", "ops")
+
+
+# ----------------------------------------------------------------------
+# Google sign-in stand-in
+# ----------------------------------------------------------------------
+
+class LocalTokenIssuer:
+    """Stands in for Google's sign-in: mints RS256 ID tokens with a per-run key.
+
+    Tokens carry Google's claims (iss, aud, sub, email, name, picture, exp) and
+    a kid; the matching public key is served to the app's real verifier
+    through a StaticKeySource, so logins measure the production verification
+    path without fetching Google's certificates.
+    """
+
+    kid = "bench-load"
+
+    def __init__(self, audience: str):
+        self.audience = audience
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+        )
+        # Parsed once: loading the PEM on every encode costs ~50 ms
+        self._key = jwk.construct(pem, "RS256")
+        public_key = self._key.public_key().to_dict()
+        self.jwks = {"keys": [{**public_key, "kid": self.kid, "use": "sig"}]}
+
+    def mint(self, google_id: str, email: str, name: str, ttl: int = 3600) -> str:
+        now = int(time.time())
+        return jwt.encode({
+            "iss": GOOGLE_ISSUER, "aud": self.audience, "sub": google_id, "email": email, "name": name,
+            "picture": None, "iat": now, "exp": now + ttl,
+        }, self._key, algorithm="RS256", headers={"kid": self.kid})
+
+
+# ----------------------------------------------------------------------
+# In-process HTTP client
+# ----------------------------------------------------------------------
+
+class AsgiClient:
+    """Minimal HTTP/1.1 client that calls an ASGI app directly."""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def request(
+        self, method: str, path: str, body: Any = None, headers: dict[str, str] | None = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        payload = json.dumps(body, default=str).encode() if body is not None else b""
+        raw_headers = [(b"host", b"bench"), (b"accept-encoding", b"gzip")]
+        if body is not None:
+            raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+        raw_headers += [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+            "root_path": "", "headers": raw_headers, "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+        }
+        done = asyncio.Event()
+        sent_body = False
+        status = 500
+        response_headers: dict[str, str] = {}
+        chunks: list[bytes] = []
+
+        async def receive() -> dict:
+            nonlocal sent_body
+            if not sent_body:
+                sent_body = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            # Streaming responses listen for a disconnect; only report one once the response is done
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers.update((k.decode(), v.decode()) for k, v in message.get("headers", ()))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    done.set()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            done.set()
+        return status, response_headers, b"".join(chunks)
+
+    async def json(self, method: str, path: str, body: Any = None, token: str | None = None, expect: int = 200) -> Any:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        status, response_headers, content = await self.request(method, path, body, headers)
+        if status != expect:
+            raise RuntimeError(f"{method} {path}: HTTP {status}: {content[:200]!r}")
+        if response_headers.get("content-encoding") == "gzip":
+            content = gzip.decompress(content)
+        return json.loads(content) if content else None
+
+
+# ----------------------------------------------------------------------
+# Synthetic data
+# ----------------------------------------------------------------------
+
+class BenchUser:
+    """One synthetic account and the client-side state its scenarios need."""
+
+    def __init__(self, index: int, google_id: str):
+        self.index = index
+        self.google_id = google_id
+        self.email = f"{google_id}@bench.invalid"
+        self.id_token: str | None = None
+        self.token: str | None = None
+        self.device_id = f"{google_id}-phone"
+        self.tab_client_ids: list[str] = []
+        self.task_client_ids: list[str] = []
+        self.seq = 0
+        self.pushes = 0
+
+
+def client_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def task_tree_items(
+    rng: random.Random, user: BenchUser, count: int, prefix: str, tab_client_ids: list[str],
+) -> list[dict]:
+    """`count` new tasks as push items: ~60% roots, 30% children, 10% grandchildren.
+
+    Parents always precede their children, so one push creates whole trees.
+    """
+    today = date.today()
+    items = []
+    levels: list[list[str]] = [[], [], []]
+    for n in range(count):
+        roll = rng.random()
+        depth = 2 if roll < 0.1 and levels[1] else 1 if roll < 0.4 and levels[0] else 0
+        client_id = f"{prefix}-{n}"
+        data: dict[str, Any] = {"title": f"Task {user.index}.{n} {rng.choice(WORDS)} {rng.choice(WORDS)}"}
+        if depth:
+            data["parent_client_id"] = rng.choice(levels[depth - 1])
+        elif tab_client_ids and rng.random() < 0.7:
+            data["tab_client_id"] = rng.choice(tab_client_ids)
+        if rng.random() < 0.5:
+            data["due_date"] = (today + timedelta(days=rng.randint(-10, 20))).isoformat()
+        if rng.random() < 0.4:
+            data["description"] = " ".join(rng.choices(WORDS, k=rng.randint(4, 40)))
+        if rng.random() < 0.3:
+            data["is_completed"] = True
+        levels[depth].append(client_id)
+        items.append({
+            "device_id": user.device_id, "client_id": client_id, "entity_type": "task",
+            "data": data, "client_updated_at": client_timestamp(),
+        })
+    return items
+
+
+def record_pushed(user: BenchUser, items: list[dict], result: dict) -> None:
+    """Remember the new tasks a push created, so later pushes can edit them."""
+    synced = set(result["synced_ids"])
+    known = set(user.task_client_ids)
+    user.task_client_ids += [
+        item["client_id"] for item in items
+        if item["entity_type"] == "task" and item["client_id"] in synced and item["client_id"] not in known
+    ]
+
+
+def seed_items(rng: random.Random, user: BenchUser, run_id: str, tabs: int, tasks: int) -> list[dict]:
+    """A user's initial data: custom tabs, then task trees spread over them."""
+    prefix = f"{run_id}-u{user.index}"
+    tab_items = [{
+        "device_id": user.device_id, "client_id": f"{prefix}-tab-{n}", "entity_type": "tab",
+        "data": {"name": f"{rng.choice(WORDS).title()} {n}"}, "client_updated_at": client_timestamp(),
+    } for n in range(tabs)]
+    user.tab_client_ids = [item["client_id"] for item in tab_items]
+    return tab_items + task_tree_items(rng, user, tasks, f"{prefix}-task", user.tab_client_ids)
+
+
+def push_items(rng: random.Random, user: BenchUser, size: int) -> list[dict]:
+    """An offline session's worth of changes: half edits of existing tasks, half new subtrees."""
+    user.pushes += 1
+    edits = rng.sample(user.task_client_ids, min(size // 2, len(user.task_client_ids)))
+    items = [{
+        "device_id": user.device_id, "client_id": client_id, "entity_type": "task",
+        "data": rng.choice(({"title": f"Edited {rng.choice(WORDS)}"}, {"is_completed": rng.random() < 0.5})),
+        "client_updated_at": client_timestamp(),
+    } for client_id in edits]
+    prefix = f"{user.google_id}-push{user.pushes}"
+    return items + task_tree_items(rng, user, size - len(items), prefix, user.tab_client_ids)
+
+
+WORDS = (
+    "buy milk call review report draft plan sprint invoice email garden fix bike book flight dentist "
+    "groceries budget slides meeting notes refactor deploy backup taxes gym laundry birthday gift paint "
+    "kitchen renew passport clean garage order parts doctor appointment read chapter water plants"
+).split()
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+
+Scenario = Callable[[AsgiClient, BenchUser], Awaitable[None]]
+
+
+def make_scenarios(issuer: LocalTokenIssuer, rng: random.Random, push_size: int, page_size: int) -> dict[str, Scenario]:
+    async def login(client: AsgiClient, user: BenchUser) -> None:
+        # Like the app, reuse the Google ID token while it is valid (signing it is client-side work)
+        if user.id_token is None:
+            user.id_token = issuer.mint(user.google_id, user.email, f"Bench {user.index}")
+        user.token = (await client.json("POST", "/auth/google", {"id_token": user.id_token}))["access_token"]
+
+    async def cold_sync(client: AsgiClient, user: BenchUser) -> None:
+        seq, device = 0, f"{user.device_id}-new-{secrets.token_hex(4)}"
+        while True:
+            page = await client.json("POST", "/sync/pull", {
+                "device_id": device, "since_seq": seq, "page_size": page_size,
+            }, user.token)
+            seq = page["next_seq"]
+            if not page["has_more"]:
+                break
+        user.seq = max(user.seq, seq)
+
+    async def poll(client: AsgiClient, user: BenchUser) -> None:
+        page = await client.json("POST", "/sync/pull", {"device_id": user.device_id, "since_seq": user.seq}, user.token)
+        user.seq = page["next_seq"]
+
+    async def push(client: AsgiClient, user: BenchUser) -> None:
+        items = push_items(rng, user, push_size)
+        result = await client.json("POST", "/sync/batch-push", items, user.token)
+        record_pushed(user, items, result)
+        if result["rejected"]:
+            raise RuntimeError(f"push rejected {len(result['rejected'])} items: {result['rejected'][0]}")
+
+    async def today(client: AsgiClient, user: BenchUser) -> None:
+        await client.json("GET", "/tasks/today", token=user.token)
+
+    return {"login": login, "cold_sync": cold_sync, "poll": poll, "push": push, "today": today}
+
+
+async def run_scenario(
+    client: AsgiClient, scenario: Scenario, users: list[BenchUser], ops: int, warmup: int, concurrency: int,
+) -> dict:
+    """Run `ops` timed operations from `concurrency` clients, each cycling over its own users.
+
+    Every user belongs to exactly one client (concurrency <= users), so no
+    two operations on one user's client-side state ever overlap.
+    """
+    latencies: list[float] = []
+    errors: list[str] = []
+
+    async def worker(worker_index: int, count: int, record: bool) -> None:
+        own = users[worker_index::concurrency]
+        for n in range(count):
+            user = own[n % len(own)]
+            started = time.perf_counter()
+            try:
+                await scenario(client, user)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            if record:
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    def split(total: int) -> list[int]:
+        return [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+    await asyncio.gather(*(worker(i, count, False) for i, count in enumerate(split(warmup))))
+    errors.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i, count, True) for i, count in enumerate(split(ops))))
+    elapsed = time.perf_counter() - started
+
+    if not latencies:
+        return {"ops": 0, "errors": len(errors), "first_error": errors[0] if errors else None}
+    return {
+        "ops": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(scenarios: dict, baseline: dict | None, threshold: float) -> list[str]:
+    """Print the results (against a baseline if given) and return regressions."""
+    regressions = []
+    print(f"{'scenario':<10} {'ops':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}  vs baseline")
+    for name, result in scenarios.items():
+        if not result["ops"]:
+            print(f"{name:<10} {0:>6} {result['errors']:>4}  failed: {result['first_error']}")
+            regressions.append(f"{name}: no successful operations")
+            continue
+        notes = []
+        base = (baseline or {}).get(name)
+        if base and base.get("ops"):
+            for key in ("p50_ms", "p99_ms"):
+                ratio = result[key] / base[key] if base[key] else 0
+                notes.append(f"{key[:3]} {ratio:.2f}x")
+                if ratio > 1 + threshold:
+                    regressions.append(f"{name}: {key} {base[key]:.2f} -> {result[key]:.2f}")
+            ratio = result["throughput_rps"] / base["throughput_rps"] if base["throughput_rps"] else 0
+            notes.append(f"req/s {ratio:.2f}x")
+            if ratio and ratio < 1 - threshold:
+                regressions.append(f"{name}: throughput {base['throughput_rps']} -> {result['throughput_rps']} req/s")
+        print(
+            f"{name:<10} {result['ops']:>6} {result['errors']:>4} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['throughput_rps']:>9.1f}  {', '.join(notes) or '-'}"
+        )
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors, first: {result['first_error']}")
+    return regressions
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+
+def get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=("sqlite", "mssql"), default="sqlite")
+    parser.add_argument("--db", help="SQLite database file (default: a fresh temporary file)")
+    parser.add_argument("--users", type=int, default=20, help="users to seed")
+    parser.add_argument("--tabs", type=int, default=5, help="custom tabs per user")
+    parser.add_argument("--tasks", type=int, default=500, help="tasks per user")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS), help="comma-separated, run in order")
+    parser.add_argument("--ops", type=int, default=200, help="timed operations per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed operations before each scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--push-size", type=int, default=100, help="items per bulk push")
+    parser.add_argument("--page-size", type=int, default=500, help="page size of the cold sync")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the data generator")
+    parser.add_argument("--out", type=Path, default=Path("bench-results") / datetime.now().strftime("load-%Y%m%d-%H%M%S"))
+    parser.add_argument("--compare", type=Path, help="earlier --out directory to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(DEFAULT_SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    if min(args.users, args.ops, args.concurrency) < 1:
+        parser.error("--users, --ops and --concurrency must be at least 1")
+    if args.concurrency > args.users:
+        print(f"Note: --concurrency {args.concurrency} capped at --users {args.users} (one client per user)")
+        args.concurrency = args.users
+    return args
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings for the app under test; must run before app.main is imported."""
+    if args.backend == "sqlite":
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["DB_SQLITE_PATH"] = args.db or str(Path(tempfile.mkdtemp(prefix="taskmanager-load-")) / "bench.db")
+    os.environ["NOTIFICATION_DISPATCH_ENABLED"] = "false"
+    os.environ["GOOGLE_CLIENT_ID"] = BENCH_CLIENT_ID
+    os.environ.setdefault("SYNC_PULL_MAX_PAGE_SIZE", str(max(args.page_size, 5000)))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app.config import get_settings
+    from app.id_tokens import GoogleTokenVerifier, StaticKeySource, set_google_verifier
+    from app.main import app
+
+    settings = get_settings()
+    issuer = LocalTokenIssuer(BENCH_CLIENT_ID)
+    set_google_verifier(GoogleTokenVerifier(StaticKeySource(issuer.jwks), BENCH_CLIENT_ID))
+    client = AsgiClient(app)
+    rng = random.Random(args.seed)
+    run_id = f"bench-load-{secrets.token_hex(3)}"
+    users = [BenchUser(n, f"{run_id}-{n}") for n in range(args.users)]
+    scenarios = make_scenarios(issuer, rng, args.push_size, args.page_size)
+
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        for user in users:
+            await scenarios["login"](client, user)
+            items = seed_items(rng, user, run_id, args.tabs, args.tasks)
+            for start in range(0, len(items), settings.sync_batch_max_size):
+                batch = items[start:start + settings.sync_batch_max_size]
+                record_pushed(user, batch, await client.json("POST", "/sync/batch-push", batch, user.token))
+        seed_seconds = time.perf_counter() - started
+        print(f"Seeded {args.users} users x {args.tasks} tasks in {seed_seconds:.1f}s ({settings.db_backend})")
+
+        results = {}
+        for name in args.scenarios:
+            results[name] = await run_scenario(
+                client, scenarios[name], users, args.ops, args.warmup, args.concurrency,
+            )
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": settings.db_backend,
+            "users": args.users,
+            "tabs_per_user": args.tabs,
+            "tasks_per_user": args.tasks,
+            "push_size": args.push_size,
+            "page_size": args.page_size,
+            "concurrency": args.concurrency,
+            "ops": args.ops,
+            "seed_seconds": round(seed_seconds, 2),
+        },
+        "scenarios": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_args(argv)
+    configure_environment(args)
+    result = asyncio.run(run(args))
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    (args.out / "results.json").write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    baseline = None
+    if args.compare:
+        previous = json.loads((args.compare / "results.json").read_text(encoding="utf-8"))
+        baseline = previous["scenarios"]
+        differing = [key for key in SHAPE_KEYS if previous["meta"].get(key) != result["meta"].get(key)]
+        if differing:
+            print(f"Warning: baseline differs in {', '.join(differing)}; results are not directly comparable\n")
+    regressions = print_report(result["scenarios"], baseline, args.threshold)
+    print(f"\nResults written to {args.out}")
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
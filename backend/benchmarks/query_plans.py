@@ -0,0 +1,347 @@
+"""Seed synthetic data and record execution plans and timings of the hot procedures.
+
+Run from backend/ against a scratch database (DB_* settings / .env):
+
+    python -m benchmarks.query_plans --users 50 --tasks 2000 --out bench-results/before
+    # ... apply an index / procedure change ...
+    python -m benchmarks.query_plans --skip-seed --out bench-results/after --compare bench-results/before
+
+Seeded users have google_id 'bench-<n>' and are replaced on every seeding run.
+Each run writes results.json (timings + plan summary) and the actual plans as
+plans/<case>.<n>.sqlplan, which open in SSMS / Azure Data Studio.
+With --compare, exits non-zero if a case got slower than --threshold or its
+plan gained a scan or key lookup on a base table.
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, time as dtime, timedelta
+from pathlib import Path
+from typing import Any
+
+import pyodbc
+
+from app.database.connection import get_connection_string
+from benchmarks.stats import percentile
+
+SHOWPLAN_NS = {"sp": "http://schemas.microsoft.com/sqlserver/2004/07/showplan"}
+SCAN_OPS = {"Table Scan", "Index Scan", "Clustered Index Scan"}
+BENCH_PREFIX = "bench-"
+
+
+# ----------------------------------------------------------------------
+# Seeding
+# ----------------------------------------------------------------------
+
+def clear_bench_users(cursor: pyodbc.Cursor) -> None:
+    """Remove everything belonging to previously seeded users."""
+    bench_users = f"SELECT id FROM Users WHERE google_id LIKE '{BENCH_PREFIX}%'"
+    cursor.execute(f"DELETE FROM Notifications WHERE user_id IN ({bench_users})")
+    cursor.execute(f"DELETE FROM SyncLog WHERE user_id IN ({bench_users})")
+    cursor.execute(f"UPDATE Tasks SET parent_task_id = NULL, root_task_id = NULL WHERE user_id IN ({bench_users})")
+    cursor.execute(f"DELETE FROM Tasks WHERE user_id IN ({bench_users})")
+    cursor.execute(f"DELETE FROM Tabs WHERE user_id IN ({bench_users})")
+    cursor.execute(f"DELETE FROM Users WHERE google_id LIKE '{BENCH_PREFIX}%'")
+
+
+def random_task(rng: random.Random, user_id: int, tab_ids: list[int], parent: tuple | None) -> tuple:
+    """One Tasks row: roughly the mix a real account accumulates."""
+    today = date.today()
+    if parent is not None:
+        tab_id, depth = parent[1], parent[2] + 1
+    else:
+        tab_id, depth = (rng.choice(tab_ids) if rng.random() < 0.7 else None), 0
+    due_date = today + timedelta(days=rng.randint(-10, 20)) if rng.random() < 0.5 else None
+    due_time = dtime(rng.randint(7, 21), rng.choice((0, 30))) if due_date and rng.random() < 0.3 else None
+    is_completed = rng.random() < 0.3
+    updated_at = datetime.utcnow() - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+    return (
+        str(uuid.uuid4()), user_id, tab_id, parent[0] if parent else None,
+        (parent[3] or parent[0]) if parent else None,
+        f"Task {rng.randint(1, 10**6)}",
+        "Lorem ipsum dolor sit amet " * rng.randint(1, 8) if rng.random() < 0.4 else None,
+        is_completed, due_date, due_time, depth, rng.randint(0, 1000),
+        updated_at, updated_at, updated_at if is_completed else None,
+        rng.random() < 0.05,
+    )
+
+
+def seed(conn: pyodbc.Connection, users: int, tasks_per_user: int, tabs_per_user: int, seed_value: int) -> None:
+    """Create `users` users with `tasks_per_user` tasks each (60% roots, 30% depth 1, 10% depth 2)."""
+    rng = random.Random(seed_value)
+    cursor = conn.cursor()
+    cursor.fast_executemany = True
+    clear_bench_users(cursor)
+    conn.commit()
+
+    insert_task = (
+        "INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description, "
+        "is_completed, due_date, due_time, depth, order_index, created_at, updated_at, "
+        "completed_at, is_deleted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+    )
+    level_sizes = [
+        int(tasks_per_user * 0.6),
+        int(tasks_per_user * 0.3),
+        tasks_per_user - int(tasks_per_user * 0.6) - int(tasks_per_user * 0.3),
+    ]
+
+    started = time.perf_counter()
+    for n in range(users):
+        cursor.execute(
+            "EXEC sp_UpsertUser @google_id=?, @email=?, @name=?",
+            f"{BENCH_PREFIX}{n}", f"{BENCH_PREFIX}{n}@example.com", f"Bench User {n}",
+        )
+        user_id = cursor.fetchone()[0]
+        cursor.executemany(
+            "INSERT INTO Tabs (client_id, user_id, name, order_index) VALUES (?, ?, ?, ?)",
+            [(str(uuid.uuid4()), user_id, f"Tab {i}", i + 2) for i in range(tabs_per_user)],
+        )
+        cursor.execute(
+            "SELECT id FROM Tabs WHERE user_id = ? AND is_system = 0", user_id,
+        )
+        tab_ids = [row[0] for row in cursor.fetchall()]
+
+        parents: list[tuple] = []  # (id, tab_id, depth, root_task_id) of the previous level
+        for depth, size in enumerate(level_sizes):
+            if size <= 0 or (depth and not parents):
+                break
+            rows = [
+                random_task(rng, user_id, tab_ids, rng.choice(parents) if depth else None)
+                for _ in range(size)
+            ]
+            cursor.executemany(insert_task, rows)
+            cursor.execute(
+                "SELECT id, tab_id, depth, root_task_id FROM Tasks WHERE user_id = ? AND depth = ? AND is_deleted = 0",
+                user_id, depth,
+            )
+            parents = [tuple(row) for row in cursor.fetchall()]
+        conn.commit()
+
+    print(f"Seeded {users} users x {tasks_per_user} tasks in {time.perf_counter() - started:.1f}s")
+    cursor.execute("UPDATE STATISTICS Tasks; UPDATE STATISTICS Tabs;")
+    conn.commit()
+
+
+# ----------------------------------------------------------------------
+# Cases
+# ----------------------------------------------------------------------
+
+def build_cases(cursor: pyodbc.Cursor, user_id: int) -> dict[str, tuple[str, dict[str, Any]]]:
+    """Benchmark cases for one user: label -> (procedure, parameters)."""
+    cursor.execute(
+        "SELECT TOP 1 t.tab_id FROM Tasks t WHERE t.user_id = ? AND t.tab_id IS NOT NULL "
+        "GROUP BY t.tab_id ORDER BY COUNT(*) DESC",
+        user_id,
+    )
+    row = cursor.fetchone()
+    tab_id = row[0] if row else None
+    device = f"{BENCH_PREFIX}device"
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    return {
+        "tabs": ("sp_GetUserTabs", {"user_id": user_id}),
+        "today": ("sp_GetTodayTasks", {"user_id": user_id}),
+        "all": ("sp_GetAllTasks", {"user_id": user_id, "include_completed": True}),
+        "all_open": ("sp_GetAllTasks", {"user_id": user_id, "include_completed": False}),
+        "tab": ("sp_GetTasksByTab", {"user_id": user_id, "tab_id": tab_id, "include_completed": False}),
+        "sync_full": ("sp_SyncPull", {"user_id": user_id, "device_id": device, "last_sync_at": None}),
+        "sync_delta": ("sp_SyncPull", {"user_id": user_id, "device_id": device, "last_sync_at": yesterday}),
+        "sync_page": ("sp_SyncPullPage", {"user_id": user_id, "device_id": device, "page_size": 500}),
+        "sync_since": ("sp_SyncPullSince", {"user_id": user_id, "device_id": device, "since_seq": 0, "page_size": 500}),
+    }
+
+
+def execute(cursor: pyodbc.Cursor, sp_name: str, params: dict[str, Any]) -> list[list[tuple]]:
+    """EXEC a procedure and drain every result set."""
+    placeholders = ", ".join(f"@{k}=?" for k in params)
+    cursor.execute(f"EXEC {sp_name} {placeholders}", list(params.values()))
+    results = []
+    while True:
+        if cursor.description:
+            results.append(cursor.fetchall())
+        if not cursor.nextset():
+            return results
+
+
+def capture_plans(cursor: pyodbc.Cursor, sp_name: str, params: dict[str, Any]) -> tuple[list[str], int]:
+    """Run once with SET STATISTICS XML ON; return the plan documents and data row count."""
+    cursor.execute("SET STATISTICS XML ON")
+    try:
+        plans, rows = [], 0
+        for result in execute(cursor, sp_name, params):
+            if result and isinstance(result[0][0], str) and result[0][0].startswith("<ShowPlanXML"):
+                plans.extend(row[0] for row in result)
+            else:
+                rows += len(result)
+        return plans, rows
+    finally:
+        cursor.execute("SET STATISTICS XML OFF")
+
+
+def summarize_plan(plan_xml: str) -> dict:
+    """Operators that matter for index tuning: scans, key lookups, missing-index hints."""
+    root = ET.fromstring(plan_xml)
+    operators, scans, lookups = [], [], []
+    for relop in root.iterfind(".//sp:RelOp", SHOWPLAN_NS):
+        op = relop.get("PhysicalOp")
+        obj = relop.find("./*/sp:Object", SHOWPLAN_NS)
+        table = obj.get("Table", "").strip("[]") if obj is not None else ""
+        index = obj.get("Index", "").strip("[]") if obj is not None else ""
+        if not table or table.startswith("#"):
+            continue
+        name = f"{op} {table}.{index}" if index else f"{op} {table}"
+        index_scan = relop.find("./sp:IndexScan", SHOWPLAN_NS)
+        if index_scan is not None and index_scan.get("Lookup") in ("1", "true"):
+            name = f"Key Lookup {table}.{index}"
+            lookups.append(name)
+        elif op in SCAN_OPS:
+            scans.append(name)
+        operators.append(name)
+    missing = len(root.findall(".//sp:MissingIndexGroup", SHOWPLAN_NS))
+    return {"operators": operators, "scans": scans, "lookups": lookups, "missing_indexes": missing}
+
+
+def run_cases(conn: pyodbc.Connection, sample_users: int, repeat: int, out: Path) -> dict:
+    """Time every case over the sampled users and capture one set of actual plans per case."""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT TOP (?) id FROM Users WHERE google_id LIKE '{BENCH_PREFIX}%' ORDER BY id",
+        sample_users,
+    )
+    user_ids = [row[0] for row in cursor.fetchall()]
+    if not user_ids:
+        sys.exit("No seeded users found; run without --skip-seed first")
+
+    timings: dict[str, list[float]] = {}
+    rows: dict[str, int] = {}
+    plans: dict[str, dict] = {}
+    (out / "plans").mkdir(parents=True, exist_ok=True)
+
+    for n, user_id in enumerate(user_ids):
+        for label, (sp_name, params) in build_cases(cursor, user_id).items():
+            if n == 0:
+                documents, row_count = capture_plans(cursor, sp_name, params)
+                conn.rollback()
+                for i, document in enumerate(documents):
+                    (out / "plans" / f"{label}.{i}.sqlplan").write_text(document, encoding="utf-8")
+                summaries = [summarize_plan(document) for document in documents]
+                plans[label] = {
+                    key: [item for s in summaries for item in s[key]]
+                    for key in ("operators", "scans", "lookups")
+                }
+                plans[label]["missing_indexes"] = sum(s["missing_indexes"] for s in summaries)
+
+            execute(cursor, sp_name, params)  # warm-up
+            conn.rollback()
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results = execute(cursor, sp_name, params)
+                timings.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+                # Sync procedures log to SyncLog; don't let the benchmark grow it
+                conn.rollback()
+            rows[label] = rows.get(label, 0) + sum(len(r) for r in results)
+
+    return {
+        label: {
+            "procedure": build_cases(cursor, user_ids[0])[label][0],
+            "samples": len(samples),
+            "p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(percentile(samples, 95), 3),
+            "mean_ms": round(statistics.fmean(samples), 3),
+            "avg_rows": round(rows[label] / len(user_ids), 1),
+            **plans.get(label, {}),
+        }
+        for label, samples in timings.items()
+    }
+
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def print_report(cases: dict, baseline: dict | None, threshold: float) -> list[str]:
+    """Print a table of the cases (vs. baseline) and return the regressions found."""
+    regressions = []
+    print(f"{'case':<12} {'procedure':<20} {'rows':>8} {'p50 ms':>9} {'p95 ms':>9} {'base p50':>9} {'ratio':>6}  plan")
+    for label, case in cases.items():
+        base = (baseline or {}).get(label)
+        ratio = case["p50_ms"] / base["p50_ms"] if base and base["p50_ms"] else None
+        flags = [f"scan: {s}" for s in case.get("scans", [])] + [f"lookup: {s}" for s in case.get("lookups", [])]
+        if case.get("missing_indexes"):
+            flags.append(f"{case['missing_indexes']} missing-index hint(s)")
+        print(
+            f"{label:<12} {case['procedure']:<20} {case['avg_rows']:>8} {case['p50_ms']:>9.2f} "
+            f"{case['p95_ms']:>9.2f} {base['p50_ms'] if base else '-':>9} "
+            f"{f'{ratio:.2f}' if ratio else '-':>6}  {'; '.join(flags) or 'ok'}"
+        )
+        if base is None:
+            continue
+        if ratio and ratio > 1 + threshold:
+            regressions.append(f"{label}: p50 {base['p50_ms']:.2f} -> {case['p50_ms']:.2f} ms")
+        for key in ("scans", "lookups"):
+            new = set(case.get(key, [])) - set(base.get(key, []))
+            if new:
+                regressions.append(f"{label}: new {key}: {', '.join(sorted(new))}")
+    return regressions
+
+
+def get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="users to seed")
+    parser.add_argument("--tasks", type=int, default=1000, help="tasks per user")
+    parser.add_argument("--tabs", type=int, default=5, help="custom tabs per user")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the data generator")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already seeded")
+    parser.add_argument("--sample-users", type=int, default=5, help="users to run the cases for")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per case and user")
+    parser.add_argument("--out", type=Path, default=Path("bench-results") / datetime.now().strftime("%Y%m%d-%H%M%S"))
+    parser.add_argument("--compare", type=Path, help="earlier --out directory to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown (0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = get_args(argv)
+    if args.repeat < 1:
+        sys.exit("--repeat must be at least 1")
+    conn = pyodbc.connect(get_connection_string(), autocommit=False)
+    try:
+        if not args.skip_seed:
+            seed(conn, args.users, args.tasks, args.tabs, args.seed)
+        cases = run_cases(conn, args.sample_users, args.repeat, args.out)
+        version = conn.cursor().execute("SELECT @@VERSION").fetchone()[0].splitlines()[0]
+    finally:
+        conn.close()
+
+    result = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "server": version,
+            "users": args.users,
+            "tasks_per_user": args.tasks,
+            "sample_users": args.sample_users,
+            "repeat": args.repeat,
+        },
+        "cases": cases,
+    }
+    (args.out / "results.json").write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads((args.compare / "results.json").read_text(encoding="utf-8"))["cases"]
+    regressions = print_report(cases, baseline, args.threshold)
+    print(f"\nResults written to {args.out}")
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Micro-benchmark: dict rows vs. compact Record rows.
+
+No database needed; driver rows are generated in memory. Run from backend/:
+
+    python -m benchmarks.rows                  # 1k / 10k / 100k task rows
+    python -m benchmarks.rows --sizes 50000 --repeat 10
+
+Per row shape it reports, for both modes:
+  convert   cursor rows -> dicts / Records (what execute_sp_* does)
+  memory    bytes held by the converted rows (tracemalloc)
+  project   converted rows -> task_row projection (what the list endpoints do)
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable
+
+from app.database.rows import convert_rows
+from app.routers.tasks import task_list_json, task_row
+from benchmarks.serialization import make_task_rows
+
+
+def driver_rows(count: int) -> tuple[list[tuple], list[tuple]]:
+    """(cursor.description, fetchall()) as pyodbc would return them."""
+    rows = make_task_rows(count)
+    columns = list(rows[0])
+    description = [(name, None, None, None, None, None, True) for name in columns]
+    return description, [tuple(row[name] for name in columns) for row in rows]
+
+
+def timed(fn: Callable[[], object], repeat: int) -> float:
+    """Median wall time in ms (GC paused, as it would skew the allocation-heavy path)."""
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+    return statistics.median(samples)
+
+
+def held_bytes(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        result = fn()  # noqa: F841 - kept alive until the snapshot
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'mode':<8} {'convert ms':>11} {'MiB':>7} {'project ms':>11} {'same json':>10}")
+    for size in args.sizes:
+        description, rows = driver_rows(size)
+        expected = None
+        for compact in (False, True):
+            convert = lambda: convert_rows(description, rows, compact)  # noqa: E731
+            converted = convert()
+            body = task_list_json.dumps(task_row.rows(converted))
+            expected = expected or body
+            print(
+                f"{size:>8} {'record' if compact else 'dict':<8} "
+                f"{timed(convert, args.repeat):>11.1f} "
+                f"{held_bytes(convert) / 2**20:>7.1f} "
+                f"{timed(lambda: task_row.rows(converted), args.repeat):>11.1f} "
+                f"{str(body == expected):>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: task search (sp_SearchTasks) on a multi-tenant SQLite database.
+
+Every user's tasks are titled from the same small vocabulary, so common words
+and short prefixes match a large share of every tenant's tasks: the case where
+a search must not pay for the other users' matches. Seeds a fresh database
+(or reuses --db) and times each query for --sample-users users. Run from
+backend/:
+
+    python -m benchmarks.search --users 200 --tasks 500
+    python -m benchmarks.search --db /tmp/search.db --skip-seed --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.database.sqlite import SqliteBackend
+from app.database.sqlite.procedures import PROCEDURES
+from benchmarks.load import WORDS
+from benchmarks.stats import percentile
+
+# label -> (terms, extra procedure parameters)
+QUERIES = {
+    "common word": (["plan"], {}),
+    "2-letter prefix": (["pl"], {}),
+    "1-letter prefix": (["b"], {}),
+    "two words": (["passport", "renew"], {}),
+    "three words": (["garage", "doctor", "water"], {}),
+    "no match": (["zzzz"], {}),
+    "word + dates, offset 20": (["plan"], {"due_from": "2026-03-01", "due_to": "2026-12-31", "offset": 20}),
+}
+
+
+def seed(conn, users: int, tasks: int, rng: random.Random) -> None:
+    """`users` users with `tasks` tasks each, inserted straight into the tables (triggers index them)."""
+    conn.execute("BEGIN")
+    for u in range(users):
+        user_id = conn.execute(
+            "INSERT INTO Users (google_id, email, name) VALUES (?, ?, ?)",
+            (f"bench-search-{u}", f"bench-search-{u}@bench.invalid", f"Bench {u}"),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO Tasks (client_id, user_id, title, description, due_date) VALUES (?, ?, ?, ?, ?)",
+            [(
+                f"bench-search-{u}-{n}", user_id,
+                " ".join(rng.choices(WORDS, k=rng.randint(2, 5))),
+                " ".join(rng.choices(WORDS, k=rng.randint(4, 30))) if rng.random() < 0.5 else None,
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.5 else None,
+            ) for n in range(tasks)],
+        )
+    conn.execute("COMMIT")
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite database file (default: a new temporary one)")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in --db")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=500, help="tasks per user")
+    parser.add_argument("--sample-users", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per query and user")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = get_args()
+    if args.skip_seed and not args.db:
+        print("--skip-seed needs --db", file=sys.stderr)
+        return 2
+    path = args.db or str(Path(tempfile.mkdtemp(prefix="taskmanager-search-")) / "search.db")
+    conn = SqliteBackend(path).connect()
+    rng = random.Random(args.seed)
+
+    if not args.skip_seed:
+        started = time.perf_counter()
+        seed(conn, args.users, args.tasks, rng)
+        print(f"Seeded {args.users} users x {args.tasks} tasks in {time.perf_counter() - started:.1f}s ({path})")
+    total_tasks = conn.execute("SELECT COUNT(*) FROM Tasks").fetchone()[0]
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM Users ORDER BY id LIMIT ?", (args.sample_users,))]
+
+    search = PROCEDURES["sp_SearchTasks"].func
+    print(f"{total_tasks} tasks; {len(user_ids)} sampled users, {args.repeat} runs each")
+    print(f"{'query':<24} {'matches':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for label, (terms, params) in QUERIES.items():
+        samples = []
+        matches = []
+        for user_id in user_ids:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                result = search(conn, user_id=user_id, terms=json.dumps(terms), **params)[0]
+                samples.append((time.perf_counter() - started) * 1000)
+            matches.append(result.rows[0][-1] if result.rows else 0)
+        print(f"{label:<24} {statistics.median(matches):>8.0f} {statistics.median(samples):>9.2f} "
+              f"{percentile(samples, 95):>9.2f} {max(samples):>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Micro-benchmark: response_model serialization vs. the fast row serializers.
+
+No database needed; rows are generated in memory. Run from backend/:
+
+    python -m benchmarks.serialization              # 1k / 10k / 100k tasks
+    python -m benchmarks.serialization --sizes 5000 --repeat 10
+
+Paths compared, per payload:
+  response_model   rows -> validated models (build_*) -> FastAPI response_model
+                   re-validation -> jsonable dicts -> json.dumps
+  validated        rows -> projected dicts -> one TypeAdapter validate + dump_json
+                   (fast_serialization = false)
+  fast             rows -> projected dicts -> orjson (fast_serialization = true)
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.config import get_settings
+from app.routers.sync import sync_pull_response
+from app.routers.tasks import build_task_response, task_list_json, task_row
+from app.schemas import SyncedTab, SyncedTask, SyncResponse, TaskResponse
+
+
+def make_task_rows(count: int) -> list[dict]:
+    """Rows shaped like sp_GetAllTasks output."""
+    now = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    return [
+        {
+            "id": i, "client_id": f"{i:08x}-0000-4000-8000-000000000000", "user_id": 1,
+            "tab_id": i % 7 or None, "parent_task_id": i - 1 if i % 3 else None,
+            "title": f"Task number {i}", "description": "Some notes about the task" if i % 2 else None,
+            "is_completed": i % 4 == 0, "due_date": date(2024, 1, 1) + timedelta(days=i % 30) if i % 2 else None,
+            "due_time": dtime(9, 30) if i % 5 == 0 else None, "depth": i % 3, "order_index": i,
+            "created_at": now, "updated_at": now, "completed_at": now if i % 4 == 0 else None,
+            "is_deleted": False, "level": i % 3, "change_seq": 1000 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def make_tab_rows(count: int) -> list[dict]:
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        {
+            "id": i, "client_id": f"{i:08x}-0000-4000-8000-00000000000a", "user_id": 1,
+            "name": f"Tab {i}", "order_index": i, "is_system": i < 2, "tab_type": "custom",
+            "created_at": now, "updated_at": now, "is_deleted": False, "change_seq": i,
+        }
+        for i in range(count)
+    ]
+
+
+async def via_response_model(response_type, content) -> bytes:
+    """What FastAPI does with a returned object and response_model=response_type."""
+    field = create_response_field(name="Response", type_=response_type)
+    payload = await serialize_response(field=field, response_content=content, is_coroutine=True)
+    return JSONResponse(payload).body
+
+
+def task_list_paths(rows: list[dict]) -> dict[str, Callable[[], bytes]]:
+    def response_model():
+        models = [build_task_response(row) for row in rows]
+        return asyncio.run(via_response_model(List[TaskResponse], models))
+
+    def serializer():
+        return task_list_json.dumps(task_row.rows(rows))
+
+    return {"response_model": response_model, "validated": serializer, "fast": serializer}
+
+
+def sync_pull_paths(tab_rows: list[dict], task_rows: list[dict]) -> dict[str, Callable[[], bytes]]:
+    def response_model():
+        content = SyncResponse(
+            tabs=[SyncedTab(**row) for row in tab_rows],
+            tasks=[
+                SyncedTask(**{
+                    **row,
+                    "due_date": str(row["due_date"]) if row["due_date"] else None,
+                    "due_time": str(row["due_time"]) if row["due_time"] else None,
+                })
+                for row in task_rows
+            ],
+            sync_timestamp=datetime.utcnow(),
+        )
+        return asyncio.run(via_response_model(SyncResponse, content))
+
+    def serializer():
+        return sync_pull_response(tab_rows, task_rows, datetime.utcnow()).body
+
+    return {"response_model": response_model, "validated": serializer, "fast": serializer}
+
+
+def measure(fn: Callable[[], bytes], fast: bool, repeat: int) -> tuple[float, int]:
+    """Median wall time in ms and payload size."""
+    get_settings().fast_serialization = fast
+    body = fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'payload':<22} {'path':<16} {'median ms':>10} {'us/row':>8} {'KiB':>9} {'speedup':>8}")
+    for size in args.sizes:
+        task_rows = make_task_rows(size)
+        cases = {
+            f"task list {size}": task_list_paths(task_rows),
+            f"sync pull {size}": sync_pull_paths(make_tab_rows(20), task_rows),
+        }
+        for name, paths in cases.items():
+            baseline = None
+            for path, fn in paths.items():
+                ms, body_size = measure(fn, fast=path == "fast", repeat=args.repeat)
+                baseline = baseline or ms
+                print(
+                    f"{name:<22} {path:<16} {ms:>10.1f} {ms * 1000 / size:>8.2f} "
+                    f"{body_size / 1024:>9.0f} {baseline / ms:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
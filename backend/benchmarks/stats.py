@@ -0,0 +1,6 @@
+"""Helpers shared by the benchmark scripts (no database driver needed)."""
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,11 @@
+-- Migration 001: apply-on-push sync
+-- Adds the column sp_SyncApplyItems uses to recognize re-pushed items.
+-- Safe to run more than once. Run stored_procedures.sql afterwards.
+
+IF COL_LENGTH('Tabs', 'last_client_updated_at') IS NULL
+    ALTER TABLE Tabs ADD last_client_updated_at DATETIME2 NULL;
+GO
+
+IF COL_LENGTH('Tasks', 'last_client_updated_at') IS NULL
+    ALTER TABLE Tasks ADD last_client_updated_at DATETIME2 NULL;
+GO
@@ -0,0 +1,22 @@
+-- Migration 002: server-side change sequence for sync
+-- Adds a ROWVERSION column (bumped on every insert/update) and covering indexes for
+-- sp_SyncPullSince. Safe to run more than once. Run stored_procedures.sql afterwards.
+
+IF COL_LENGTH('Tabs', 'change_seq') IS NULL
+    ALTER TABLE Tabs ADD change_seq ROWVERSION;
+GO
+
+IF COL_LENGTH('Tasks', 'change_seq') IS NULL
+    ALTER TABLE Tasks ADD change_seq ROWVERSION;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tabs_UserId_ChangeSeq' AND object_id = OBJECT_ID('Tabs'))
+    CREATE INDEX IX_Tabs_UserId_ChangeSeq ON Tabs(user_id, change_seq)
+        INCLUDE (client_id, name, order_index, is_system, tab_type, created_at, updated_at, is_deleted);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_UserId_ChangeSeq' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_UserId_ChangeSeq ON Tasks(user_id, change_seq)
+        INCLUDE (client_id, tab_id, parent_task_id, title, description, is_completed, due_date, due_time,
+                 depth, order_index, created_at, updated_at, completed_at, is_deleted);
+GO
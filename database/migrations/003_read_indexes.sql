@@ -0,0 +1,68 @@
+-- Migration 003: composite / filtered / covering indexes for the read procedures
+-- Replaces the single-column indexes that the view and sync procedures could not use for a
+-- seek (or that forced a key lookup per row). Safe to run more than once.
+-- Filtered indexes need ANSI_NULLS and QUOTED_IDENTIFIER ON (the ODBC driver default).
+-- Run stored_procedures.sql afterwards (the view procedures no longer SELECT t.*).
+-- Measure before/after with backend/benchmarks/query_plans.py.
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+-- Tabs
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tabs_UserId_Active' AND object_id = OBJECT_ID('Tabs'))
+    CREATE INDEX IX_Tabs_UserId_Active ON Tabs(user_id, order_index)
+        INCLUDE (client_id, name, is_system, tab_type, created_at, updated_at)
+        WHERE is_deleted = 0;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tabs_UserId_UpdatedAt' AND object_id = OBJECT_ID('Tabs'))
+    CREATE INDEX IX_Tabs_UserId_UpdatedAt ON Tabs(user_id, updated_at)
+        INCLUDE (client_id, name, order_index, is_system, tab_type, created_at, is_deleted);
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tabs_UserId' AND object_id = OBJECT_ID('Tabs'))
+    DROP INDEX IX_Tabs_UserId ON Tabs;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tabs_UpdatedAt' AND object_id = OBJECT_ID('Tabs'))
+    DROP INDEX IX_Tabs_UpdatedAt ON Tabs;
+GO
+
+-- Tasks
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_UserId_Roots_Active' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_UserId_Roots_Active ON Tasks(user_id, parent_task_id, is_completed, tab_id)
+        INCLUDE (client_id, title, description, due_date, due_time, depth, order_index,
+                 created_at, updated_at, completed_at)
+        WHERE is_deleted = 0;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_ParentTaskId_Active' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_ParentTaskId_Active ON Tasks(parent_task_id, is_completed)
+        INCLUDE (client_id, user_id, tab_id, title, description, due_date, due_time, depth, order_index,
+                 created_at, updated_at, completed_at)
+        WHERE is_deleted = 0;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_UserId_UpdatedAt' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_UserId_UpdatedAt ON Tasks(user_id, updated_at)
+        INCLUDE (client_id, tab_id, parent_task_id, title, description, is_completed, due_date, due_time,
+                 depth, order_index, created_at, completed_at, is_deleted);
+GO
+
+-- Superseded: user_id leads the composites above; the rest were never selective enough to seek on
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_UserId' AND object_id = OBJECT_ID('Tasks'))
+    DROP INDEX IX_Tasks_UserId ON Tasks;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_UpdatedAt' AND object_id = OBJECT_ID('Tasks'))
+    DROP INDEX IX_Tasks_UpdatedAt ON Tasks;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_IsCompleted' AND object_id = OBJECT_ID('Tasks'))
+    DROP INDEX IX_Tasks_IsCompleted ON Tasks;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_DueDate' AND object_id = OBJECT_ID('Tasks'))
+    DROP INDEX IX_Tasks_DueDate ON Tasks;
+GO
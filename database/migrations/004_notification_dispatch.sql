@@ -0,0 +1,25 @@
+-- Migration 004: notification dispatcher
+-- Adds the claim lease / attempt columns used by sp_ClaimDueNotifications and replaces the
+-- scheduled_at index with one the claim query can seek on. Safe to run more than once.
+-- Run stored_procedures.sql afterwards.
+
+IF COL_LENGTH('Notifications', 'sent_at') IS NULL
+    ALTER TABLE Notifications ADD sent_at DATETIME2 NULL;
+GO
+
+IF COL_LENGTH('Notifications', 'claimed_until') IS NULL
+    ALTER TABLE Notifications ADD claimed_until DATETIME2 NULL;
+GO
+
+IF COL_LENGTH('Notifications', 'attempts') IS NULL
+    ALTER TABLE Notifications ADD attempts INT NOT NULL CONSTRAINT DF_Notifications_Attempts DEFAULT 0;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Notifications_IsSent_ScheduledAt' AND object_id = OBJECT_ID('Notifications'))
+    CREATE INDEX IX_Notifications_IsSent_ScheduledAt ON Notifications(is_sent, scheduled_at)
+        INCLUDE (claimed_until, attempts);
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Notifications_ScheduledAt' AND object_id = OBJECT_ID('Notifications'))
+    DROP INDEX IX_Notifications_ScheduledAt ON Notifications;
+GO
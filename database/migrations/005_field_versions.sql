@@ -0,0 +1,55 @@
+-- Migration 005: per-field change tracking for delta sync
+-- Creates FieldVersions and seeds it with every existing row's current change_seq, so a
+-- delta pull never sees a changed row without its changed fields. Safe to run more than once.
+-- Run stored_procedures.sql afterwards (it creates the triggers that keep FieldVersions current).
+
+IF OBJECT_ID('FieldVersions', 'U') IS NULL
+    CREATE TABLE FieldVersions (
+        entity_type VARCHAR(10) NOT NULL,
+        entity_id INT NOT NULL,
+        field_name VARCHAR(32) NOT NULL,
+        change_seq BIGINT NOT NULL,
+        
+        CONSTRAINT PK_FieldVersions PRIMARY KEY (entity_type, entity_id, field_name)
+    );
+GO
+
+INSERT INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+SELECT 'tab', t.id, f.field_name, CAST(t.change_seq AS BIGINT)
+FROM Tabs t
+CROSS JOIN (VALUES
+        ('name'),
+        ('order_index'),
+        ('is_system'),
+        ('tab_type'),
+        ('created_at'),
+        ('is_deleted')
+) f(field_name)
+WHERE NOT EXISTS (
+    SELECT 1 FROM FieldVersions fv 
+    WHERE fv.entity_type = 'tab' AND fv.entity_id = t.id AND fv.field_name = f.field_name
+);
+GO
+
+INSERT INTO FieldVersions (entity_type, entity_id, field_name, change_seq)
+SELECT 'task', t.id, f.field_name, CAST(t.change_seq AS BIGINT)
+FROM Tasks t
+CROSS JOIN (VALUES
+        ('tab_id'),
+        ('parent_task_id'),
+        ('title'),
+        ('description'),
+        ('is_completed'),
+        ('due_date'),
+        ('due_time'),
+        ('depth'),
+        ('order_index'),
+        ('created_at'),
+        ('completed_at'),
+        ('is_deleted')
+) f(field_name)
+WHERE NOT EXISTS (
+    SELECT 1 FROM FieldVersions fv 
+    WHERE fv.entity_type = 'task' AND fv.entity_id = t.id AND fv.field_name = f.field_name
+);
+GO
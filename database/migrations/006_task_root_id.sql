@@ -0,0 +1,49 @@
+-- Migration 006: precomputed task hierarchy (root_task_id)
+-- Every child task records the root of its tree, so with depth capped at 3 levels
+-- (CK_Tasks_Depth) a task's ancestors are just its parent and root, and a subtree is one
+-- seek on root_task_id / parent_task_id; the view and cascade procedures no longer recurse.
+-- Safe to run more than once. Run stored_procedures.sql afterwards (it maintains the column).
+-- The backfill bumps change_seq of every child task, so clients pull those rows once more.
+-- Measure before/after with backend/benchmarks/hierarchy.py.
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF COL_LENGTH('Tasks', 'root_task_id') IS NULL
+    ALTER TABLE Tasks ADD root_task_id INT NULL;
+GO
+
+IF OBJECT_ID('FK_Tasks_RootTask', 'F') IS NULL
+    ALTER TABLE Tasks ADD CONSTRAINT FK_Tasks_RootTask
+        FOREIGN KEY (root_task_id) REFERENCES Tasks(id) ON DELETE NO ACTION;
+GO
+
+-- The parent is either the root (depth 1) or a child of the root (depth 2)
+UPDATE c
+SET root_task_id = COALESCE(p.parent_task_id, p.id)
+FROM Tasks c
+INNER JOIN Tasks p ON p.id = c.parent_task_id
+WHERE c.root_task_id IS NULL
+   OR c.root_task_id <> COALESCE(p.parent_task_id, p.id);
+GO
+
+UPDATE Tasks SET root_task_id = NULL
+WHERE parent_task_id IS NULL AND root_task_id IS NOT NULL;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_RootTaskId_Active' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_RootTaskId_Active ON Tasks(root_task_id, is_completed)
+        INCLUDE (client_id, user_id, tab_id, parent_task_id, title, description, due_date, due_time, depth,
+                 order_index, created_at, updated_at, completed_at)
+        WHERE is_deleted = 0;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_RootTaskId' AND object_id = OBJECT_ID('Tasks'))
+    CREATE INDEX IX_Tasks_RootTaskId ON Tasks(root_task_id);
+GO
+
+-- Superseded: only the recursive step of the view procedures used it
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Tasks_ParentTaskId_Active' AND object_id = OBJECT_ID('Tasks'))
+    DROP INDEX IX_Tasks_ParentTaskId_Active ON Tasks;
+GO
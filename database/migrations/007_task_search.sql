@@ -0,0 +1,44 @@
+-- Migration 007: full-text task search (GET /tasks/search)
+-- Adds TaskSearch (one row per task: title, and title + description as one text column) with a
+-- full-text index on it; sp_SearchTasks queries it with prefix terms and CONTAINSTABLE ranking.
+-- Requires the Full-Text Search feature (SELECT SERVERPROPERTY('IsFullTextInstalled') = 1).
+-- Safe to run more than once. Run stored_procedures.sql afterwards (trg_Tasks_Search keeps the
+-- table current from then on); rerunning this script later fills in anything changed in between.
+-- The index is populated in the background, so searches find existing tasks once it catches up:
+-- SELECT FULLTEXTCATALOGPROPERTY('TaskManagerSearch', 'PopulateStatus') -- 0 = idle
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+IF OBJECT_ID('TaskSearch', 'U') IS NULL
+    CREATE TABLE TaskSearch (
+        task_id INT NOT NULL,
+        title NVARCHAR(1000) NOT NULL,
+        search_text NVARCHAR(MAX) NOT NULL,
+        
+        CONSTRAINT PK_TaskSearch PRIMARY KEY (task_id),
+        CONSTRAINT FK_TaskSearch_Task FOREIGN KEY (task_id) REFERENCES Tasks(id) ON DELETE CASCADE
+    );
+GO
+
+MERGE TaskSearch AS s
+USING (
+    SELECT id, title, CONCAT(title, NCHAR(10), description) AS search_text FROM Tasks
+) AS src
+ON s.task_id = src.id
+WHEN MATCHED AND (s.title <> src.title OR s.search_text <> src.search_text) THEN
+    UPDATE SET title = src.title, search_text = src.search_text
+WHEN NOT MATCHED THEN
+    INSERT (task_id, title, search_text) VALUES (src.id, src.title, src.search_text);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'TaskManagerSearch')
+    CREATE FULLTEXT CATALOG TaskManagerSearch;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('TaskSearch'))
+    CREATE FULLTEXT INDEX ON TaskSearch (title LANGUAGE 0, search_text LANGUAGE 0)
+        KEY INDEX PK_TaskSearch ON TaskManagerSearch
+        WITH CHANGE_TRACKING = AUTO, STOPLIST = OFF;
+GO
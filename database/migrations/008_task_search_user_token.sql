@@ -0,0 +1,48 @@
+-- Migration 008: per-user full-text search (GET /tasks/search)
+-- Every TaskSearch row now starts with its owner's token (fn_TaskSearchUserToken), and
+-- sp_SearchTasks ANDs the token into its full-text condition. CONTAINSTABLE then returns only the
+-- searching user's matches instead of ranking every user's and filtering afterwards.
+-- TaskSearch.title grows to fit the token; the full-text index is dropped for the column change and
+-- recreated (populated in the background, see 007). Safe to run more than once; run it again after
+-- rerunning 007. Run stored_procedures.sql afterwards (trg_Tasks_Search writes the token from then on).
+
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+CREATE OR ALTER FUNCTION fn_TaskSearchUserToken(@user_id INT)
+RETURNS NVARCHAR(16)
+WITH SCHEMABINDING
+AS
+BEGIN
+    RETURN N'zzu' + TRANSLATE(CAST(@user_id AS NVARCHAR(11)), N'0123456789', N'abcdefghij');
+END
+GO
+
+IF COL_LENGTH('TaskSearch', 'title') < 2200
+BEGIN
+    IF EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('TaskSearch'))
+        DROP FULLTEXT INDEX ON TaskSearch;
+    ALTER TABLE TaskSearch ALTER COLUMN title NVARCHAR(1100) NOT NULL;
+END
+GO
+
+MERGE TaskSearch AS s
+USING (
+    SELECT id,
+           CONCAT(dbo.fn_TaskSearchUserToken(user_id), N' ', title) AS title,
+           CONCAT(dbo.fn_TaskSearchUserToken(user_id), N' ', title, NCHAR(10), description) AS search_text
+    FROM Tasks
+) AS src
+ON s.task_id = src.id
+WHEN MATCHED AND (s.title <> src.title OR s.search_text <> src.search_text) THEN
+    UPDATE SET title = src.title, search_text = src.search_text
+WHEN NOT MATCHED THEN
+    INSERT (task_id, title, search_text) VALUES (src.id, src.title, src.search_text);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('TaskSearch'))
+    CREATE FULLTEXT INDEX ON TaskSearch (title LANGUAGE 0, search_text LANGUAGE 0)
+        KEY INDEX PK_TaskSearch ON TaskManagerSearch
+        WITH CHANGE_TRACKING = AUTO, STOPLIST = OFF;
+GO
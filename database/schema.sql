@@ -31,13 +31,23 @@ CREATE TABLE Tabs (
     created_at DATETIME2 DEFAULT GETUTCDATE(),
     updated_at DATETIME2 DEFAULT GETUTCDATE(),
     is_deleted BIT NOT NULL DEFAULT 0,
+    last_client_updated_at DATETIME2 NULL,   -- client_updated_at of the last applied sync push
+    change_seq ROWVERSION,                   -- Bumped by the server on every insert/update (sync token)
     
     CONSTRAINT FK_Tabs_Users FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE
 );
 
-CREATE INDEX IX_Tabs_UserId ON Tabs(user_id);
 CREATE INDEX IX_Tabs_ClientId ON Tabs(client_id);
-CREATE INDEX IX_Tabs_UpdatedAt ON Tabs(updated_at);
+-- Covers sp_GetUserTabs: live tabs of a user, already in display order
+CREATE INDEX IX_Tabs_UserId_Active ON Tabs(user_id, order_index)
+    INCLUDE (client_id, name, is_system, tab_type, created_at, updated_at)
+    WHERE is_deleted = 0;
+-- Covers sp_SyncPull / sp_SyncPullPage: (updated_at, id) range per user
+CREATE INDEX IX_Tabs_UserId_UpdatedAt ON Tabs(user_id, updated_at)
+    INCLUDE (client_id, name, order_index, is_system, tab_type, created_at, is_deleted);
+-- Covers sp_SyncPullSince: one seek per user, no lookups
+CREATE INDEX IX_Tabs_UserId_ChangeSeq ON Tabs(user_id, change_seq)
+    INCLUDE (client_id, name, order_index, is_system, tab_type, created_at, updated_at, is_deleted);
 
 -- =============================================
 -- Tasks Table
@@ -48,6 +58,7 @@ CREATE TABLE Tasks (
     user_id INT NOT NULL,
     tab_id INT NULL,                          -- NULL for tasks visible in Today/AllTasks only
     parent_task_id INT NULL,                  -- NULL for root tasks
+    root_task_id INT NULL,                    -- Top of the task's tree (NULL for root tasks)
     title NVARCHAR(1000) NOT NULL,
     description NVARCHAR(MAX) NULL,
     is_completed BIT NOT NULL DEFAULT 0,
@@ -59,20 +70,78 @@ CREATE TABLE Tasks (
     updated_at DATETIME2 DEFAULT GETUTCDATE(),
     completed_at DATETIME2 NULL,
     is_deleted BIT NOT NULL DEFAULT 0,
+    last_client_updated_at DATETIME2 NULL,   -- client_updated_at of the last applied sync push
+    change_seq ROWVERSION,                   -- Bumped by the server on every insert/update (sync token)
     
     CONSTRAINT FK_Tasks_Users FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
     CONSTRAINT FK_Tasks_Tabs FOREIGN KEY (tab_id) REFERENCES Tabs(id) ON DELETE NO ACTION,
     CONSTRAINT FK_Tasks_ParentTask FOREIGN KEY (parent_task_id) REFERENCES Tasks(id) ON DELETE NO ACTION,
+    CONSTRAINT FK_Tasks_RootTask FOREIGN KEY (root_task_id) REFERENCES Tasks(id) ON DELETE NO ACTION,
     CONSTRAINT CK_Tasks_Depth CHECK (depth >= 0 AND depth <= 2)
 );
 
-CREATE INDEX IX_Tasks_UserId ON Tasks(user_id);
 CREATE INDEX IX_Tasks_TabId ON Tasks(tab_id);
 CREATE INDEX IX_Tasks_ParentTaskId ON Tasks(parent_task_id);
 CREATE INDEX IX_Tasks_ClientId ON Tasks(client_id);
-CREATE INDEX IX_Tasks_DueDate ON Tasks(due_date);
-CREATE INDEX IX_Tasks_UpdatedAt ON Tasks(updated_at);
-CREATE INDEX IX_Tasks_IsCompleted ON Tasks(is_completed);
+-- Root level of the Today / All / Tab views: seek on (user, root, completed[, tab])
+CREATE INDEX IX_Tasks_UserId_Roots_Active ON Tasks(user_id, parent_task_id, is_completed, tab_id)
+    INCLUDE (client_id, title, description, due_date, due_time, depth, order_index,
+             created_at, updated_at, completed_at)
+    WHERE is_deleted = 0;
+-- Descendants of those roots: one seek per root on root_task_id, no recursion
+CREATE INDEX IX_Tasks_RootTaskId_Active ON Tasks(root_task_id, is_completed)
+    INCLUDE (client_id, user_id, tab_id, parent_task_id, title, description, due_date, due_time, depth,
+             order_index, created_at, updated_at, completed_at)
+    WHERE is_deleted = 0;
+-- Subtree writes (delete / move cascades), including already-deleted rows
+CREATE INDEX IX_Tasks_RootTaskId ON Tasks(root_task_id);
+-- Covers sp_SyncPull / sp_SyncPullPage: (updated_at, id) range per user
+CREATE INDEX IX_Tasks_UserId_UpdatedAt ON Tasks(user_id, updated_at)
+    INCLUDE (client_id, tab_id, parent_task_id, title, description, is_completed, due_date, due_time,
+             depth, order_index, created_at, completed_at, is_deleted);
+-- Covers sp_SyncPullSince: one seek per user, no lookups
+CREATE INDEX IX_Tasks_UserId_ChangeSeq ON Tasks(user_id, change_seq)
+    INCLUDE (client_id, tab_id, parent_task_id, title, description, is_completed, due_date, due_time,
+             depth, order_index, created_at, updated_at, completed_at, is_deleted);
+
+-- =============================================
+-- FieldVersions Table - Per-field change tracking for delta sync
+-- =============================================
+-- Maintained by the trg_*_FieldVersions triggers (stored_procedures.sql): the row's
+-- change_seq at the last insert/update that changed each field
+CREATE TABLE FieldVersions (
+    entity_type VARCHAR(10) NOT NULL,        -- 'tab' or 'task'
+    entity_id INT NOT NULL,
+    field_name VARCHAR(32) NOT NULL,
+    change_seq BIGINT NOT NULL,
+    
+    CONSTRAINT PK_FieldVersions PRIMARY KEY (entity_type, entity_id, field_name)
+);
+
+-- =============================================
+-- TaskSearch Table - Full-text index over task titles and descriptions
+-- =============================================
+-- One row per task, maintained by trg_Tasks_Search (stored_procedures.sql) and searched by
+-- sp_SearchTasks. Title and description are also kept together in search_text because the
+-- terms of a multi-column CONTAINS must all match within the same column. Both columns start
+-- with the owner's token (fn_TaskSearchUserToken), which sp_SearchTasks ANDs into every
+-- condition, so the full-text engine only returns the searching user's matches.
+-- Needs the Full-Text Search feature of SQL Server.
+CREATE TABLE TaskSearch (
+    task_id INT NOT NULL,
+    title NVARCHAR(1100) NOT NULL,            -- user token + space + title
+    search_text NVARCHAR(MAX) NOT NULL,       -- user token + space + title + line break + description
+    
+    CONSTRAINT PK_TaskSearch PRIMARY KEY (task_id),
+    CONSTRAINT FK_TaskSearch_Task FOREIGN KEY (task_id) REFERENCES Tasks(id) ON DELETE CASCADE
+);
+
+CREATE FULLTEXT CATALOG TaskManagerSearch;
+
+-- Neutral word breaker (LANGUAGE 0) and no stoplist: titles mix Georgian and English
+CREATE FULLTEXT INDEX ON TaskSearch (title LANGUAGE 0, search_text LANGUAGE 0)
+    KEY INDEX PK_TaskSearch ON TaskManagerSearch
+    WITH CHANGE_TRACKING = AUTO, STOPLIST = OFF;
 
 -- =============================================
 -- SyncLog Table - Track sync history per device
@@ -104,6 +173,9 @@ CREATE TABLE Notifications (
     scheduled_at DATETIME2 NOT NULL,
     is_read BIT NOT NULL DEFAULT 0,
     is_sent BIT NOT NULL DEFAULT 0,
+    sent_at DATETIME2 NULL,
+    claimed_until DATETIME2 NULL,  -- Dispatcher lease; an expired claim can be taken again
+    attempts INT NOT NULL DEFAULT 0,
     created_at DATETIME2 DEFAULT GETUTCDATE(),
     
     CONSTRAINT FK_Notifications_Users FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE CASCADE,
@@ -111,4 +183,6 @@ CREATE TABLE Notifications (
 );
 
 CREATE INDEX IX_Notifications_UserId ON Notifications(user_id);
-CREATE INDEX IX_Notifications_ScheduledAt ON Notifications(scheduled_at);
+-- Dispatcher claims: unsent notifications in due order
+CREATE INDEX IX_Notifications_IsSent_ScheduledAt ON Notifications(is_sent, scheduled_at)
+    INCLUDE (claimed_until, attempts);
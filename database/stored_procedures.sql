@@ -71,6 +71,30 @@ BEGIN
 END
 GO
 
+-- Data version of a user: highest change_seq over their tabs and tasks.
+-- Changes on every write (soft deletes included); one backward seek per table on the
+-- (user_id, change_seq) indexes. is_stable = 0 while a lower rowversion may still be
+-- uncommitted (its commit would not move the max), so callers must not cache on it.
+CREATE OR ALTER PROCEDURE sp_GetUserDataVersion
+    @user_id INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @tab_seq BIGINT, @task_seq BIGINT, @data_version BIGINT;
+    
+    SELECT @tab_seq = CAST(MAX(change_seq) AS BIGINT) FROM Tabs WHERE user_id = @user_id;
+    SELECT @task_seq = CAST(MAX(change_seq) AS BIGINT) FROM Tasks WHERE user_id = @user_id;
+    
+    SET @data_version = CASE WHEN ISNULL(@tab_seq, 0) > ISNULL(@task_seq, 0)
+                             THEN ISNULL(@tab_seq, 0) ELSE ISNULL(@task_seq, 0) END;
+    
+    SELECT @data_version AS data_version,
+           CAST(CASE WHEN @data_version < CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) THEN 1 ELSE 0 END AS BIT)
+               AS is_stable;
+END
+GO
+
 -- Create new tab
 CREATE OR ALTER PROCEDURE sp_CreateTab
     @client_id NVARCHAR(36),
@@ -163,12 +187,13 @@ BEGIN
     SET NOCOUNT ON;
     
     DECLARE @depth INT = 0;
+    DECLARE @root_task_id INT = NULL;
     DECLARE @order_index INT;
     
-    -- Calculate depth based on parent
+    -- Calculate depth and tree root based on parent
     IF @parent_task_id IS NOT NULL
     BEGIN
-        SELECT @depth = depth + 1 
+        SELECT @depth = depth + 1, @root_task_id = COALESCE(root_task_id, id)
         FROM Tasks 
         WHERE id = @parent_task_id AND user_id = @user_id;
         
@@ -193,9 +218,9 @@ BEGIN
       AND ISNULL(parent_task_id, 0) = ISNULL(@parent_task_id, 0)
       AND is_deleted = 0;
     
-    INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, title, description, 
+    INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description, 
                        due_date, due_time, depth, order_index)
-    VALUES (@client_id, @user_id, @tab_id, @parent_task_id, @title, @description, 
+    VALUES (@client_id, @user_id, @tab_id, @parent_task_id, @root_task_id, @title, @description, 
             @due_date, @due_time, @depth, @order_index);
     
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
@@ -216,10 +241,11 @@ BEGIN
     SET NOCOUNT ON;
     
     DECLARE @parent_task_id INT;
+    DECLARE @root_task_id INT;
     DECLARE @has_incomplete_children BIT = 0;
     
     -- Get task info
-    SELECT @parent_task_id = parent_task_id 
+    SELECT @parent_task_id = parent_task_id, @root_task_id = root_task_id
     FROM Tasks 
     WHERE id = @task_id AND user_id = @user_id;
     
@@ -264,25 +290,14 @@ BEGIN
         END
     END
     
-    -- If uncompleting, also uncomplete parent chain
+    -- If uncompleting, also uncomplete parent chain (at most the parent and the root)
     IF @is_completed = 0 AND @parent_task_id IS NOT NULL
     BEGIN
-        ;WITH ParentChain AS (
-            SELECT id, parent_task_id 
-            FROM Tasks 
-            WHERE id = @parent_task_id
-            
-            UNION ALL
-            
-            SELECT t.id, t.parent_task_id 
-            FROM Tasks t
-            INNER JOIN ParentChain pc ON t.id = pc.parent_task_id
-        )
         UPDATE Tasks 
         SET is_completed = 0,
             completed_at = NULL,
             updated_at = GETUTCDATE()
-        WHERE id IN (SELECT id FROM ParentChain);
+        WHERE id IN (@parent_task_id, @root_task_id);
     END
     
     -- Return updated task with children status
@@ -296,29 +311,42 @@ END
 GO
 
 -- Get today's tasks (due today or overdue)
+-- The view procedures list their columns explicitly (no t.*) so the filtered
+-- IX_Tasks_*_Active indexes cover them without key lookups.
+-- Children are fetched by root_task_id rather than recursively: a depth-2 child is
+-- included only if its parent (depth 1) passes the same filters, as the recursion did.
 CREATE OR ALTER PROCEDURE sp_GetTodayTasks
     @user_id INT
 AS
 BEGIN
     SET NOCOUNT ON;
     
-    ;WITH TaskHierarchy AS (
+    ;WITH Roots AS (
         -- Root tasks due today or overdue
-        SELECT t.*, 0 AS level
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted
         FROM Tasks t
         WHERE t.user_id = @user_id 
           AND t.is_deleted = 0
           AND t.parent_task_id IS NULL
           AND (t.due_date <= CAST(GETUTCDATE() AS DATE) OR t.due_date IS NULL)
           AND t.is_completed = 0
+    ),
+    TaskHierarchy AS (
+        SELECT r.*, 0 AS level FROM Roots r
         
         UNION ALL
         
         -- Child tasks
-        SELECT t.*, th.level + 1
-        FROM Tasks t
-        INNER JOIN TaskHierarchy th ON t.parent_task_id = th.id
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted, t.depth
+        FROM Roots r
+        INNER JOIN Tasks t ON t.root_task_id = r.id
+        LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
         WHERE t.is_deleted = 0
+          AND (t.depth = 1 OR p.is_deleted = 0)
     )
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
            is_completed, due_date, due_time, depth, order_index,
@@ -340,30 +368,41 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    ;WITH TaskHierarchy AS (
+    ;WITH Roots AS (
         -- Root tasks
-        SELECT t.*, 0 AS level
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted
         FROM Tasks t
         WHERE t.user_id = @user_id 
           AND t.is_deleted = 0
           AND t.parent_task_id IS NULL
           AND (@tab_id IS NULL OR t.tab_id = @tab_id)
           AND (@include_completed = 1 OR t.is_completed = 0)
+    ),
+    TaskHierarchy AS (
+        SELECT r.*, 0 AS level FROM Roots r
         
         UNION ALL
         
         -- Child tasks
-        SELECT t.*, th.level + 1
-        FROM Tasks t
-        INNER JOIN TaskHierarchy th ON t.parent_task_id = th.id
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted, t.depth
+        FROM Roots r
+        INNER JOIN Tasks t ON t.root_task_id = r.id
+        LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
         WHERE t.is_deleted = 0
           AND (@include_completed = 1 OR t.is_completed = 0)
+          AND (t.depth = 1 OR (p.is_deleted = 0 AND (@include_completed = 1 OR p.is_completed = 0)))
     )
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
            is_completed, due_date, due_time, depth, order_index,
            created_at, updated_at, completed_at, is_deleted, level
     FROM TaskHierarchy
-    ORDER BY level, order_index;
+    ORDER BY level, order_index
+    -- Catch-all filters: compile per call so the anchor seeks on tab_id / is_completed
+    OPTION (RECOMPILE);
 END
 GO
 
@@ -375,22 +414,31 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    ;WITH TaskHierarchy AS (
+    ;WITH Roots AS (
         -- Root tasks
-        SELECT t.*, 0 AS level
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted
         FROM Tasks t
         WHERE t.user_id = @user_id 
           AND t.is_deleted = 0
           AND t.parent_task_id IS NULL
           AND (@include_completed = 1 OR t.is_completed = 0)
+    ),
+    TaskHierarchy AS (
+        SELECT r.*, 0 AS level FROM Roots r
         
         UNION ALL
         
         -- Child tasks
-        SELECT t.*, th.level + 1
-        FROM Tasks t
-        INNER JOIN TaskHierarchy th ON t.parent_task_id = th.id
+        SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+               t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+               t.created_at, t.updated_at, t.completed_at, t.is_deleted, t.depth
+        FROM Roots r
+        INNER JOIN Tasks t ON t.root_task_id = r.id
+        LEFT JOIN Tasks p ON p.id = t.parent_task_id AND t.depth = 2
         WHERE t.is_deleted = 0
+          AND (t.depth = 1 OR p.is_deleted = 0)
     )
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
            is_completed, due_date, due_time, depth, order_index,
@@ -438,19 +486,11 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    -- Soft delete task and all its descendants
-    ;WITH TaskDescendants AS (
-        SELECT id FROM Tasks WHERE id = @task_id AND user_id = @user_id
-        
-        UNION ALL
-        
-        SELECT t.id 
-        FROM Tasks t
-        INNER JOIN TaskDescendants td ON t.parent_task_id = td.id
-    )
+    -- Soft delete task and all its descendants (below a root: root_task_id; below depth 1: parent_task_id)
     UPDATE Tasks 
     SET is_deleted = 1, updated_at = GETUTCDATE()
-    WHERE id IN (SELECT id FROM TaskDescendants);
+    WHERE user_id = @user_id
+      AND (id = @task_id OR root_task_id = @task_id OR parent_task_id = @task_id);
     
     SELECT @@ROWCOUNT AS affected_rows;
 END
@@ -466,18 +506,10 @@ BEGIN
     SET NOCOUNT ON;
     
     -- Move task and all its children to new tab
-    ;WITH TaskDescendants AS (
-        SELECT id FROM Tasks WHERE id = @task_id AND user_id = @user_id
-        
-        UNION ALL
-        
-        SELECT t.id 
-        FROM Tasks t
-        INNER JOIN TaskDescendants td ON t.parent_task_id = td.id
-    )
     UPDATE Tasks 
     SET tab_id = @new_tab_id, updated_at = GETUTCDATE()
-    WHERE id IN (SELECT id FROM TaskDescendants);
+    WHERE user_id = @user_id
+      AND (id = @task_id OR root_task_id = @task_id OR parent_task_id = @task_id);
     
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
            is_completed, due_date, due_time, depth, order_index,
@@ -487,6 +519,354 @@ BEGIN
 END
 GO
 
+-- =============================================
+-- BULK TASK PROCEDURES
+-- =============================================
+-- @task_ids is a JSON array of task ids; ids that aren't the user's (or are deleted) are ignored.
+-- Each runs as one transaction and computes the cascades once for the whole set.
+
+-- Complete / uncomplete many tasks (same parent rules as sp_CompleteTask)
+CREATE OR ALTER PROCEDURE sp_CompleteTasks
+    @user_id INT,
+    @task_ids NVARCHAR(MAX),
+    @is_completed BIT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    DECLARE @now DATETIME2 = GETUTCDATE();
+    DECLARE @ids TABLE (id INT PRIMARY KEY, parent_task_id INT NULL, root_task_id INT NULL);
+    
+    INSERT INTO @ids (id, parent_task_id, root_task_id)
+    SELECT DISTINCT t.id, t.parent_task_id, t.root_task_id
+    FROM OPENJSON(@task_ids) WITH (id INT '$') j
+    INNER JOIN Tasks t ON t.id = j.id
+    WHERE t.user_id = @user_id AND t.is_deleted = 0;
+    
+    BEGIN TRANSACTION;
+    
+    UPDATE t
+    SET is_completed = @is_completed,
+        completed_at = CASE WHEN @is_completed = 1 THEN @now ELSE NULL END,
+        updated_at = @now
+    FROM Tasks t
+    INNER JOIN @ids i ON i.id = t.id;
+    
+    IF @is_completed = 1
+    BEGIN
+        -- Auto-complete parents whose children are now all complete
+        UPDATE p
+        SET is_completed = 1, completed_at = @now, updated_at = @now
+        FROM Tasks p
+        WHERE p.id IN (SELECT parent_task_id FROM @ids WHERE parent_task_id IS NOT NULL)
+          AND p.is_completed = 0
+          AND NOT EXISTS (
+              SELECT 1 FROM Tasks c 
+              WHERE c.parent_task_id = p.id AND c.is_completed = 0 AND c.is_deleted = 0
+          );
+    END
+    ELSE
+    BEGIN
+        -- Uncomplete every parent chain: each task's parent and root
+        UPDATE Tasks 
+        SET is_completed = 0, completed_at = NULL, updated_at = @now
+        WHERE id IN (
+                SELECT parent_task_id FROM @ids WHERE parent_task_id IS NOT NULL
+                UNION
+                SELECT root_task_id FROM @ids WHERE root_task_id IS NOT NULL
+            )
+          AND is_completed = 1;
+    END
+    
+    COMMIT TRANSACTION;
+    
+    SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+           t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+           t.created_at, t.updated_at, t.completed_at, t.is_deleted
+    FROM Tasks t
+    INNER JOIN @ids i ON i.id = t.id
+    ORDER BY t.order_index, t.id;
+END
+GO
+
+-- Move many tasks (and their descendants) to a tab
+CREATE OR ALTER PROCEDURE sp_MoveTasks
+    @user_id INT,
+    @task_ids NVARCHAR(MAX),
+    @new_tab_id INT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    DECLARE @now DATETIME2 = GETUTCDATE();
+    DECLARE @ids TABLE (id INT PRIMARY KEY);
+    
+    -- Only into one of the user's own tabs
+    IF NOT EXISTS (SELECT 1 FROM Tabs WHERE id = @new_tab_id AND user_id = @user_id AND is_deleted = 0)
+    BEGIN
+        SELECT TOP 0 id, client_id, user_id, tab_id, parent_task_id, title, description,
+               is_completed, due_date, due_time, depth, order_index,
+               created_at, updated_at, completed_at, is_deleted
+        FROM Tasks;
+        RETURN;
+    END
+    
+    INSERT INTO @ids (id)
+    SELECT DISTINCT t.id
+    FROM OPENJSON(@task_ids) WITH (id INT '$') j
+    INNER JOIN Tasks t ON t.id = j.id
+    WHERE t.user_id = @user_id AND t.is_deleted = 0;
+    
+    UPDATE Tasks 
+    SET tab_id = @new_tab_id, updated_at = @now
+    WHERE id IN (
+        SELECT id FROM @ids
+        UNION
+        SELECT t.id FROM @ids i INNER JOIN Tasks t ON t.root_task_id = i.id
+        UNION
+        SELECT t.id FROM @ids i INNER JOIN Tasks t ON t.parent_task_id = i.id
+    );
+    
+    SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+           t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+           t.created_at, t.updated_at, t.completed_at, t.is_deleted
+    FROM Tasks t
+    INNER JOIN @ids i ON i.id = t.id
+    ORDER BY t.order_index, t.id;
+END
+GO
+
+-- Delete many tasks and all their descendants (soft delete)
+CREATE OR ALTER PROCEDURE sp_DeleteTasks
+    @user_id INT,
+    @task_ids NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    ;WITH Selected AS (
+        SELECT t.id 
+        FROM OPENJSON(@task_ids) WITH (id INT '$') j
+        INNER JOIN Tasks t ON t.id = j.id
+        WHERE t.user_id = @user_id
+    )
+    UPDATE Tasks 
+    SET is_deleted = 1, updated_at = GETUTCDATE()
+    WHERE id IN (
+            SELECT id FROM Selected
+            UNION
+            SELECT t.id FROM Selected s INNER JOIN Tasks t ON t.root_task_id = s.id
+            UNION
+            SELECT t.id FROM Selected s INNER JOIN Tasks t ON t.parent_task_id = s.id
+        )
+      AND is_deleted = 0;
+    
+    SELECT @@ROWCOUNT AS affected_rows;
+END
+GO
+
+-- Reorder tasks: @task_ids in the desired order get order_index 1, 2, 3, ...
+CREATE OR ALTER PROCEDURE sp_ReorderTasks
+    @user_id INT,
+    @task_ids NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    UPDATE t
+    SET order_index = CAST(j.[key] AS INT) + 1, updated_at = GETUTCDATE()
+    FROM Tasks t
+    INNER JOIN OPENJSON(@task_ids) j ON t.id = TRY_CAST(j.[value] AS INT)
+    WHERE t.user_id = @user_id AND t.is_deleted = 0 AND t.order_index <> CAST(j.[key] AS INT) + 1;
+    
+    SELECT @@ROWCOUNT AS affected_rows;
+END
+GO
+
+-- =============================================
+-- TASK SEARCH
+-- =============================================
+
+-- The word every TaskSearch row of a user starts with: 'zzu' + the user id spelled in letters
+-- (42 -> 'zzuec'), so the word breaker keeps it whole and no other user's token matches it.
+CREATE OR ALTER FUNCTION fn_TaskSearchUserToken(@user_id INT)
+RETURNS NVARCHAR(16)
+WITH SCHEMABINDING
+AS
+BEGIN
+    RETURN N'zzu' + TRANSLATE(CAST(@user_id AS NVARCHAR(11)), N'0123456789', N'abcdefghij');
+END
+GO
+
+-- Keep TaskSearch (full-text indexed, see schema.sql) in step with task titles and descriptions.
+-- Soft-deleted tasks stay indexed (sp_SearchTasks filters them); hard deletes cascade.
+CREATE OR ALTER TRIGGER trg_Tasks_Search ON Tasks
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT (UPDATE(title) OR UPDATE(description)) RETURN;
+    
+    MERGE TaskSearch AS s
+    USING (
+        SELECT i.id,
+               CONCAT(dbo.fn_TaskSearchUserToken(i.user_id), N' ', i.title) AS title,
+               CONCAT(dbo.fn_TaskSearchUserToken(i.user_id), N' ', i.title, NCHAR(10), i.description) AS search_text
+        FROM inserted i
+        LEFT JOIN deleted d ON d.id = i.id
+        WHERE d.id IS NULL
+           OR EXISTS (SELECT i.title, i.description EXCEPT SELECT d.title, d.description)
+    ) AS src
+    ON s.task_id = src.id
+    WHEN MATCHED THEN
+        UPDATE SET title = src.title, search_text = src.search_text
+    WHEN NOT MATCHED THEN
+        INSERT (task_id, title, search_text) VALUES (src.id, src.title, src.search_text);
+END
+GO
+
+-- Search a user's live tasks by title and description.
+-- @terms is a non-empty JSON array of words; every word must match, as a prefix ("plan" finds "planning"),
+-- in the title or the description. Ranked by full-text rank, boosted when all the words are in
+-- the title; ties go to open, then recently updated tasks. Filters are optional (due dates are
+-- inclusive). Returns rows @offset .. @offset + @limit - 1, each with score and total_count.
+-- The user's token is part of the full-text condition, so the engine intersects with the user's
+-- rows itself instead of ranking every user's matches first. A word that is a prefix of the
+-- token ("z", "zzu") would match all of the user's tasks, so such words are checked on the
+-- task text instead (as a substring).
+CREATE OR ALTER PROCEDURE sp_SearchTasks
+    @user_id INT,
+    @terms NVARCHAR(MAX),
+    @tab_id INT = NULL,
+    @is_completed BIT = NULL,
+    @due_from DATE = NULL,
+    @due_to DATE = NULL,
+    @offset INT = 0,
+    @limit INT = 50
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @user_token NVARCHAR(16) = dbo.fn_TaskSearchUserToken(@user_id);
+    
+    -- The caller sends words only; quotes are stripped regardless
+    DECLARE @words TABLE (word NVARCHAR(4000) NOT NULL, matches_token BIT NOT NULL);
+    INSERT INTO @words (word, matches_token)
+    SELECT w.word, CASE WHEN LEFT(@user_token, LEN(w.word)) = w.word THEN 1 ELSE 0 END
+    FROM OPENJSON(@terms) j
+    CROSS APPLY (SELECT REPLACE(j.[value], N'"', N'') AS word) w
+    WHERE LEN(w.word) > 0;
+    
+    -- '"zzuec" AND "plan*" AND "trip*"'
+    DECLARE @condition NVARCHAR(4000) = CONCAT(N'"', @user_token, N'"', (
+        SELECT STRING_AGG(CAST(N' AND "' + word + N'*"' AS NVARCHAR(MAX)), N'')
+        FROM @words
+        WHERE matches_token = 0
+    ));
+    
+    SELECT t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title, t.description,
+           t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+           t.created_at, t.updated_at, t.completed_at, t.is_deleted,
+           CAST(m.[RANK] + 2 * ISNULL(tm.[RANK], 0) AS FLOAT) AS score,
+           COUNT(*) OVER () AS total_count
+    FROM CONTAINSTABLE(TaskSearch, search_text, @condition) m
+    INNER JOIN Tasks t ON t.id = m.[KEY]
+    LEFT JOIN CONTAINSTABLE(TaskSearch, title, @condition) tm ON tm.[KEY] = m.[KEY]
+    WHERE t.user_id = @user_id
+      AND t.is_deleted = 0
+      AND (@tab_id IS NULL OR t.tab_id = @tab_id)
+      AND (@is_completed IS NULL OR t.is_completed = @is_completed)
+      AND (@due_from IS NULL OR t.due_date >= @due_from)
+      AND (@due_to IS NULL OR t.due_date <= @due_to)
+      AND NOT EXISTS (
+          SELECT 1 FROM @words w
+          WHERE w.matches_token = 1
+            AND CONCAT(t.title, N' ', t.description) NOT LIKE N'%' + REPLACE(w.word, N'_', N'[_]') + N'%'
+      )
+    ORDER BY score DESC, t.is_completed, t.updated_at DESC, t.id
+    OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY
+    OPTION (RECOMPILE);
+END
+GO
+
+-- =============================================
+-- FIELD CHANGE TRACKING (delta sync)
+-- =============================================
+
+-- Record which synced fields each insert/update changed (NULL-safe comparison via EXCEPT)
+CREATE OR ALTER TRIGGER trg_Tabs_FieldVersions ON Tabs
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT EXISTS (SELECT 1 FROM inserted) RETURN;
+    
+    MERGE FieldVersions AS fv
+    USING (
+        SELECT i.id AS entity_id, c.field_name, CAST(i.change_seq AS BIGINT) AS change_seq
+        FROM inserted i
+        LEFT JOIN deleted d ON d.id = i.id
+        CROSS APPLY (VALUES
+            ('name', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.name EXCEPT SELECT d.name) THEN 1 END),
+            ('order_index', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.order_index EXCEPT SELECT d.order_index) THEN 1 END),
+            ('is_system', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.is_system EXCEPT SELECT d.is_system) THEN 1 END),
+            ('tab_type', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.tab_type EXCEPT SELECT d.tab_type) THEN 1 END),
+            ('created_at', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.created_at EXCEPT SELECT d.created_at) THEN 1 END),
+            ('is_deleted', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.is_deleted EXCEPT SELECT d.is_deleted) THEN 1 END)
+        ) c(field_name, changed)
+        WHERE c.changed = 1
+    ) AS src
+    ON fv.entity_type = 'tab' AND fv.entity_id = src.entity_id AND fv.field_name = src.field_name
+    WHEN MATCHED THEN
+        UPDATE SET change_seq = src.change_seq
+    WHEN NOT MATCHED THEN
+        INSERT (entity_type, entity_id, field_name, change_seq)
+        VALUES ('tab', src.entity_id, src.field_name, src.change_seq);
+END
+GO
+
+CREATE OR ALTER TRIGGER trg_Tasks_FieldVersions ON Tasks
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT EXISTS (SELECT 1 FROM inserted) RETURN;
+    
+    MERGE FieldVersions AS fv
+    USING (
+        SELECT i.id AS entity_id, c.field_name, CAST(i.change_seq AS BIGINT) AS change_seq
+        FROM inserted i
+        LEFT JOIN deleted d ON d.id = i.id
+        CROSS APPLY (VALUES
+            ('tab_id', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.tab_id EXCEPT SELECT d.tab_id) THEN 1 END),
+            ('parent_task_id', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.parent_task_id EXCEPT SELECT d.parent_task_id) THEN 1 END),
+            ('title', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.title EXCEPT SELECT d.title) THEN 1 END),
+            ('description', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.description EXCEPT SELECT d.description) THEN 1 END),
+            ('is_completed', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.is_completed EXCEPT SELECT d.is_completed) THEN 1 END),
+            ('due_date', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.due_date EXCEPT SELECT d.due_date) THEN 1 END),
+            ('due_time', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.due_time EXCEPT SELECT d.due_time) THEN 1 END),
+            ('depth', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.depth EXCEPT SELECT d.depth) THEN 1 END),
+            ('order_index', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.order_index EXCEPT SELECT d.order_index) THEN 1 END),
+            ('created_at', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.created_at EXCEPT SELECT d.created_at) THEN 1 END),
+            ('completed_at', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.completed_at EXCEPT SELECT d.completed_at) THEN 1 END),
+            ('is_deleted', CASE WHEN d.id IS NULL OR EXISTS (SELECT i.is_deleted EXCEPT SELECT d.is_deleted) THEN 1 END)
+        ) c(field_name, changed)
+        WHERE c.changed = 1
+    ) AS src
+    ON fv.entity_type = 'task' AND fv.entity_id = src.entity_id AND fv.field_name = src.field_name
+    WHEN MATCHED THEN
+        UPDATE SET change_seq = src.change_seq
+    WHEN NOT MATCHED THEN
+        INSERT (entity_type, entity_id, field_name, change_seq)
+        VALUES ('task', src.entity_id, src.field_name, src.change_seq);
+END
+GO
+
 -- =============================================
 -- SYNC PROCEDURES
 -- =============================================
@@ -500,6 +880,8 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
+    DECLARE @items_synced INT;
+    
     -- If no last_sync, return all data
     IF @last_sync_at IS NULL
         SET @last_sync_at = '1900-01-01';
@@ -511,6 +893,8 @@ BEGIN
     FROM Tabs 
     WHERE user_id = @user_id AND updated_at > @last_sync_at;
     
+    SET @items_synced = @@ROWCOUNT;
+    
     -- Get changed tasks
     SELECT id, client_id, user_id, tab_id, parent_task_id, title, description,
            is_completed, due_date, due_time, depth, order_index,
@@ -519,58 +903,667 @@ BEGIN
     FROM Tasks 
     WHERE user_id = @user_id AND updated_at > @last_sync_at;
     
-    -- Log the sync
+    SET @items_synced = @items_synced + @@ROWCOUNT;
+    
+    -- Log the sync (counted from the rows returned, no second scan)
     INSERT INTO SyncLog (user_id, device_id, last_sync_at, sync_type, items_synced)
-    VALUES (@user_id, @device_id, GETUTCDATE(), 'pull', 
-            (SELECT COUNT(*) FROM Tabs WHERE user_id = @user_id AND updated_at > @last_sync_at) +
-            (SELECT COUNT(*) FROM Tasks WHERE user_id = @user_id AND updated_at > @last_sync_at));
+    VALUES (@user_id, @device_id, GETUTCDATE(), 'pull', @items_synced);
 END
 GO
 
--- Push changes from client (with conflict detection)
-CREATE OR ALTER PROCEDURE sp_SyncPush
+-- Pull one page of changes, keyset-paginated on (updated_at, id).
+-- Tabs are streamed first, then tasks; a page that finishes the tabs is topped up with tasks.
+-- Each result set returns up to one row more than it may use, so the caller can tell whether
+-- more rows follow. cursor_updated_at keeps full DATETIME2 precision for the next cursor.
+CREATE OR ALTER PROCEDURE sp_SyncPullPage
     @user_id INT,
     @device_id NVARCHAR(255),
-    @client_id NVARCHAR(36),
-    @entity_type NVARCHAR(50),  -- 'tab' or 'task'
-    @data NVARCHAR(MAX),        -- JSON data
-    @client_updated_at DATETIME2
+    @last_sync_at DATETIME2 = NULL,
+    @entity_type NVARCHAR(50) = 'tab',      -- stream the cursor points into: 'tab' or 'task'
+    @after_updated_at DATETIME2 = NULL,     -- cursor position (exclusive), NULL = start of stream
+    @after_id INT = NULL,
+    @page_size INT = 500
 AS
 BEGIN
     SET NOCOUNT ON;
     
-    DECLARE @server_updated_at DATETIME2;
-    DECLARE @has_conflict BIT = 0;
-    DECLARE @entity_id INT;
+    DECLARE @tab_count INT = 0;
+    DECLARE @task_count INT;
+    DECLARE @task_limit INT;
+    DECLARE @lower DATETIME2;
+    DECLARE @lower_id INT;
+    
+    -- If no last_sync, return all data
+    IF @last_sync_at IS NULL
+        SET @last_sync_at = '1900-01-01';
+    
+    -- Rows strictly after (@lower, @lower_id); with no cursor only updated_at > @last_sync_at counts
+    SET @lower = COALESCE(@after_updated_at, @last_sync_at);
+    SET @lower_id = CASE WHEN @after_updated_at IS NULL THEN 2147483647 ELSE @after_id END;
+    
+    CREATE TABLE #TabPage (
+        id INT, client_id NVARCHAR(36), user_id INT, name NVARCHAR(255), order_index INT,
+        is_system BIT, tab_type NVARCHAR(50), created_at DATETIME2, updated_at DATETIME2,
+        is_deleted BIT, cursor_updated_at NVARCHAR(33)
+    );
     
-    -- Check for conflicts
     IF @entity_type = 'tab'
     BEGIN
-        SELECT @server_updated_at = updated_at, @entity_id = id
+        INSERT INTO #TabPage
+        SELECT TOP (@page_size + 1)
+               id, client_id, user_id, name, order_index, is_system, tab_type,
+               created_at, updated_at, is_deleted,
+               CONVERT(NVARCHAR(33), updated_at, 126)
         FROM Tabs 
-        WHERE client_id = @client_id AND user_id = @user_id;
-    END
-    ELSE IF @entity_type = 'task'
-    BEGIN
-        SELECT @server_updated_at = updated_at, @entity_id = id
-        FROM Tasks 
-        WHERE client_id = @client_id AND user_id = @user_id;
+        WHERE user_id = @user_id 
+          AND updated_at >= @lower
+          AND (updated_at > @lower OR id > @lower_id)
+        ORDER BY updated_at, id;
+        
+        SET @tab_count = @@ROWCOUNT;
+        
+        -- Tasks stream starts from the beginning
+        SET @lower = @last_sync_at;
+        SET @lower_id = 2147483647;
     END
     
-    -- Detect conflict (server was modified after client's version)
-    IF @server_updated_at IS NOT NULL AND @server_updated_at > @client_updated_at
+    SELECT id, client_id, user_id, name, order_index, is_system, tab_type, 
+           created_at, updated_at, is_deleted, cursor_updated_at,
+           'tab' AS entity_type
+    FROM #TabPage
+    ORDER BY updated_at, id;
+    
+    -- Fill the rest of the page with tasks (one probe row even if the page is full)
+    SET @task_limit = CASE WHEN @tab_count > @page_size THEN 0 ELSE @page_size - @tab_count + 1 END;
+    
+    SELECT TOP (@task_limit)
+           id, client_id, user_id, tab_id, parent_task_id, title, description,
+           is_completed, due_date, due_time, depth, order_index,
+           created_at, updated_at, completed_at, is_deleted,
+           CONVERT(NVARCHAR(33), updated_at, 126) AS cursor_updated_at,
+           'task' AS entity_type
+    FROM Tasks 
+    WHERE user_id = @user_id 
+      AND updated_at >= @lower
+      AND (updated_at > @lower OR id > @lower_id)
+    ORDER BY updated_at, id;
+    
+    SET @task_count = @@ROWCOUNT;
+    
+    -- Log the page (probe rows excluded)
+    INSERT INTO SyncLog (user_id, device_id, last_sync_at, sync_type, items_synced)
+    VALUES (@user_id, @device_id, GETUTCDATE(), 'pull', 
+            CASE WHEN @tab_count > @page_size THEN @page_size 
+                 WHEN @task_count >= @task_limit THEN @tab_count + @task_limit - 1
+                 ELSE @tab_count + @task_count 
+            END);
+    
+    DROP TABLE #TabPage;
+END
+GO
+
+-- Pull changes after a change-sequence token (Tabs/Tasks.change_seq, a ROWVERSION).
+-- Result sets: 1) high-water mark, 2) tabs, 3) tasks - each stream ordered by change_seq
+-- with up to @page_size + 1 rows; the caller merges both streams and keeps the first @page_size
+-- (anything left over means there is another page).
+-- Only rows below MIN_ACTIVE_ROWVERSION() are returned, so a change still being written
+-- by an open transaction can't be skipped by a token that has already moved past it.
+CREATE OR ALTER PROCEDURE sp_SyncPullSince
+    @user_id INT,
+    @device_id NVARCHAR(255),
+    @since_seq BIGINT = 0,
+    @page_size INT = 500,
+    @delta BIT = 0              -- Also return changed_fields (fields changed after @since_seq)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @since BINARY(8) = CAST(@since_seq AS BINARY(8));
+    DECLARE @upper BINARY(8) = MIN_ACTIVE_ROWVERSION();
+    DECLARE @tab_count INT;
+    DECLARE @task_count INT;
+    
+    -- Everything below this has been returned once the caller has no more pages
+    SELECT CAST(@upper AS BIGINT) - 1 AS max_seq;
+    
+    SELECT TOP (@page_size + 1)
+           t.id, t.client_id, t.user_id, t.name, t.order_index, t.is_system, t.tab_type, 
+           t.created_at, t.updated_at, t.is_deleted,
+           CAST(t.change_seq AS BIGINT) AS change_seq,
+           'tab' AS entity_type,
+           cf.changed_fields
+    FROM Tabs t
+    OUTER APPLY (
+        SELECT STRING_AGG(fv.field_name, ',') AS changed_fields
+        FROM FieldVersions fv
+        WHERE @delta = 1 AND fv.entity_type = 'tab' AND fv.entity_id = t.id AND fv.change_seq > @since_seq
+    ) cf
+    WHERE t.user_id = @user_id AND t.change_seq > @since AND t.change_seq < @upper
+    ORDER BY t.change_seq;
+    
+    SET @tab_count = @@ROWCOUNT;
+    
+    SELECT TOP (@page_size + 1)
+           t.id, t.client_id, t.user_id, t.tab_id, t.parent_task_id, t.title,
+           -- Delta pulls leave an unchanged description (NVARCHAR(MAX)) in the database
+           CASE WHEN @delta = 0 OR ',' + cf.changed_fields + ',' LIKE '%,description,%' 
+                THEN t.description END AS description,
+           t.is_completed, t.due_date, t.due_time, t.depth, t.order_index,
+           t.created_at, t.updated_at, t.completed_at, t.is_deleted,
+           CAST(t.change_seq AS BIGINT) AS change_seq,
+           'task' AS entity_type,
+           cf.changed_fields
+    FROM Tasks t
+    OUTER APPLY (
+        SELECT STRING_AGG(fv.field_name, ',') AS changed_fields
+        FROM FieldVersions fv
+        WHERE @delta = 1 AND fv.entity_type = 'task' AND fv.entity_id = t.id AND fv.change_seq > @since_seq
+    ) cf
+    WHERE t.user_id = @user_id AND t.change_seq > @since AND t.change_seq < @upper
+    ORDER BY t.change_seq;
+    
+    SET @task_count = @@ROWCOUNT;
+    
+    -- Log the sync (rows the caller keeps: at most one page)
+    INSERT INTO SyncLog (user_id, device_id, last_sync_at, sync_type, items_synced)
+    VALUES (@user_id, @device_id, GETUTCDATE(), 'pull', 
+            CASE WHEN @tab_count + @task_count > @page_size THEN @page_size ELSE @tab_count + @task_count END);
+END
+GO
+
+-- Apply pushed items staged in #SyncItems (created by the caller, see sp_SyncPush).
+-- Upserts Tabs/Tasks by client_id and sets status on every row:
+--   'applied'  - written, or already applied earlier with the same client_updated_at
+--   'conflict' - server row changed after client_updated_at (not checked when @force = 1); with
+--                base_seq set, only if a field in the payload changed after base_seq
+--                (conflict_fields lists them) - other fields merge
+--   'rejected' - invalid payload, unknown reference, read-only tab or depth limit (see reason)
+-- Payload keys: tabs - name, order_index, is_deleted
+--               tasks - title, description, is_completed, due_date, due_time, tab_id, parent_task_id,
+--                       order_index, is_deleted; tab_client_id / parent_client_id may be sent
+--                       instead of tab_id / parent_task_id for rows created offline.
+-- Absent keys keep the current value, so the payload may be a partial patch.
+CREATE OR ALTER PROCEDURE sp_SyncApplyItems
+    @user_id INT,
+    @force BIT = 0
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @now DATETIME2 = GETUTCDATE();
+    DECLARE @pass INT = 0;
+    
+    -- The last item for an entity wins; earlier ones copy its status at the end
+    UPDATE s SET status = 'superseded'
+    FROM #SyncItems s
+    WHERE EXISTS (
+        SELECT 1 FROM #SyncItems l
+        WHERE l.entity_type = s.entity_type AND l.client_id = s.client_id AND l.item_index > s.item_index
+    );
+    
+    UPDATE #SyncItems SET status = 'rejected', reason = 'unknown_entity_type'
+    WHERE status IS NULL AND entity_type NOT IN ('tab', 'task');
+    
+    UPDATE #SyncItems SET status = 'rejected', reason = 'invalid_json'
+    WHERE status IS NULL AND data IS NOT NULL AND ISJSON(data) = 0;
+    
+    -- Flatten payloads once; has_* tells an absent key apart from an explicit null
+    CREATE TABLE #Fields (
+        item_index INT PRIMARY KEY,
+        has_name BIT, name NVARCHAR(MAX),
+        has_title BIT, title NVARCHAR(MAX),
+        has_description BIT, description NVARCHAR(MAX),
+        has_is_completed BIT, is_completed BIT,
+        has_due_date BIT, due_date DATE,
+        has_due_time BIT, due_time TIME,
+        has_tab_id BIT, tab_id INT,
+        has_parent_task_id BIT, parent_task_id INT,
+        tab_client_id NVARCHAR(36),
+        parent_client_id NVARCHAR(36),
+        has_order_index BIT, order_index INT,
+        has_is_deleted BIT, is_deleted BIT,
+        is_valid BIT NOT NULL
+    );
+    
+    INSERT INTO #Fields
+    SELECT r.item_index,
+           r.has_name, r.name,
+           r.has_title, r.title,
+           r.has_description, r.description,
+           r.has_is_completed, TRY_CAST(r.is_completed AS BIT),
+           r.has_due_date, TRY_CAST(r.due_date AS DATE),
+           r.has_due_time, TRY_CAST(r.due_time AS TIME),
+           r.has_tab_id, TRY_CAST(r.tab_id AS INT),
+           r.has_parent_task_id, TRY_CAST(r.parent_task_id AS INT),
+           r.tab_client_id, r.parent_client_id,
+           r.has_order_index, TRY_CAST(r.order_index AS INT),
+           r.has_is_deleted, TRY_CAST(r.is_deleted AS BIT),
+           CASE WHEN (r.is_completed IS NOT NULL AND TRY_CAST(r.is_completed AS BIT) IS NULL)
+                  OR (r.due_date IS NOT NULL AND TRY_CAST(r.due_date AS DATE) IS NULL)
+                  OR (r.due_time IS NOT NULL AND TRY_CAST(r.due_time AS TIME) IS NULL)
+                  OR (r.tab_id IS NOT NULL AND TRY_CAST(r.tab_id AS INT) IS NULL)
+                  OR (r.parent_task_id IS NOT NULL AND TRY_CAST(r.parent_task_id AS INT) IS NULL)
+                  OR (r.order_index IS NOT NULL AND TRY_CAST(r.order_index AS INT) IS NULL)
+                  OR (r.is_deleted IS NOT NULL AND TRY_CAST(r.is_deleted AS BIT) IS NULL)
+                  OR LEN(r.name) > 255
+                  OR LEN(r.title) > 1000
+                  OR LEN(r.tab_client_id) > 36
+                  OR LEN(r.parent_client_id) > 36
+                THEN 0 ELSE 1 END
+    FROM (
+        SELECT s.item_index,
+               MAX(CASE WHEN j.[key] = 'name' THEN 1 ELSE 0 END) AS has_name,
+               MAX(CASE WHEN j.[key] = 'name' THEN j.[value] END) AS name,
+               MAX(CASE WHEN j.[key] = 'title' THEN 1 ELSE 0 END) AS has_title,
+               MAX(CASE WHEN j.[key] = 'title' THEN j.[value] END) AS title,
+               MAX(CASE WHEN j.[key] = 'description' THEN 1 ELSE 0 END) AS has_description,
+               MAX(CASE WHEN j.[key] = 'description' THEN j.[value] END) AS description,
+               MAX(CASE WHEN j.[key] = 'is_completed' THEN 1 ELSE 0 END) AS has_is_completed,
+               MAX(CASE WHEN j.[key] = 'is_completed' THEN j.[value] END) AS is_completed,
+               MAX(CASE WHEN j.[key] = 'due_date' THEN 1 ELSE 0 END) AS has_due_date,
+               MAX(CASE WHEN j.[key] = 'due_date' THEN j.[value] END) AS due_date,
+               MAX(CASE WHEN j.[key] = 'due_time' THEN 1 ELSE 0 END) AS has_due_time,
+               MAX(CASE WHEN j.[key] = 'due_time' THEN j.[value] END) AS due_time,
+               MAX(CASE WHEN j.[key] = 'tab_id' THEN 1 ELSE 0 END) AS has_tab_id,
+               MAX(CASE WHEN j.[key] = 'tab_id' THEN j.[value] END) AS tab_id,
+               MAX(CASE WHEN j.[key] = 'parent_task_id' THEN 1 ELSE 0 END) AS has_parent_task_id,
+               MAX(CASE WHEN j.[key] = 'parent_task_id' THEN j.[value] END) AS parent_task_id,
+               MAX(CASE WHEN j.[key] = 'tab_client_id' THEN j.[value] END) AS tab_client_id,
+               MAX(CASE WHEN j.[key] = 'parent_client_id' THEN j.[value] END) AS parent_client_id,
+               MAX(CASE WHEN j.[key] = 'order_index' THEN 1 ELSE 0 END) AS has_order_index,
+               MAX(CASE WHEN j.[key] = 'order_index' THEN j.[value] END) AS order_index,
+               MAX(CASE WHEN j.[key] = 'is_deleted' THEN 1 ELSE 0 END) AS has_is_deleted,
+               MAX(CASE WHEN j.[key] = 'is_deleted' THEN j.[value] END) AS is_deleted
+        FROM #SyncItems s
+        OUTER APPLY OPENJSON(CASE WHEN ISJSON(s.data) = 1 THEN s.data END) j
+        WHERE s.status IS NULL
+        GROUP BY s.item_index
+    ) r;
+    
+    UPDATE s SET status = 'rejected', reason = 'invalid_data'
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL AND f.is_valid = 0;
+    
+    -- Per-field conflicts: payload keys the server changed after the patch's base_seq
+    UPDATE s SET conflict_fields = c.fields
+    FROM #SyncItems s
+    LEFT JOIN Tabs tb ON s.entity_type = 'tab' AND tb.client_id = s.client_id AND tb.user_id = @user_id
+    LEFT JOIN Tasks tk ON s.entity_type = 'task' AND tk.client_id = s.client_id AND tk.user_id = @user_id
+    CROSS APPLY (
+        SELECT STRING_AGG(fv.field_name, ',') AS fields
+        FROM OPENJSON(s.data) j
+        INNER JOIN FieldVersions fv 
+            ON fv.entity_type = s.entity_type 
+           AND fv.entity_id = COALESCE(tb.id, tk.id)
+           AND fv.field_name = CASE j.[key] 
+                                   WHEN 'tab_client_id' THEN 'tab_id' 
+                                   WHEN 'parent_client_id' THEN 'parent_task_id' 
+                                   ELSE j.[key] 
+                               END
+        WHERE fv.change_seq > s.base_seq
+    ) c
+    WHERE s.status IS NULL AND s.base_seq IS NOT NULL AND @force = 0;
+    
+    -- Locate existing rows (client_id is unique across all users) and classify them
+    UPDATE s 
+    SET entity_id = CASE WHEN t.user_id = @user_id THEN t.id END,
+        server_updated_at = CASE WHEN t.user_id = @user_id THEN t.updated_at END,
+        status = CASE 
+            WHEN t.user_id <> @user_id THEN 'rejected'
+            WHEN t.last_client_updated_at = s.client_updated_at THEN 'applied'
+            WHEN @force = 0 AND s.base_seq IS NULL AND t.updated_at > s.client_updated_at THEN 'conflict'
+            WHEN s.conflict_fields IS NOT NULL THEN 'conflict'
+            WHEN t.is_system = 1 THEN 'rejected'
+        END,
+        reason = CASE 
+            WHEN t.user_id <> @user_id THEN 'not_owner'
+            WHEN t.last_client_updated_at = s.client_updated_at THEN 'duplicate'
+            WHEN @force = 0 AND s.base_seq IS NULL AND t.updated_at > s.client_updated_at THEN NULL
+            WHEN s.conflict_fields IS NOT NULL THEN NULL
+            WHEN t.is_system = 1 THEN 'system_tab'
+        END
+    FROM #SyncItems s
+    INNER JOIN Tabs t ON t.client_id = s.client_id
+    WHERE s.status IS NULL AND s.entity_type = 'tab';
+    
+    UPDATE s 
+    SET entity_id = CASE WHEN t.user_id = @user_id THEN t.id END,
+        server_updated_at = CASE WHEN t.user_id = @user_id THEN t.updated_at END,
+        status = CASE 
+            WHEN t.user_id <> @user_id THEN 'rejected'
+            WHEN t.last_client_updated_at = s.client_updated_at THEN 'applied'
+            WHEN @force = 0 AND s.base_seq IS NULL AND t.updated_at > s.client_updated_at THEN 'conflict'
+            WHEN s.conflict_fields IS NOT NULL THEN 'conflict'
+        END,
+        reason = CASE 
+            WHEN t.user_id <> @user_id THEN 'not_owner'
+            WHEN t.last_client_updated_at = s.client_updated_at THEN 'duplicate'
+        END
+    FROM #SyncItems s
+    INNER JOIN Tasks t ON t.client_id = s.client_id
+    WHERE s.status IS NULL AND s.entity_type = 'task';
+    
+    -- ---------------------------------------------
+    -- Tabs
+    -- ---------------------------------------------
+    UPDATE s SET status = 'rejected', reason = 'missing_name'
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL AND s.entity_type = 'tab' AND s.entity_id IS NULL
+      AND (f.name IS NULL OR LTRIM(RTRIM(f.name)) = '');
+    
+    UPDATE t
+    SET name = COALESCE(f.name, t.name),
+        order_index = COALESCE(f.order_index, t.order_index),
+        is_deleted = COALESCE(f.is_deleted, t.is_deleted),
+        last_client_updated_at = s.client_updated_at,
+        updated_at = @now
+    FROM Tabs t
+    INNER JOIN #SyncItems s ON s.entity_id = t.id AND s.entity_type = 'tab'
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL;
+    
+    -- Tasks of tabs deleted by this push move to no tab (as in sp_DeleteTab)
+    UPDATE k
+    SET tab_id = NULL, updated_at = @now
+    FROM Tasks k
+    INNER JOIN #SyncItems s ON s.entity_id = k.tab_id AND s.entity_type = 'tab'
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL AND f.is_deleted = 1;
+    
+    INSERT INTO Tabs (client_id, user_id, name, order_index, is_system, tab_type, is_deleted,
+                      last_client_updated_at, created_at, updated_at)
+    SELECT s.client_id, @user_id, f.name,
+           COALESCE(f.order_index, m.max_order + ROW_NUMBER() OVER (ORDER BY s.item_index)),
+           0, 'custom', COALESCE(f.is_deleted, 0), s.client_updated_at, @now, @now
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    CROSS APPLY (
+        SELECT ISNULL(MAX(order_index), 0) AS max_order 
+        FROM Tabs 
+        WHERE user_id = @user_id AND is_deleted = 0
+    ) m
+    WHERE s.status IS NULL AND s.entity_type = 'tab' AND s.entity_id IS NULL;
+    
+    UPDATE s SET status = 'applied', entity_id = t.id, server_updated_at = t.updated_at
+    FROM #SyncItems s
+    INNER JOIN Tabs t ON t.client_id = s.client_id
+    WHERE s.status IS NULL AND s.entity_type = 'tab';
+    
+    -- ---------------------------------------------
+    -- Tasks
+    -- ---------------------------------------------
+    
+    -- Resolve tab references sent by client_id (tabs from this push already exist)
+    UPDATE f SET tab_id = t.id, has_tab_id = 1
+    FROM #Fields f
+    INNER JOIN #SyncItems s ON s.item_index = f.item_index
+    INNER JOIN Tabs t ON t.client_id = f.tab_client_id AND t.user_id = @user_id
+    WHERE s.status IS NULL AND s.entity_type = 'task';
+    
+    UPDATE s SET status = 'rejected', reason = 'tab_not_found'
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL AND s.entity_type = 'task'
+      AND ((f.tab_client_id IS NOT NULL 
+            AND NOT EXISTS (SELECT 1 FROM Tabs t WHERE t.client_id = f.tab_client_id AND t.user_id = @user_id))
+        OR (f.tab_id IS NOT NULL 
+            AND NOT EXISTS (SELECT 1 FROM Tabs t WHERE t.id = f.tab_id AND t.user_id = @user_id)));
+    
+    UPDATE s SET status = 'rejected', reason = 'missing_title'
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    WHERE s.status IS NULL AND s.entity_type = 'task' AND s.entity_id IS NULL
+      AND (f.title IS NULL OR LTRIM(RTRIM(f.title)) = '');
+    
+    -- Insert new tasks level by level so children created offline can follow their parents
+    WHILE @pass < 3
     BEGIN
-        SET @has_conflict = 1;
+        UPDATE f SET parent_task_id = p.id, has_parent_task_id = 1
+        FROM #Fields f
+        INNER JOIN #SyncItems s ON s.item_index = f.item_index
+        INNER JOIN Tasks p ON p.client_id = f.parent_client_id AND p.user_id = @user_id
+        WHERE s.status IS NULL AND s.entity_type = 'task';
+        
+        INSERT INTO Tasks (client_id, user_id, tab_id, parent_task_id, root_task_id, title, description, 
+                           is_completed, due_date, due_time, depth, order_index, completed_at, is_deleted,
+                           last_client_updated_at, created_at, updated_at)
+        SELECT s.client_id, @user_id,
+               CASE WHEN f.has_tab_id = 1 THEN f.tab_id ELSE p.tab_id END,
+               f.parent_task_id, COALESCE(p.root_task_id, p.id), f.title, f.description, 
+               COALESCE(f.is_completed, 0),
+               f.due_date, f.due_time,
+               ISNULL(p.depth + 1, 0),
+               COALESCE(f.order_index, 
+                        ISNULL(o.max_order, 0) + ROW_NUMBER() OVER (PARTITION BY f.parent_task_id ORDER BY s.item_index)),
+               CASE WHEN f.is_completed = 1 THEN @now END,
+               COALESCE(f.is_deleted, 0), s.client_updated_at, @now, @now
+        FROM #SyncItems s
+        INNER JOIN #Fields f ON f.item_index = s.item_index
+        LEFT JOIN Tasks p ON p.id = f.parent_task_id AND p.user_id = @user_id
+        OUTER APPLY (
+            SELECT MAX(order_index) AS max_order 
+            FROM Tasks 
+            WHERE user_id = @user_id 
+              AND ISNULL(parent_task_id, 0) = ISNULL(f.parent_task_id, 0)
+              AND is_deleted = 0
+        ) o
+        WHERE s.status IS NULL AND s.entity_type = 'task' AND s.entity_id IS NULL
+          AND (f.parent_task_id IS NULL OR (p.id IS NOT NULL AND p.depth < 2))
+          AND (f.parent_client_id IS NULL OR p.client_id = f.parent_client_id);
+        
+        IF @@ROWCOUNT = 0 BREAK;
+        
+        UPDATE s SET status = 'applied', entity_id = t.id, server_updated_at = t.updated_at
+        FROM #SyncItems s
+        INNER JOIN Tasks t ON t.client_id = s.client_id
+        WHERE s.status IS NULL AND s.entity_type = 'task' AND s.entity_id IS NULL;
+        
+        SET @pass += 1;
     END
     
-    -- Return conflict info for client to resolve
+    UPDATE s 
+    SET status = 'rejected',
+        reason = CASE WHEN p.id IS NOT NULL AND p.depth >= 2 THEN 'max_depth' ELSE 'parent_not_found' END
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    LEFT JOIN Tasks p ON p.id = f.parent_task_id AND p.user_id = @user_id
+    WHERE s.status IS NULL AND s.entity_type = 'task' AND s.entity_id IS NULL;
+    
+    -- Re-parenting an existing task: only leaf tasks, within the depth limit
+    UPDATE s SET status = 'rejected', reason = r.reason
+    FROM #SyncItems s
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    INNER JOIN Tasks t ON t.id = s.entity_id
+    LEFT JOIN Tasks p ON p.id = f.parent_task_id AND p.user_id = @user_id
+    CROSS APPLY (
+        SELECT CASE 
+            WHEN f.parent_client_id IS NOT NULL AND (p.id IS NULL OR p.client_id <> f.parent_client_id) 
+                THEN 'parent_not_found'
+            WHEN ISNULL(f.parent_task_id, 0) = ISNULL(t.parent_task_id, 0) THEN NULL
+            WHEN f.parent_task_id = t.id THEN 'invalid_parent'
+            WHEN f.parent_task_id IS NOT NULL AND p.id IS NULL THEN 'parent_not_found'
+            WHEN p.depth >= 2 THEN 'max_depth'
+            WHEN EXISTS (SELECT 1 FROM Tasks c WHERE c.parent_task_id = t.id AND c.is_deleted = 0) 
+                THEN 'has_children'
+        END AS reason
+    ) r
+    WHERE s.status IS NULL AND s.entity_type = 'task'
+      AND (f.has_parent_task_id = 1 OR f.parent_client_id IS NOT NULL)
+      AND r.reason IS NOT NULL;
+    
+    UPDATE t
+    SET title = COALESCE(f.title, t.title),
+        description = CASE WHEN f.has_description = 1 THEN f.description ELSE t.description END,
+        is_completed = COALESCE(f.is_completed, t.is_completed),
+        completed_at = CASE 
+            WHEN f.is_completed = 1 AND t.is_completed = 0 THEN @now
+            WHEN f.is_completed = 0 THEN NULL
+            ELSE t.completed_at 
+        END,
+        due_date = CASE WHEN f.has_due_date = 1 THEN f.due_date ELSE t.due_date END,
+        due_time = CASE WHEN f.has_due_time = 1 THEN f.due_time ELSE t.due_time END,
+        tab_id = CASE WHEN f.has_tab_id = 1 THEN f.tab_id ELSE t.tab_id END,
+        parent_task_id = CASE WHEN f.has_parent_task_id = 1 THEN f.parent_task_id ELSE t.parent_task_id END,
+        depth = CASE WHEN f.has_parent_task_id = 1 THEN ISNULL(p.depth + 1, 0) ELSE t.depth END,
+        root_task_id = CASE WHEN f.has_parent_task_id = 1 THEN COALESCE(p.root_task_id, p.id) ELSE t.root_task_id END,
+        order_index = COALESCE(f.order_index, t.order_index),
+        is_deleted = COALESCE(f.is_deleted, t.is_deleted),
+        last_client_updated_at = s.client_updated_at,
+        updated_at = @now
+    FROM Tasks t
+    INNER JOIN #SyncItems s ON s.entity_id = t.id AND s.entity_type = 'task'
+    INNER JOIN #Fields f ON f.item_index = s.item_index
+    LEFT JOIN Tasks p ON p.id = f.parent_task_id AND p.user_id = @user_id
+    WHERE s.status IS NULL;
+    
+    -- Deleting a task deletes its descendants (as in sp_DeleteTask)
+    ;WITH Deleted AS (
+        SELECT s.entity_id AS id 
+        FROM #SyncItems s
+        INNER JOIN #Fields f ON f.item_index = s.item_index
+        WHERE s.status IS NULL AND s.entity_type = 'task' AND f.is_deleted = 1
+    )
+    UPDATE Tasks 
+    SET is_deleted = 1, updated_at = @now
+    WHERE id IN (
+            SELECT t.id FROM Deleted d INNER JOIN Tasks t ON t.root_task_id = d.id
+            UNION
+            SELECT t.id FROM Deleted d INNER JOIN Tasks t ON t.parent_task_id = d.id
+        )
+      AND is_deleted = 0;
+    
+    UPDATE #SyncItems SET status = 'applied', server_updated_at = @now
+    WHERE status IS NULL AND entity_type = 'task';
+    
+    -- Earlier duplicates report the outcome of the item that superseded them
+    UPDATE s 
+    SET status = w.status, 
+        reason = COALESCE(w.reason, 'superseded'), 
+        entity_id = w.entity_id, 
+        server_updated_at = w.server_updated_at
+    FROM #SyncItems s
+    CROSS APPLY (
+        SELECT TOP 1 l.status, l.reason, l.entity_id, l.server_updated_at
+        FROM #SyncItems l
+        WHERE l.entity_type = s.entity_type AND l.client_id = s.client_id
+        ORDER BY l.item_index DESC
+    ) w
+    WHERE s.status = 'superseded';
+    
+    DROP TABLE #Fields;
+END
+GO
+
+-- Push changes from client (apply with conflict detection)
+CREATE OR ALTER PROCEDURE sp_SyncPush
+    @user_id INT,
+    @device_id NVARCHAR(255),
+    @client_id NVARCHAR(36),
+    @entity_type NVARCHAR(50),  -- 'tab' or 'task'
+    @data NVARCHAR(MAX),        -- JSON data
+    @client_updated_at DATETIME2,
+    @base_seq BIGINT = NULL     -- change_seq the patch was made against (per-field conflicts)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    CREATE TABLE #SyncItems (
+        item_index INT PRIMARY KEY,
+        client_id NVARCHAR(36) NOT NULL,
+        entity_type NVARCHAR(50) NOT NULL,
+        data NVARCHAR(MAX) NULL,
+        client_updated_at DATETIME2 NOT NULL,
+        status NVARCHAR(20) NULL,
+        reason NVARCHAR(50) NULL,
+        entity_id INT NULL,
+        server_updated_at DATETIME2 NULL,
+        base_seq BIGINT NULL,
+        conflict_fields NVARCHAR(400) NULL
+    );
+    
+    INSERT INTO #SyncItems (item_index, client_id, entity_type, data, client_updated_at, base_seq)
+    VALUES (0, @client_id, @entity_type, @data, @client_updated_at, @base_seq);
+    
+    EXEC sp_SyncApplyItems @user_id = @user_id;
+    
+    -- Return per-item result for the client
     SELECT 
-        @has_conflict AS has_conflict,
-        @entity_id AS entity_id,
-        @client_id AS client_id,
-        @entity_type AS entity_type,
-        @server_updated_at AS server_updated_at,
-        @client_updated_at AS client_updated_at;
+        CAST(CASE WHEN s.status = 'conflict' THEN 1 ELSE 0 END AS BIT) AS has_conflict,
+        s.entity_id,
+        s.client_id,
+        s.entity_type,
+        s.server_updated_at,
+        s.client_updated_at,
+        s.status,
+        s.reason,
+        s.conflict_fields,
+        CAST(COALESCE(tb.change_seq, tk.change_seq) AS BIGINT) AS change_seq
+    FROM #SyncItems s
+    LEFT JOIN Tabs tb ON s.entity_type = 'tab' AND tb.id = s.entity_id
+    LEFT JOIN Tasks tk ON s.entity_type = 'task' AND tk.id = s.entity_id;
+END
+GO
+
+-- Push a batch of changes in one call (set-based apply and conflict detection)
+CREATE OR ALTER PROCEDURE sp_SyncPushBatch
+    @user_id INT,
+    @device_id NVARCHAR(255),
+    @items NVARCHAR(MAX)        -- JSON array: [{item_index, client_id, entity_type, data, client_updated_at, base_seq}]
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    CREATE TABLE #SyncItems (
+        item_index INT PRIMARY KEY,
+        client_id NVARCHAR(36) NOT NULL,
+        entity_type NVARCHAR(50) NOT NULL,
+        data NVARCHAR(MAX) NULL,
+        client_updated_at DATETIME2 NOT NULL,
+        status NVARCHAR(20) NULL,
+        reason NVARCHAR(50) NULL,
+        entity_id INT NULL,
+        server_updated_at DATETIME2 NULL,
+        base_seq BIGINT NULL,
+        conflict_fields NVARCHAR(400) NULL
+    );
+    
+    -- Parse the whole batch once (timestamps normalized to UTC)
+    INSERT INTO #SyncItems (item_index, client_id, entity_type, data, client_updated_at, base_seq)
+    SELECT item_index, client_id, entity_type, data,
+           CAST(SWITCHOFFSET(CAST(client_updated_at AS DATETIMEOFFSET), '+00:00') AS DATETIME2),
+           base_seq
+    FROM OPENJSON(@items)
+    WITH (
+        item_index INT '$.item_index',
+        client_id NVARCHAR(36) '$.client_id',
+        entity_type NVARCHAR(50) '$.entity_type',
+        data NVARCHAR(MAX) '$.data' AS JSON,
+        client_updated_at NVARCHAR(50) '$.client_updated_at',
+        base_seq BIGINT '$.base_seq'
+    );
+    
+    EXEC sp_SyncApplyItems @user_id = @user_id;
+    
+    -- Log the push
+    INSERT INTO SyncLog (user_id, device_id, last_sync_at, sync_type, items_synced)
+    SELECT @user_id, @device_id, GETUTCDATE(), 'push', COUNT(*)
+    FROM #SyncItems
+    WHERE status = 'applied';
+    
+    -- Return per-item results in request order
+    SELECT s.item_index,
+           CAST(CASE WHEN s.status = 'conflict' THEN 1 ELSE 0 END AS BIT) AS has_conflict,
+           s.entity_id, s.client_id, s.entity_type, s.server_updated_at, s.client_updated_at,
+           s.status, s.reason, s.conflict_fields,
+           CAST(COALESCE(tb.change_seq, tk.change_seq) AS BIGINT) AS change_seq
+    FROM #SyncItems s
+    LEFT JOIN Tabs tb ON s.entity_type = 'tab' AND tb.id = s.entity_id
+    LEFT JOIN Tasks tk ON s.entity_type = 'task' AND tk.id = s.entity_id
+    ORDER BY s.item_index;
 END
 GO
 
@@ -584,31 +1577,38 @@ CREATE OR ALTER PROCEDURE sp_ResolveConflict
 AS
 BEGIN
     SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    DECLARE @success BIT = 1;
     
     IF @resolution = 'keep_client' AND @client_data IS NOT NULL
     BEGIN
-        -- Apply client's version
-        -- This would parse JSON and update the record
-        -- Implementation depends on the specific fields being updated
+        -- Apply client's version, skipping conflict detection
+        CREATE TABLE #SyncItems (
+            item_index INT PRIMARY KEY,
+            client_id NVARCHAR(36) NOT NULL,
+            entity_type NVARCHAR(50) NOT NULL,
+            data NVARCHAR(MAX) NULL,
+            client_updated_at DATETIME2 NOT NULL,
+            status NVARCHAR(20) NULL,
+            reason NVARCHAR(50) NULL,
+            entity_id INT NULL,
+            server_updated_at DATETIME2 NULL,
+            base_seq BIGINT NULL,
+            conflict_fields NVARCHAR(400) NULL
+        );
         
-        IF @entity_type = 'tab'
-        BEGIN
-            UPDATE Tabs 
-            SET updated_at = GETUTCDATE()
-            -- Other fields would be updated from JSON
-            WHERE client_id = @client_id AND user_id = @user_id;
-        END
-        ELSE IF @entity_type = 'task'
-        BEGIN
-            UPDATE Tasks 
-            SET updated_at = GETUTCDATE()
-            -- Other fields would be updated from JSON
-            WHERE client_id = @client_id AND user_id = @user_id;
-        END
+        INSERT INTO #SyncItems (item_index, client_id, entity_type, data, client_updated_at)
+        VALUES (0, @client_id, @entity_type, @client_data, GETUTCDATE());
+        
+        EXEC sp_SyncApplyItems @user_id = @user_id, @force = 1;
+        
+        SELECT @success = CASE WHEN status = 'applied' THEN 1 ELSE 0 END 
+        FROM #SyncItems;
     END
     
-    -- Return success
-    SELECT 1 AS success, @resolution AS applied_resolution;
+    -- Return result
+    SELECT @success AS success, @resolution AS applied_resolution;
 END
 GO
 
@@ -661,11 +1661,87 @@ BEGIN
     SET NOCOUNT ON;
     
     DECLARE @task_title NVARCHAR(1000);
-    SELECT @task_title = title FROM Tasks WHERE id = @task_id AND user_id = @user_id;
+    SELECT @task_title = title FROM Tasks WHERE id = @task_id AND user_id = @user_id AND is_deleted = 0;
+    
+    -- Not the user's task (or deleted): nothing to remind about
+    IF @task_title IS NULL
+    BEGIN
+        SELECT CAST(NULL AS INT) AS notification_id;
+        RETURN;
+    END
     
     INSERT INTO Notifications (user_id, task_id, title, message, notification_type, scheduled_at)
     VALUES (@user_id, @task_id, N'შეხსენება', @task_title, 'reminder', @scheduled_at);
     
-    SELECT SCOPE_IDENTITY() AS notification_id;
+    SELECT CAST(SCOPE_IDENTITY() AS INT) AS notification_id;
+END
+GO
+
+-- =============================================
+-- NOTIFICATION DISPATCH PROCEDURES
+-- =============================================
+
+-- Claim a batch of due, unsent notifications for sending.
+-- Claimed rows are leased until @lease_seconds from now; READPAST lets several
+-- dispatchers claim concurrently without blocking on (or double-claiming) each other's rows.
+CREATE OR ALTER PROCEDURE sp_ClaimDueNotifications
+    @batch_size INT = 500,
+    @lease_seconds INT = 300,
+    @max_attempts INT = 5
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @now DATETIME2 = GETUTCDATE();
+    
+    WITH due AS (
+        SELECT TOP (@batch_size) *
+        FROM Notifications WITH (ROWLOCK, UPDLOCK, READPAST)
+        WHERE is_sent = 0
+          AND scheduled_at <= @now
+          AND (claimed_until IS NULL OR claimed_until < @now)
+          AND attempts < @max_attempts
+        ORDER BY scheduled_at
+    )
+    UPDATE due
+    SET claimed_until = DATEADD(SECOND, @lease_seconds, @now),
+        attempts = attempts + 1
+    OUTPUT inserted.id, inserted.user_id, inserted.task_id, inserted.title, inserted.message,
+           inserted.notification_type, inserted.scheduled_at, inserted.attempts;
+END
+GO
+
+-- Mark claimed notifications as sent (@notification_ids: JSON array of ids)
+CREATE OR ALTER PROCEDURE sp_MarkNotificationsSent
+    @notification_ids NVARCHAR(MAX)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    UPDATE n
+    SET is_sent = 1, sent_at = GETUTCDATE(), claimed_until = NULL
+    FROM Notifications n
+    INNER JOIN OPENJSON(@notification_ids) WITH (id INT '$') ids ON n.id = ids.id
+    WHERE n.is_sent = 0;
+    
+    SELECT @@ROWCOUNT AS affected_rows;
+END
+GO
+
+-- Release claims that failed to send; they become claimable again after @retry_seconds
+CREATE OR ALTER PROCEDURE sp_ReleaseNotifications
+    @notification_ids NVARCHAR(MAX),
+    @retry_seconds INT = 60
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    UPDATE n
+    SET claimed_until = DATEADD(SECOND, @retry_seconds, GETUTCDATE())
+    FROM Notifications n
+    INNER JOIN OPENJSON(@notification_ids) WITH (id INT '$') ids ON n.id = ids.id
+    WHERE n.is_sent = 0;
+    
+    SELECT @@ROWCOUNT AS affected_rows;
 END
 GO
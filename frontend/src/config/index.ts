@@ -18,6 +18,7 @@ export const config = {
   
   // Sync settings
   syncIntervalMinutes: 5,
+  syncPullPageSize: 500,
   
   // Platform detection
   isWeb: Platform.OS === 'web',
@@ -116,22 +116,33 @@ class SyncService {
     const deviceId = await localDb.getDeviceId();
     const lastSyncAt = await localDb.getLastSyncTime();
 
-    const response = await api.syncPull({
-      device_id: deviceId,
-      last_sync_at: lastSyncAt || undefined,
-    });
-
-    // Apply server changes to local database
-    for (const tab of response.tabs) {
-      await localDb.upsertFromServer('tab', tab as unknown as LocalTab);
-    }
+    let cursor: string | undefined;
+    let syncTimestamp = '';
 
-    for (const task of response.tasks) {
-      await localDb.upsertFromServer('task', task as unknown as LocalTask);
-    }
+    // Pull page by page; last sync time is only advanced after the final page
+    do {
+      const response = await api.syncPull({
+        device_id: deviceId,
+        last_sync_at: lastSyncAt || undefined,
+        cursor,
+        page_size: config.syncPullPageSize,
+      });
+
+      // Apply server changes to local database
+      for (const tab of response.tabs) {
+        await localDb.upsertFromServer('tab', tab as unknown as LocalTab);
+      }
+
+      for (const task of response.tasks) {
+        await localDb.upsertFromServer('task', task as unknown as LocalTask);
+      }
+
+      cursor = response.has_more ? response.next_cursor ?? undefined : undefined;
+      syncTimestamp = response.sync_timestamp;
+    } while (cursor);
 
     // Update last sync time
-    await localDb.setLastSyncTime(response.sync_timestamp);
+    await localDb.setLastSyncTime(syncTimestamp);
   }
 
   /**
@@ -47,6 +47,13 @@ export interface Task {
   has_incomplete_children?: boolean;
 }
 
+// Response of the /tasks/tree/* endpoints
+export interface TaskWithChildren extends Task {
+  children: TaskWithChildren[];
+  child_count: number;
+  completed_child_count: number;
+}
+
 export interface TaskCreate {
   client_id: string;
   tab_id?: number;
@@ -86,6 +93,8 @@ export interface LocalTab extends Tab {
 export interface SyncPullRequest {
   device_id: string;
   last_sync_at?: string;
+  cursor?: string;
+  page_size?: number;
 }
 
 export interface SyncPushRequest {
@@ -112,6 +121,8 @@ export interface SyncResponse {
   tasks: Task[];
   sync_timestamp: string;
   conflicts: ConflictData[];
+  next_cursor?: string | null;
+  has_more?: boolean;
 }
 
 // Auth types